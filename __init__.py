@@ -35,6 +35,7 @@ from .fast64_internal.f3d.f3d_material import (
 from .fast64_internal.f3d.f3d_render_engine import render_engine_register, render_engine_unregister
 from .fast64_internal.f3d.f3d_writer import f3d_writer_register, f3d_writer_unregister
 from .fast64_internal.f3d.f3d_parser import f3d_parser_register, f3d_parser_unregister
+from .fast64_internal.f3d.f3d_cost_analyzer import f3d_cost_analyzer_register, f3d_cost_analyzer_unregister
 from .fast64_internal.f3d.flipbook import flipbook_register, flipbook_unregister
 from .fast64_internal.f3d.op_largetexture import op_largetexture_register, op_largetexture_unregister, ui_oplargetexture
 
@@ -89,6 +90,14 @@ class F3D_GlobalSettingsPanel(bpy.types.Panel):
         col.scale_y = 1.1  # extra padding
         prop_split(col, context.scene, "f3d_type", "F3D Microcode")
         col.prop(context.scene, "saveTextures")
+        if not context.scene.saveTextures:
+            col.prop(context.scene, "shareCIPalettes")
+            col.prop(context.scene, "autoQuantizeCI")
+            # the limits also apply to materials converting their textures to CI
+            row = col.row()
+            row.prop(context.scene, "autoQuantizeMinPSNR")
+            row.prop(context.scene, "autoQuantizeMaxDelta")
+            col.prop(context.scene, "autoQuantizeAllowCI4")
         col.prop(context.scene, "f3d_simple", text="Simple Material UI")
         col.prop(context.scene, "exportInlineF3D", text="Bleed and Inline Material Exports")
         if context.scene.exportInlineF3D:
@@ -97,6 +106,7 @@ class F3D_GlobalSettingsPanel(bpy.types.Panel):
                 "While inlining, all meshes will be restored to world default values.\n         You can configure these values in the world properties tab.",
                 icon="INFO",
             )
+            col.prop(context.scene, "optimizeDrawOrder")
         col.prop(context.scene, "ignoreTextureRestrictions")
         if context.scene.ignoreTextureRestrictions:
             col.box().label(text="Width/height must be < 1024. Must be png format.")
@@ -133,6 +143,11 @@ class Fast64_GlobalSettingsPanel(bpy.types.Panel):
             if fast64_settings.auto_pick_texture_format:
                 col.prop(fast64_settings, "prefer_rgba_over_ci")
 
+        col.prop(fast64_settings, "profile_exports")
+        if fast64_settings.profile_exports:
+            col.prop(fast64_settings, "profile_track_memory")
+            prop_split(col, fast64_settings, "profile_report_path", "Report")
+
 
 class Fast64_GlobalToolsPanel(bpy.types.Panel):
     bl_idname = "FAST64_PT_global_tools"
@@ -208,6 +223,20 @@ class Fast64Settings_Properties(bpy.types.PropertyGroup):
         description="When enabled, this will make fast64 automatically load repo settings if they are found after picking a decomp path",
         default=True,
     )
+    profile_exports: bpy.props.BoolProperty(
+        name="Profile Exports",
+        description="When enabled, fast64 will time each stage of an export and print a summary to the console",
+    )
+    profile_track_memory: bpy.props.BoolProperty(
+        name="Track Peak Memory",
+        description="Also record the peak memory of each export stage. This makes exports noticeably slower",
+    )
+    profile_report_path: bpy.props.StringProperty(
+        name="Report",
+        description="JSON file the export profile is written to, leave empty to only print the summary",
+        subtype="FILE_PATH",
+        default="//fast64_profile.json",
+    )
     internal_fixed_4_2: bpy.props.BoolProperty(default=False)
 
     internal_game_update_ver: bpy.props.IntProperty(default=0)
@@ -420,6 +449,7 @@ def register():
     f3d_writer_register()
     flipbook_register()
     f3d_parser_register()
+    f3d_cost_analyzer_register()
     op_largetexture_register()
 
     # ROM
@@ -436,6 +466,42 @@ def register():
         description="Inlines and bleeds materials in a single mesh. GeoLayout + Armature exports bleed over entire model",
         default=False,
     )
+    bpy.types.Scene.optimizeDrawOrder = bpy.props.BoolProperty(
+        name="Optimize Material Draw Order",
+        description="While bleeding, reorder the materials of each mesh to minimize the state changes between them. "
+        "Transparent materials keep their order and decals are drawn after opaque materials",
+        default=False,
+    )
+    bpy.types.Scene.shareCIPalettes = bpy.props.BoolProperty(
+        name="Share CI Palettes",
+        description="Groups the palettes of single CI textures into as few shared palettes as fit (16 or 256 colors). "
+        "Fewer palettes are exported and bleeding can skip TLUT loads between materials sharing a palette",
+        default=False,
+    )
+    bpy.types.Scene.autoQuantizeCI = bpy.props.BoolProperty(
+        name="Convert RGBA Textures To CI",
+        description="Exports single RGBA16 / RGBA32 textures of all materials as CI4 or CI8 with an RGBA16 palette "
+        "when the quantized texture stays within the error limits, otherwise the original format is kept. "
+        "Materials can also opt in individually",
+        default=False,
+    )
+    bpy.types.Scene.autoQuantizeMinPSNR = bpy.props.FloatProperty(
+        name="Min PSNR",
+        description="Minimum peak signal to noise ratio (dB) of the quantized texture",
+        default=32.0,
+        min=0.0,
+        max=100.0,
+    )
+    bpy.types.Scene.autoQuantizeMaxDelta = bpy.props.IntProperty(
+        name="Max Delta",
+        description="Maximum difference (0-255) of any texel channel in the quantized texture",
+        default=32,
+        min=0,
+        max=255,
+    )
+    bpy.types.Scene.autoQuantizeAllowCI4 = bpy.props.BoolProperty(
+        name="Allow CI4", description="Tries CI4 before CI8", default=True
+    )
     bpy.types.Scene.blenderF3DScale = bpy.props.FloatProperty(
         name="F3D Blender Scale", default=100, update=on_update_render_settings
     )
@@ -454,6 +520,7 @@ def unregister():
     flipbook_unregister()
     f3d_writer_unregister()
     f3d_parser_unregister()
+    f3d_cost_analyzer_unregister()
     sm64_unregister(True)
     oot_unregister(True)
     mk64_unregister(True)
@@ -467,6 +534,12 @@ def unregister():
     del bpy.types.Scene.saveTextures
     del bpy.types.Scene.gameEditorMode
     del bpy.types.Scene.exportHiddenGeometry
+    del bpy.types.Scene.optimizeDrawOrder
+    del bpy.types.Scene.shareCIPalettes
+    del bpy.types.Scene.autoQuantizeCI
+    del bpy.types.Scene.autoQuantizeMinPSNR
+    del bpy.types.Scene.autoQuantizeMaxDelta
+    del bpy.types.Scene.autoQuantizeAllowCI4
     del bpy.types.Scene.blenderF3DScale
 
     del bpy.types.Scene.fast64
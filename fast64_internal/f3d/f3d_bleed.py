@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import copy
+import itertools
 import bpy
 
 from dataclasses import dataclass, field
 
 from ..utility import create_or_get_world
+from ..profiler import profile_stage
+from .f3d_material import get_rendermode_settings, get_settings_output_method
 from .f3d_gbi import (
     GfxTag,
     GfxListTag,
@@ -29,6 +32,7 @@ from .f3d_gbi import (
     SPSetOtherMode,
     DPLoadBlock,
     DPLoadTLUTCmd,
+    DPSetCombineMode,
     DPFullSync,
     DPSetRenderMode,
     DPSetTextureImage,
@@ -49,6 +53,11 @@ from .f3d_gbi import (
 
 
 class BleedGraphics:
+    # the draw order of meshes with more materials than this is optimized heuristically
+    exact_draw_order_limit = 8
+    # max passes of the heuristic's relocation search, each pass is O(n^2)
+    draw_order_passes = 4
+
     # bleed_state "enums"
     bleed_start = 1
     bleed_in_progress = 2
@@ -62,6 +71,14 @@ class BleedGraphics:
         self.is_f3dex2 = "F3DEX2" in bpy.context.scene.f3d_type
         self.build_default_geo()
         self.build_default_othermodes()
+        self.reorder_draws = bpy.context.scene.optimizeDrawOrder
+        self.draw_order_stats = DrawOrderStats()
+        self.share_palettes = bpy.context.scene.shareCIPalettes
+        self.tlut_loads = [0, 0]  # before and after bleeding, reported when sharing CI palettes
+        # material gfx lists are not modified while bleeding, so their lookups and bleed results can be reused
+        self.cmd_sets: dict[GfxList, CmdSet] = dict()
+        self.tmem_dicts: dict[GfxList, dict] = dict()
+        self.bleed_memo: dict[tuple, list[GbiMacro]] = dict()
 
     def build_default_geo(self):
         defaults = create_or_get_world(bpy.context.scene).rdp_defaults
@@ -124,6 +141,10 @@ class BleedGraphics:
 
     # clear the gfx lists so they don't export
     def clear_gfx_lists(self, fModel: FModel):
+        if self.reorder_draws:
+            self.draw_order_stats.print_report()
+        if self.share_palettes and self.tlut_loads[0] > 0:
+            print(f"TLUT loads after bleeding: {self.tlut_loads[0]} -> {self.tlut_loads[1]}")
         for fMaterial, texDimensions in fModel.materials.values():
             fMaterial.material.tag |= GfxListTag.NoExport
             if fMaterial.revert:
@@ -132,6 +153,7 @@ class BleedGraphics:
             for tri_list in fMesh.triangleGroups:
                 tri_list.triList.tag |= GfxListTag.NoExport
 
+    @profile_stage("Bleed", item=lambda self, fMesh, *args: fMesh.name)
     def bleed_fmesh(
         self,
         fMesh: FMesh,
@@ -148,6 +170,8 @@ class BleedGraphics:
         reset_cmd_dict = dict()
         bleed_gfx_lists = BleedGfxLists()
         fmesh_static_cmds, fmesh_jump_cmds = self.on_bleed_start(cmd_list)
+        if self.reorder_draws:
+            fmesh_jump_cmds = self.optimize_draw_order(fmesh_jump_cmds, fmodel_materials, last_mat)
         for jump_list_cmd in fmesh_jump_cmds:
             # bleed mat and tex
             if jump_list_cmd.displayList.tag & GfxListTag.Material:
@@ -164,6 +188,9 @@ class BleedGraphics:
                     bleed_gfx_lists.bled_tex = self.bleed_textures(cur_fmat, last_mat, bleed_state)
                 else:
                     bleed_gfx_lists.bled_tex = cur_fmat.texture_DL.commands
+                if self.share_palettes:
+                    self.tlut_loads[0] += sum(type(cmd) == DPLoadTLUTCmd for cmd in cur_fmat.texture_DL.commands)
+                    self.tlut_loads[1] += sum(type(cmd) == DPLoadTLUTCmd for cmd in bleed_gfx_lists.bled_tex)
             # bleed tri group (for large textures) and to remove other unnecessary cmds
             if jump_list_cmd.displayList.tag & GfxListTag.Geometry:
                 tri_list = jump_list_cmd.displayList
@@ -179,6 +206,156 @@ class BleedGraphics:
         self.on_bleed_end(last_mat, cmd_list, fmesh_static_cmds, reset_cmd_dict, default_render_mode)
         return last_mat
 
+    # returns the cmds needed to go from last_mat to cur_fmat, same as what is inlined in bleed_fmesh
+    def get_transition_cmds(self, cur_fmat: FMaterial, last_mat: FMaterial, bleed_state: int):
+        cmds = self.bleed_mat(cur_fmat, last_mat, bleed_state)
+        if not (cur_fmat.isTexLarge[0] or cur_fmat.isTexLarge[1]):
+            return cmds + self.bleed_textures(cur_fmat, last_mat, bleed_state)
+        return cmds + cur_fmat.texture_DL.commands
+
+    def get_draw_phase(self, material: bpy.types.Material):
+        # opaque draws can be freely reordered, decals must be drawn after them and transparent draws keep their order,
+        # draws without z compare stay where they are
+        # read the render mode without syncing it to the material, exporting must not modify materials
+        rendermode = get_rendermode_settings(material)
+        if not material.f3d_mat.rdp_settings.g_zbuffer or not rendermode.z_cmp:
+            # without z compare, the draw order decides what is visible, None keeps the draw in place
+            return None
+        if get_settings_output_method(rendermode) == "XLU" or rendermode.zmode == "ZMODE_XLU":
+            return 2
+        if rendermode.zmode == "ZMODE_DEC":
+            return 1
+        return 0
+
+    # reorders the material + tri group jumps of an fMesh to minimize the cmds left after bleeding
+    def optimize_draw_order(self, fmesh_jump_cmds: list[SPDisplayList], fmodel_materials, last_mat: FMaterial):
+        draws: list[tuple[FMaterial, list[SPDisplayList], int]] = []
+        for jump_list_cmd in fmesh_jump_cmds:
+            if jump_list_cmd.displayList.tag & GfxListTag.Material:
+                bpy_material, fmat = find_material_from_jump_cmd(fmodel_materials, jump_list_cmd)
+                if not fmat:
+                    return fmesh_jump_cmds
+                draws.append((fmat, [jump_list_cmd], self.get_draw_phase(bpy_material)))
+            elif jump_list_cmd.displayList.tag & GfxListTag.Geometry and draws:
+                draws[-1][1].append(jump_list_cmd)
+            else:
+                # reverts and geometry drawn before any material depend on their position
+                return fmesh_jump_cmds
+        if len(draws) < 2:
+            return fmesh_jump_cmds
+
+        transition_cmds = dict()
+
+        def get_cost(prev_index: int, index: int):
+            if (prev_index, index) not in transition_cmds:
+                prev_mat = draws[prev_index][0] if prev_index is not None else last_mat
+                bleed_state = self.bleed_start if prev_index is None else self.bleed_in_progress
+                transition_cmds[prev_index, index] = self.get_transition_cmds(draws[index][0], prev_mat, bleed_state)
+            return len(transition_cmds[prev_index, index])
+
+        def add_segment(segment: list[int]):
+            for phase in range(3):
+                indices = [i for i in segment if draws[i][2] == phase]
+                if phase < 2:
+                    indices = self.solve_draw_order(indices, order[-1] if order else None, get_cost)
+                order.extend(indices)
+
+        # draws kept in place split the mesh into segments, each segment is reordered on its own
+        order = []
+        segment = []
+        for i, draw in enumerate(draws):
+            if draw[2] is None:
+                add_segment(segment)
+                segment = []
+                order.append(i)
+            else:
+                segment.append(i)
+        add_segment(segment)
+
+        original_order = list(range(len(draws)))
+        stats = self.draw_order_stats
+        for order_indices, counts in ((original_order, stats.before), (order, stats.after)):
+            for prev_index, index in zip([None] + order_indices[:-1], order_indices):
+                get_cost(prev_index, index)
+                counts.add(transition_cmds[prev_index, index])
+        if order != original_order:
+            stats.reordered_meshes += 1
+
+        return [cmd for index in order for cmd in draws[index][1]]
+
+    # shortest path visiting every draw once, exact for a few draws and a greedy path improved by relocations otherwise
+    def solve_draw_order(self, indices: list[int], start: int, get_cost):
+        def path_cost(path: list[int]):
+            return sum(get_cost(prev_index, index) for prev_index, index in zip([start] + path[:-1], path))
+
+        if len(indices) < 2:
+            return indices
+
+        if len(indices) <= self.exact_draw_order_limit:
+            # Held-Karp, best[(visited set, last index)] = (cost, path)
+            best = {(frozenset([i]), i): (get_cost(start, i), [i]) for i in indices}
+            for size in range(2, len(indices) + 1):
+                for subset in itertools.combinations(indices, size):
+                    visited = frozenset(subset)
+                    for last in subset:
+                        prev_visited = visited - {last}
+                        prev = min(prev_visited, key=lambda prev: best[prev_visited, prev][0] + get_cost(prev, last))
+                        cost, path = best[prev_visited, prev]
+                        best[visited, last] = (cost + get_cost(prev, last), path + [last])
+            full = frozenset(indices)
+            best_path = min((best[full, last] for last in indices), key=lambda entry: entry[0])[1]
+        else:
+            remaining = list(indices)
+            best_path = []
+            prev_index = start
+            while remaining:
+                next_index = min(remaining, key=lambda index: get_cost(prev_index, index))
+                remaining.remove(next_index)
+                best_path.append(next_index)
+                prev_index = next_index
+
+            # relocate single draws while it helps, the cost change of a move only depends on its neighbours
+            def edge_cost(path: list[int], i: int):
+                # cost of the edge into path[i], 0 past the end
+                if i >= len(path):
+                    return 0
+                return get_cost(path[i - 1] if i > 0 else start, path[i])
+
+            for _ in range(self.draw_order_passes):
+                improved = False
+                for index in list(best_path):
+                    i = best_path.index(index)
+                    path = best_path[:i] + best_path[i + 1 :]
+                    removed = edge_cost(best_path, i) + edge_cost(best_path, i + 1) - edge_cost(path, i)
+                    best_delta, best_j = 0, None
+                    for j in range(len(path) + 1):
+                        if j == i:
+                            continue
+                        prev_index = path[j - 1] if j > 0 else start
+                        added = get_cost(prev_index, index) - edge_cost(path, j)
+                        if j < len(path):
+                            added += get_cost(index, path[j])
+                        if added - removed < best_delta:
+                            best_delta, best_j = added - removed, j
+                    if best_j is not None:
+                        path.insert(best_j, index)
+                        best_path, improved = path, True
+                if not improved:
+                    break
+
+        # keep the original order unless it is strictly better
+        return best_path if path_cost(best_path) < path_cost(indices) else indices
+
+    def get_cmd_set(self, cmd_list: GfxList):
+        if cmd_list not in self.cmd_sets:
+            self.cmd_sets[cmd_list] = CmdSet(cmd_list.commands)
+        return self.cmd_sets[cmd_list]
+
+    def get_tmem_dict(self, cmd_list: GfxList):
+        if cmd_list not in self.tmem_dicts:
+            self.tmem_dicts[cmd_list] = self.build_tmem_dict(cmd_list)
+        return self.tmem_dicts[cmd_list]
+
     def build_tmem_dict(self, cmd_list: GfxList):
         im_buffer = None
         tmem_dict = dict()
@@ -195,18 +372,24 @@ class BleedGraphics:
         return tmem_dict
 
     def bleed_textures(self, cur_fmat: FMaterial, last_mat: FMaterial, bleed_state: int):
+        key = ("tex", cur_fmat, last_mat, bleed_state)
+        if key not in self.bleed_memo:
+            self.bleed_memo[key] = self.bleed_textures_uncached(cur_fmat, last_mat, bleed_state)
+        return list(self.bleed_memo[key])
+
+    def bleed_textures_uncached(self, cur_fmat: FMaterial, last_mat: FMaterial, bleed_state: int):
         if last_mat:
             # bleed cmds if matching tile has duplicate cmds
             # deep copy breaks on Image objects so I will only copy the levels needed
             commands_bled = copy.copy(cur_fmat.texture_DL)
             commands_bled.commands = copy.copy(cur_fmat.texture_DL.commands)  # copy the commands also
             # eliminate set tex images, but only if there is an overlap of the same image at the same tmem location
-            last_im_loads = self.build_tmem_dict(last_mat.texture_DL)
-            new_im_loads = self.build_tmem_dict(commands_bled)
-            removable_images = []
+            last_im_loads = self.get_tmem_dict(last_mat.texture_DL)
+            new_im_loads = self.get_tmem_dict(cur_fmat.texture_DL)
+            removable_images = CmdSet()
             for tmem, image in new_im_loads.items():
                 if tmem in last_im_loads and last_im_loads[tmem] == image:
-                    removable_images.append(image)
+                    removable_images.add(image)
             # now go through list and cull out loads for the specific cmds
             # this will be the set tex image, and the loading cmds
             rm_load = False
@@ -223,46 +406,48 @@ class BleedGraphics:
                     rm_load = None
                     continue
             # now eval as normal conditionals
+            last_tex_cmds = self.get_cmd_set(last_mat.texture_DL)
             for j, cmd in enumerate(cur_fmat.texture_DL.commands):
                 if not cmd:
                     continue  # some cmds are None from previous step
                 if self.bleed_individual_cmd(commands_bled, cmd, bleed_state):
-                    if cmd in last_mat.texture_DL.commands:
+                    if cmd in last_tex_cmds:
                         commands_bled.commands[j] = None
-            # remove Nones from list
-            while None in commands_bled.commands:
-                commands_bled.commands.remove(None)
+            remove_none_cmds(commands_bled)
             bled_tex = commands_bled
         else:
             bled_tex = cur_fmat.texture_DL
         return bled_tex.commands
 
     def bleed_mat(self, cur_fmat: FMaterial, last_mat: FMaterial, bleed_state: int):
+        # the same material transitions happen in many meshes, bleed them once
+        key = ("mat", cur_fmat, last_mat, bleed_state)
+        if key not in self.bleed_memo:
+            self.bleed_memo[key] = self.bleed_mat_uncached(cur_fmat, last_mat, bleed_state)
+        return list(self.bleed_memo[key])
+
+    def bleed_mat_uncached(self, cur_fmat: FMaterial, last_mat: FMaterial, bleed_state: int):
         if last_mat:
             gfx = cur_fmat.mat_only_DL
             # deep copy breaks on Image objects so I will only copy the levels needed
             commands_bled = copy.copy(gfx)
             commands_bled.commands = copy.copy(gfx.commands)  # copy the commands also
-            last_cmd_list = last_mat.mat_only_DL.commands
+            last_cmd_list = self.get_cmd_set(last_mat.mat_only_DL)
             for j, cmd in enumerate(gfx.commands):
                 if self.bleed_individual_cmd(commands_bled, cmd, bleed_state, last_cmd_list):
                     commands_bled.commands[j] = None
-            # remove Nones from list
-            while None in commands_bled.commands:
-                commands_bled.commands.remove(None)
+            remove_none_cmds(commands_bled)
         else:
             commands_bled = self.bleed_cmd_list(cur_fmat.mat_only_DL, bleed_state)
         # some syncs may become redundant after bleeding
         self.optimize_syncs(commands_bled, bleed_state)
         # remove SPEndDisplayList
-        while SPEndDisplayList() in commands_bled.commands:
-            commands_bled.commands.remove(SPEndDisplayList())
+        remove_equal_cmds(commands_bled, SPEndDisplayList())
         return commands_bled.commands
 
     def bleed_tri_group(self, tri_list: GfxList, cur_fmat: fMaterial, bleed_state: int):
         # remove SPEndDisplayList from triGroup
-        while SPEndDisplayList() in tri_list.commands:
-            tri_list.commands.remove(SPEndDisplayList())
+        remove_equal_cmds(tri_list, SPEndDisplayList())
         if not cur_fmat or (cur_fmat.isTexLarge[0] or cur_fmat.isTexLarge[1]):
             tri_list = self.bleed_cmd_list(tri_list, bleed_state)
 
@@ -280,9 +465,7 @@ class BleedGraphics:
             usage_dict[(type(cmd), getattr(cmd, "tile", None))] = cmd
             if last_use == cmd or bleed_cmd_status != self.bleed_self_conflict:
                 commands_bled.commands[j] = None
-        # remove Nones from list
-        while None in commands_bled.commands:
-            commands_bled.commands.remove(None)
+        remove_none_cmds(commands_bled)
         return commands_bled
 
     # Put triGroup bleed gfx in the FMesh.draw object
@@ -327,9 +510,7 @@ class BleedGraphics:
             elif sp_dl_start and cmd is not None:
                 cmd_list.commands[j] = None
                 non_jump_dl_cmds.append(cmd)
-        # remove Nones from list
-        while None in cmd_list.commands:
-            cmd_list.commands.remove(None)
+        remove_none_cmds(cmd_list)
         return non_jump_dl_cmds, jump_dl_cmds
 
     def on_tri_group_bleed_end(self, triGroup: FTriGroup, last_mat: FMaterial, bleed_gfx_lists: BleedGfxLists):
@@ -359,8 +540,7 @@ class BleedGraphics:
         no_syncs_needed = {"DPSetPrimColor", "DPSetPrimDepth"}  # will not affect rdp
         syncs_needed = {"SPSetOtherMode"}  # will affect rdp
         if bleed_state == self.bleed_start:
-            while DPPipeSync() in cmd_list.commands:
-                cmd_list.commands.remove(DPPipeSync())
+            remove_equal_cmds(cmd_list, DPPipeSync())
         for cmd in cmd_list.commands:
             cmd_name = type(cmd).__name__
             if cmd == DPPipeSync():
@@ -369,8 +549,7 @@ class BleedGraphics:
                 return
             if cmd_name in syncs_needed:
                 return
-        while DPPipeSync() in cmd_list.commands:
-            cmd_list.commands.remove(DPPipeSync())
+        remove_equal_cmds(cmd_list, DPPipeSync())
 
     def create_reset_cmds(self, reset_cmd_dict: dict[GbiMacro], default_render_mode: list[str]):
         reset_cmds = []
@@ -410,29 +589,31 @@ class BleedGraphics:
                     reset_cmds.append(self.default_othermode_L)
         return reset_cmds
 
-    def bleed_individual_cmd(self, cmd_list: GfxList, cmd: GbiMacro, bleed_state: int, last_cmd_list: GfxList = None):
-        # never bleed these cmds
-        if type(cmd) in [
-            SPMatrix,
-            SPVertex,
-            SPViewport,
-            SPDisplayList,
-            SPBranchList,
-            SP1Triangle,
-            SPLine3D,
-            SPLineW3D,
-            SP2Triangles,
-            SPCullDisplayList,
-            SPSegment,
-            SPBranchLessZraw,
-            SPModifyVertex,
-            SPEndDisplayList,
-            DPSetTextureImage,
-            DPLoadBlock,
-            DPLoadTile,
-            DPLoadTLUTCmd,
-            DPFullSync,
-        ]:
+    # never bleed these cmds
+    never_bleed_cmds = {
+        SPMatrix,
+        SPVertex,
+        SPViewport,
+        SPDisplayList,
+        SPBranchList,
+        SP1Triangle,
+        SPLine3D,
+        SPLineW3D,
+        SP2Triangles,
+        SPCullDisplayList,
+        SPSegment,
+        SPBranchLessZraw,
+        SPModifyVertex,
+        SPEndDisplayList,
+        DPSetTextureImage,
+        DPLoadBlock,
+        DPLoadTile,
+        DPLoadTLUTCmd,
+        DPFullSync,
+    }
+
+    def bleed_individual_cmd(self, cmd_list: GfxList, cmd: GbiMacro, bleed_state: int, last_cmd_list: CmdSet = None):
+        if type(cmd) in self.never_bleed_cmds:
             return False
 
         # if no last list then calling func will own behavior of bleeding
@@ -513,6 +694,71 @@ class BleedGraphics:
         return False
 
 
+class CmdSet:
+    """
+    Hashed membership test for gbi cmds, equivalent to ``cmd in cmd_list``.
+    Cmds that can't be hashed (e.g. with list fields) are compared one by one.
+    """
+
+    def __init__(self, cmds: list[GbiMacro] = ()):
+        self.hashed = set()
+        self.unhashed = []
+        for cmd in cmds:
+            self.add(cmd)
+
+    def add(self, cmd: GbiMacro):
+        try:
+            self.hashed.add(cmd)
+        except TypeError:
+            self.unhashed.append(cmd)
+
+    def __contains__(self, cmd: GbiMacro):
+        try:
+            if cmd in self.hashed:
+                return True
+        except TypeError:
+            pass
+        return cmd in self.unhashed
+
+    def __len__(self):
+        return len(self.hashed) + len(self.unhashed)
+
+
+# remove Nones from list, in place in a single pass
+def remove_none_cmds(cmd_list: GfxList):
+    cmd_list.commands[:] = [cmd for cmd in cmd_list.commands if cmd is not None]
+
+
+def remove_equal_cmds(cmd_list: GfxList, removed_cmd: GbiMacro):
+    cmd_list.commands[:] = [cmd for cmd in cmd_list.commands if not (cmd is removed_cmd or removed_cmd == cmd)]
+
+
+# counts of the cmds inlined between draws, used to report the effect of draw order optimization
+@dataclass
+class DrawCmdCounts:
+    total: int = 0
+    texture_loads: int = 0
+    combine_modes: int = 0
+
+    def add(self, cmds: list[GbiMacro]):
+        self.total += len(cmds)
+        self.texture_loads += sum(1 for cmd in cmds if type(cmd) in (DPLoadBlock, DPLoadTile, DPLoadTLUTCmd))
+        self.combine_modes += sum(1 for cmd in cmds if type(cmd) == DPSetCombineMode)
+
+
+@dataclass
+class DrawOrderStats:
+    before: DrawCmdCounts = field(default_factory=DrawCmdCounts)
+    after: DrawCmdCounts = field(default_factory=DrawCmdCounts)
+    reordered_meshes: int = 0
+
+    def print_report(self):
+        print(f"Draw order optimization: {self.reordered_meshes} mesh(es) reordered")
+        for name in ("total", "texture_loads", "combine_modes"):
+            before, after = getattr(self.before, name), getattr(self.after, name)
+            print(f"    {name.replace('_', ' ')} cmds: {before} -> {after}")
+
+
 # small containers for data used in inline Gfx
 @dataclass
 class BleedGfxLists:
@@ -0,0 +1,480 @@
+import bpy, mathutils, math, re
+from dataclasses import dataclass, fields
+from typing import Optional
+from bpy.utils import register_class, unregister_class
+from .f3d_gbi import *
+from .f3d_bleed import BleedGraphics
+from .f3d_parser import ParsedMacro, getImportData, math_eval, parseDLData
+from .f3d_writer import exportF3DCommon, getWriteMethodFromEnum
+from ..utility import *
+
+# Rough per-item costs in RSP/RDP clock cycles. They are approximations of the microcode and RDP timings,
+# (ignoring lighting, clipping and the screen coverage of triangles) only meant to rank draws against each other.
+RSP_CYCLES_PER_COMMAND = 20  # fetching and dispatching a command
+RSP_CYCLES_PER_VERTEX_LOAD = 100  # vertex DMA setup
+RSP_CYCLES_PER_VERTEX = 40  # transform, clip codes and projection
+RSP_CYCLES_PER_TRIANGLE = 150  # edge, shade, texture and z coefficients
+RDP_CYCLES_PER_TRIANGLE = 40  # edge walker setup, the fill itself depends on the screen size
+RDP_CYCLES_PER_TEXTURE_LOAD = 30
+RDP_LOAD_BLOCK_BYTES_PER_CYCLE = 8
+RDP_CYCLES_PER_LOAD_TILE_ROW = 4
+RDP_CYCLES_PER_TLUT_ENTRY = 1
+RDP_CYCLES_PER_PIPE_SYNC = 50  # waits for the pipeline to drain
+RDP_CYCLES_PER_LOAD_SYNC = 15
+RDP_CYCLES_PER_TILE_SYNC = 15
+
+TMEM_SIZE = 4096
+
+otherModeCommands = {
+    "SPSetOtherMode",
+    "DPSetOtherMode",
+    "DPPipelineMode",
+    "DPSetCycleType",
+    "DPSetTexturePersp",
+    "DPSetTextureDetail",
+    "DPSetTextureLOD",
+    "DPSetTextureLUT",
+    "DPSetTextureFilter",
+    "DPSetTextureConvert",
+    "DPSetCombineKey",
+    "DPSetColorDither",
+    "DPSetAlphaDither",
+    "DPSetAlphaCompare",
+    "DPSetDepthSource",
+    "DPSetRenderMode",
+}
+
+combinerCommands = {"DPSetCombineMode", "DPSetCombineLERP"}
+
+triangleCommands = {"SP1Triangle": 1, "SP2Triangles": 2, "SP1Quadrangle": 2}
+
+# macros expanding to several commands: (commands, pipe syncs, load syncs, tile syncs)
+loadMacroExpansions = {
+    "DPLoadTextureBlock": (7, 1, 1, 0),
+    "DPLoadTextureBlock_4b": (7, 1, 1, 0),
+    "DPLoadTextureTile": (7, 1, 1, 0),
+    "DPLoadTextureTile_4b": (7, 1, 1, 0),
+    "DPLoadTLUT_pal16": (6, 1, 1, 1),
+    "DPLoadTLUT_pal256": (6, 1, 1, 1),
+    "DPLoadTLUT": (6, 1, 1, 1),
+}
+
+enumDLCostSortKey = [
+    ("rdpCycles", "RDP Cycles", "Estimated RDP cycles"),
+    ("rspCycles", "RSP Cycles", "Estimated RSP cycles"),
+    ("triangles", "Triangles", "Triangles"),
+    ("vertices", "Vertices", "Loaded vertices"),
+    ("textureBytes", "Texture Bytes", "Loaded texture and palette bytes"),
+    ("textureLoads", "Texture Loads", "Texture and palette loads"),
+    ("tmemBytes", "TMEM", "Highest TMEM address used"),
+    ("pipeSyncs", "Pipe Syncs", "Pipe syncs"),
+    ("commands", "Commands", "Commands"),
+    ("name", "Name", "Object and material / display list name"),
+]
+
+
+@dataclass
+class DLCost:
+    """Static cost of the commands of one object and material (or display list)"""
+
+    owner: str
+    name: str
+    commands: int = 0
+    vertexLoads: int = 0
+    vertices: int = 0
+    triangles: int = 0
+    textureLoads: int = 0
+    textureBytes: int = 0
+    tmemBytes: int = 0
+    otherModeChanges: int = 0
+    combinerChanges: int = 0
+    pipeSyncs: int = 0
+    loadSyncs: int = 0
+    tileSyncs: int = 0
+    rspCycles: float = 0
+    rdpCycles: float = 0
+
+    def add(self, other: "DLCost"):
+        for field in fields(self):
+            if field.name in {"owner", "name"}:
+                continue
+            elif field.name == "tmemBytes":
+                self.tmemBytes = max(self.tmemBytes, other.tmemBytes)
+            else:
+                setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+
+
+class DLCostAnalyzer:
+    """
+    Estimates the cost of display lists, either from the GfxLists of an FModel or from parsed C display lists.
+    The RDP state (texture image size, tile descriptors) is tracked across lists like the hardware would.
+    """
+
+    columns = (
+        ("Cmds", "commands"),
+        ("VtxLoads", "vertexLoads"),
+        ("Verts", "vertices"),
+        ("Tris", "triangles"),
+        ("TexLoads", "textureLoads"),
+        ("TexBytes", "textureBytes"),
+        ("TMEM", "tmemBytes"),
+        ("OtherMode", "otherModeChanges"),
+        ("Combine", "combinerChanges"),
+        ("PipeSync", "pipeSyncs"),
+        ("Load/TileSync", None),
+        ("RSP", "rspCycles"),
+        ("RDP", "rdpCycles"),
+    )
+
+    def __init__(self, f3d: F3D):
+        self.f3d = f3d
+        self.rows: dict[tuple[str, str], DLCost] = {}
+        self.textureImageBits = 16
+        self.tiles: dict[int, tuple[int, int]] = {}  # tile : (tmem, line)
+
+    def get_row(self, owner: str, name: str):
+        key = (owner, name)
+        if key not in self.rows:
+            self.rows[key] = DLCost(owner, name)
+        return self.rows[key]
+
+    def to_int(self, value, default: int = 0):
+        if isinstance(value, int):
+            return value
+        try:
+            result = math_eval(str(value), self.f3d)
+        except Exception:
+            return default
+        return result if isinstance(result, int) else default
+
+    def texel_bits(self, siz):
+        match = re.search(r"(4|8|16|32)b", siz) if isinstance(siz, str) else None
+        if match is not None:
+            return int(match.group(1))
+        return 4 << self.to_int(siz, 2)
+
+    def add_load(self, cost: DLCost, loadBytes: int, cycles: float, tmemEnd: int = 0):
+        cost.textureLoads += 1
+        cost.textureBytes += loadBytes
+        cost.tmemBytes = max(cost.tmemBytes, min(tmemEnd, TMEM_SIZE))
+        cost.rdpCycles += RDP_CYCLES_PER_TEXTURE_LOAD + cycles
+
+    def add_command(self, cost: DLCost, name: str, args: list):
+        """Adds the cost of one command, ``name`` is the macro name without the "gs" prefix"""
+
+        expansion = loadMacroExpansions.get(name)
+        if expansion is not None:
+            commands, pipeSyncs, loadSyncs, tileSyncs = expansion
+            cost.commands += commands
+            cost.pipeSyncs += pipeSyncs
+            cost.loadSyncs += loadSyncs
+            cost.tileSyncs += tileSyncs
+            cost.rspCycles += RSP_CYCLES_PER_COMMAND * commands
+            cost.rdpCycles += (
+                RDP_CYCLES_PER_PIPE_SYNC * pipeSyncs
+                + RDP_CYCLES_PER_LOAD_SYNC * loadSyncs
+                + RDP_CYCLES_PER_TILE_SYNC * tileSyncs
+            )
+            self.add_load_macro(cost, name, args)
+            return
+
+        cost.commands += 1
+        cost.rspCycles += RSP_CYCLES_PER_COMMAND
+        if name == "SPVertex":
+            count = self.to_int(args[1])
+            cost.vertexLoads += 1
+            cost.vertices += count
+            cost.rspCycles += RSP_CYCLES_PER_VERTEX_LOAD + RSP_CYCLES_PER_VERTEX * count
+        elif name in triangleCommands:
+            count = triangleCommands[name]
+            cost.triangles += count
+            cost.rspCycles += RSP_CYCLES_PER_TRIANGLE * count
+            cost.rdpCycles += RDP_CYCLES_PER_TRIANGLE * count
+        elif name == "DPSetTextureImage":
+            self.textureImageBits = self.texel_bits(args[1])
+        elif name == "DPSetTile":
+            self.tiles[self.to_int(args[4])] = (self.to_int(args[3]), self.to_int(args[2]))
+        elif name == "DPSetTileSize":
+            tile = self.to_int(args[0])
+            if tile != self.f3d.G_TX_LOADTILE and tile in self.tiles:
+                tmem, line = self.tiles[tile]
+                rows = (self.to_int(args[4]) - self.to_int(args[2])) // 4 + 1
+                cost.tmemBytes = max(cost.tmemBytes, min((tmem + line * rows) * 8, TMEM_SIZE))
+        elif name == "DPLoadBlock":
+            loadBytes = (self.to_int(args[3]) - self.to_int(args[1]) + 1) * self.textureImageBits // 8
+            self.add_load(cost, loadBytes, math.ceil(loadBytes / RDP_LOAD_BLOCK_BYTES_PER_CYCLE))
+        elif name == "DPLoadTile":
+            width = (self.to_int(args[3]) - self.to_int(args[1])) // 4 + 1
+            height = (self.to_int(args[4]) - self.to_int(args[2])) // 4 + 1
+            loadBytes = width * height * self.textureImageBits // 8
+            self.add_load(
+                cost,
+                loadBytes,
+                math.ceil(loadBytes / RDP_LOAD_BLOCK_BYTES_PER_CYCLE) + RDP_CYCLES_PER_LOAD_TILE_ROW * height,
+            )
+        elif name == "DPLoadTLUTCmd":
+            entries = self.to_int(args[1]) + 1
+            self.add_load_tlut(cost, entries, self.tiles.get(self.to_int(args[0]), (256, 0))[0])
+        elif name in otherModeCommands:
+            cost.otherModeChanges += 1
+        elif name in combinerCommands:
+            cost.combinerChanges += 1
+        elif name == "DPPipeSync":
+            cost.pipeSyncs += 1
+            cost.rdpCycles += RDP_CYCLES_PER_PIPE_SYNC
+        elif name == "DPLoadSync":
+            cost.loadSyncs += 1
+            cost.rdpCycles += RDP_CYCLES_PER_LOAD_SYNC
+        elif name == "DPTileSync":
+            cost.tileSyncs += 1
+            cost.rdpCycles += RDP_CYCLES_PER_TILE_SYNC
+
+    def add_load_tlut(self, cost: DLCost, entries: int, tmem: int):
+        # palettes are quadricated in TMEM, each entry takes 8 bytes
+        self.add_load(cost, entries * 2, RDP_CYCLES_PER_TLUT_ENTRY * entries, tmem * 8 + entries * 8)
+
+    def add_load_macro(self, cost: DLCost, name: str, args: list):
+        if name.startswith("DPLoadTLUT"):
+            if name == "DPLoadTLUT_pal16":
+                entries, tmem = 16, 256 + self.to_int(args[0]) * 16
+            elif name == "DPLoadTLUT_pal256":
+                entries, tmem = 256, 256
+            else:
+                entries, tmem = self.to_int(args[0]), self.to_int(args[1], 256)
+            self.add_load_tlut(cost, entries, tmem)
+            return
+
+        bits = 4 if name.endswith("_4b") else self.texel_bits(args[2])
+        if name.startswith("DPLoadTextureTile"):
+            width = self.to_int(args[7]) - self.to_int(args[5]) + 1
+            height = self.to_int(args[8]) - self.to_int(args[6]) + 1
+            extraCycles = RDP_CYCLES_PER_LOAD_TILE_ROW * height
+        else:
+            width, height = self.to_int(args[3]), self.to_int(args[4])
+            extraCycles = 0
+        loadBytes = width * height * bits // 8
+        self.add_load(cost, loadBytes, math.ceil(loadBytes / RDP_LOAD_BLOCK_BYTES_PER_CYCLE) + extraCycles, loadBytes)
+
+    # FModel
+
+    def add_gbi_macro(self, cost: DLCost, cmd: GbiMacro):
+        if isinstance(cmd, SPVertex):
+            args = [cmd.vertList, cmd.count, cmd.index]
+        else:
+            args = [getattr(cmd, name) for name in get_field_names(type(cmd))]
+        self.add_command(cost, type(cmd).__name__, args)
+
+    def walk_gfx_list(self, gfxList: GfxList, cost: DLCost, depth: int = 0):
+        if depth > 32:
+            raise PluginError(f"Display list {gfxList.name} is nested too deeply, it may be recursive.")
+        for cmd in gfxList.commands:
+            self.add_gbi_macro(cost, cmd)
+            if isinstance(cmd, (SPDisplayList, SPBranchList)) and isinstance(cmd.displayList, GfxList):
+                self.walk_gfx_list(cmd.displayList, cost, depth + 1)
+            if isinstance(cmd, (SPBranchList, SPEndDisplayList)):
+                break
+
+    def analyze_fmesh(self, fMesh: FMesh, materialNames: dict[int, str]):
+        """
+        Attributes the cost of a mesh to its materials. Commands in the draw list itself (inlined materials, reverts)
+        are added to the next material called, or to the last one at the end of the list.
+        """
+
+        triMaterialNames = dict(materialNames)
+        for triGroup in fMesh.triangleGroups:
+            matName = triGroup.fMaterial.material.name.removeprefix("mat_")
+            for triList in [triGroup.triList] + triGroup.celTriLists:
+                triMaterialNames[id(triList)] = matName
+
+        pending = DLCost(fMesh.name, "")
+        current: Optional[DLCost] = None
+        for cmd in fMesh.draw.commands:
+            calledList = cmd.displayList if isinstance(cmd, (SPDisplayList, SPBranchList)) else None
+            matName = triMaterialNames.get(id(calledList)) if isinstance(calledList, GfxList) else None
+            if matName is not None:
+                current = self.get_row(fMesh.name, matName)
+                current.add(pending)
+                pending = DLCost(fMesh.name, "")
+
+            cost = current if matName is not None else pending
+            self.add_gbi_macro(cost, cmd)
+            if isinstance(calledList, GfxList):
+                self.walk_gfx_list(calledList, cost, 1)
+
+        if pending.commands > 0:
+            (current if current is not None else self.get_row(fMesh.name, "<no material>")).add(pending)
+
+    def analyze_fmodel(self, fModel: FModel):
+        materialNames: dict[int, str] = {}
+        model = fModel
+        while model is not None:
+            for fMaterial, _ in model.materials.values():
+                matName = fMaterial.material.name.removeprefix("mat_")
+                for gfxList in (fMaterial.material, fMaterial.mat_only_DL, fMaterial.texture_DL, fMaterial.revert):
+                    if gfxList is not None:
+                        materialNames[id(gfxList)] = matName
+            model = model.parentModel
+
+        for fMesh in fModel.meshes.values():
+            self.analyze_fmesh(fMesh, materialNames)
+        for subModel in fModel.subModels:
+            self.analyze_fmodel(subModel)
+
+    # C display lists, see f3d_parser.py
+
+    def walk_parsed_dl(self, dlData: str, dlName: str, owner: str, parsedDLs: dict[str, list[ParsedMacro]], depth=0):
+        if depth > 32:
+            raise PluginError(f"Display list {dlName} is nested too deeply, it may be recursive.")
+        if dlName not in parsedDLs:
+            parsedDLs[dlName] = parseDLData(dlData, dlName)
+
+        cost = self.get_row(owner, dlName)
+        for command in parsedDLs[dlName]:
+            name = command.name.removeprefix("gs")
+            params = command.params
+            if name in {"DPLoadTextureBlock_4b", "DPLoadTextureTile_4b"}:
+                # the C macros have no siz argument, insert it like F3DContext does to match the GbiMacro fields
+                params = params[:2] + ["G_IM_SIZ_4b"] + params[2:]
+            self.add_command(cost, name, params)
+            if name in {"SPDisplayList", "SPBranchList"}:
+                calledName = command.params[0].removeprefix("&")
+                if re.search(r"Gfx\s*" + re.escape(calledName) + r"\s*\[", dlData) is not None:
+                    self.walk_parsed_dl(dlData, calledName, owner, parsedDLs, depth + 1)
+            if name in {"SPBranchList", "SPEndDisplayList"}:
+                break
+
+    def analyze_parsed_dl(self, dlData: str, dlName: str):
+        """Analyzes a C display list and the lists it calls in the same data, one row per display list"""
+
+        self.walk_parsed_dl(dlData, dlName, dlName, {})
+
+    # Report
+
+    def get_sorted_rows(self, sortKey: str):
+        if sortKey == "name":
+            return sorted(self.rows.values(), key=lambda row: (row.owner, row.name))
+        return sorted(self.rows.values(), key=lambda row: getattr(row, sortKey), reverse=True)
+
+    def get_row_values(self, row: DLCost):
+        return [
+            str(round(getattr(row, attr))) if attr is not None else f"{row.loadSyncs}/{row.tileSyncs}"
+            for _, attr in self.columns
+        ]
+
+    def to_table(self, sortKey: str):
+        total = DLCost("Total", "")
+        for row in self.rows.values():
+            total.add(row)
+
+        header = ["Object", "Material / DL"] + [title for title, _ in self.columns]
+        lines = [[row.owner, row.name] + self.get_row_values(row) for row in self.get_sorted_rows(sortKey)]
+        lines.append([total.owner, total.name] + self.get_row_values(total))
+
+        widths = [max(len(line[i]) for line in [header] + lines) for i in range(len(header))]
+        formatLine = lambda line: "  ".join(
+            value.ljust(width) if i < 2 else value.rjust(width) for i, (value, width) in enumerate(zip(line, widths))
+        )
+        return "\n".join([formatLine(header)] + [formatLine(line) for line in lines])
+
+    def write_report(self, title: str, sortKey: str):
+        """Prints the table and writes it to a text datablock, returns the text's name"""
+
+        table = f"{title}\n{self.to_table(sortKey)}\n"
+        print(table)
+        textName = "fast64_dl_cost.txt"
+        text = bpy.data.texts.get(textName)
+        if text is None:
+            text = bpy.data.texts.new(textName)
+        text.from_string(table)
+        return textName
+
+
+class F3D_AnalyzeDLCost(bpy.types.Operator):
+    bl_idname = "object.f3d_analyze_dl_cost"
+    bl_label = "Analyze Display List Cost"
+    bl_description = (
+        "Converts the selected object like the F3D exporter without writing files, "
+        "and estimates the cost of its display lists per material"
+    )
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        if context.mode != "OBJECT":
+            bpy.ops.object.mode_set(mode="OBJECT")
+        obj = None
+        try:
+            if len(context.selected_objects) == 0:
+                raise PluginError("No objects selected.")
+            obj = context.selected_objects[0]
+            if obj.type != "MESH":
+                raise PluginError("Object is not a mesh.")
+
+            scaleValue = context.scene.blenderF3DScale
+            finalTransform = mathutils.Matrix.Diagonal(mathutils.Vector((scaleValue, scaleValue, scaleValue))).to_4x4()
+            applyRotation([obj], math.radians(90), "X")
+            try:
+                inline = context.scene.exportInlineF3D
+                matWriteMethod = getWriteMethodFromEnum(context.scene.matWriteMethod)
+                name = toAlnum(context.scene.DLName)
+                fModel = FModel(name, DLFormat.Static, matWriteMethod if not inline else GfxMatWriteMethod.WriteAll)
+                fMeshes = exportF3DCommon(obj, fModel, finalTransform, True, name, DLFormat.Static, False)
+                if inline:
+                    BleedGraphics().bleed_fModel(fModel, fMeshes)
+            finally:
+                applyRotation([obj], math.radians(-90), "X")
+
+            analyzer = DLCostAnalyzer(fModel.f3d)
+            analyzer.analyze_fmodel(fModel)
+            textName = analyzer.write_report(f"Display list cost of {obj.name}", context.scene.DLCostSortKey)
+            self.report({"INFO"}, f"Display list cost written to the text {textName}.")
+            return {"FINISHED"}
+
+        except Exception as e:
+            if context.mode != "OBJECT":
+                bpy.ops.object.mode_set(mode="OBJECT")
+            raisePluginError(self, e)
+            return {"CANCELLED"}
+
+
+class F3D_AnalyzeImportedDLCost(bpy.types.Operator):
+    bl_idname = "object.f3d_analyze_imported_dl_cost"
+    bl_label = "Analyze Display List Cost"
+    bl_description = "Estimates the cost of the display list to import and the lists it calls, without importing it"
+    bl_options = {"REGISTER"}
+
+    def execute(self, context):
+        try:
+            name = context.scene.DLImportName
+            data = getImportData([bpy.path.abspath(context.scene.DLImportPath)])
+            if data == "":
+                raise PluginError("Import file is empty or does not exist.")
+
+            analyzer = DLCostAnalyzer(get_F3D_GBI())
+            analyzer.analyze_parsed_dl(data, name)
+            textName = analyzer.write_report(f"Display list cost of {name}", context.scene.DLCostSortKey)
+            self.report({"INFO"}, f"Display list cost written to the text {textName}.")
+            return {"FINISHED"}
+
+        except Exception as e:
+            raisePluginError(self, e)
+            return {"CANCELLED"}
+
+
+f3d_cost_analyzer_classes = (
+    F3D_AnalyzeDLCost,
+    F3D_AnalyzeImportedDLCost,
+)
+
+
+def f3d_cost_analyzer_register():
+    for cls in f3d_cost_analyzer_classes:
+        register_class(cls)
+
+    bpy.types.Scene.DLCostSortKey = bpy.props.EnumProperty(name="Sort By", items=enumDLCostSortKey)
+
+
+def f3d_cost_analyzer_unregister():
+    for cls in reversed(f3d_cost_analyzer_classes):
+        unregister_class(cls)
+
+    del bpy.types.Scene.DLCostSortKey
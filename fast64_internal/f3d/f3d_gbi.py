@@ -1,10 +1,12 @@
 # Macros are all copied over from gbi.h
 from __future__ import annotations
 
-from typing import Sequence, Union, Tuple
+from typing import Sequence, Union, Tuple, Optional
 from dataclasses import dataclass, fields, field
-import bpy, os, enum, copy
+from contextlib import contextmanager
+import bpy, os, enum, copy, struct, functools, hashlib
 from ..utility import *
+from ..profiler import profile_stage
 
 from typing import TYPE_CHECKING
 
@@ -1793,6 +1795,7 @@ def _SHIFTL(value, amount, mask):
 MTX_SIZE = 64
 VTX_SIZE = 16
 GFX_SIZE = 8
+GFX_WORDS = struct.Struct(">II")  # the two 32 bit words of a Gfx command
 VP_SIZE = 16  # it's 16 bytes but vanilla GBI has only one s64 for alignment, not two
 LIGHT_SIZE = 16
 AMBIENT_SIZE = 8
@@ -2135,6 +2138,38 @@ class VtxList:
         return data
 
 
+class GbiExportContext:
+    """
+    Scene settings read once per export instead of once per command, the encoded binary of commands
+    that don't depend on addresses and the layout of each GfxList. Commands are no longer modified
+    while exporting, so none of these need to be invalidated within the context.
+    """
+
+    isHomebrew: Optional[bool] = None
+    binaryCache: Optional[dict[F3D, dict[GbiMacro, bytes]]] = None
+    # (GfxList, F3D) : (size, pointer offsets)
+    layoutCache: Optional[dict[tuple["GfxList", F3D], tuple[int, list[int]]]] = None
+
+
+@contextmanager
+def gbi_export_context():
+    previous = (GbiExportContext.isHomebrew, GbiExportContext.binaryCache, GbiExportContext.layoutCache)
+    if GbiExportContext.binaryCache is None:
+        GbiExportContext.isHomebrew = bpy.context.scene.gameEditorMode == "Homebrew"
+        GbiExportContext.binaryCache = {}
+        GbiExportContext.layoutCache = {}
+    try:
+        yield
+    finally:
+        GbiExportContext.isHomebrew, GbiExportContext.binaryCache, GbiExportContext.layoutCache = previous
+
+
+def is_homebrew_export():
+    if GbiExportContext.isHomebrew is not None:
+        return GbiExportContext.isHomebrew
+    return bpy.context.scene.gameEditorMode == "Homebrew"
+
+
 class GfxList:
     def __init__(self, name, tag, DLFormat):
         self.commands: list[GbiMacro] = []
@@ -2143,6 +2178,23 @@ class GfxList:
         self.tag: GfxListTag = tag
         self.DLFormat: "DLFormat" = DLFormat
 
+    def get_layout(self, f3d):
+        """Returns the size and pointer offsets of the list, computed once per export context"""
+
+        cache = GbiExportContext.layoutCache
+        if cache is not None and (self, f3d) in cache:
+            return cache[self, f3d]
+
+        size = 0
+        ptrOffsets = []
+        for command in self.commands:
+            if type(command) in F3DClassesWithPointersSet:
+                ptrOffsets.extend(size + offset for offset in command.get_ptr_offsets(f3d))
+            size += command.size(f3d)
+        if cache is not None:
+            cache[self, f3d] = (size, ptrOffsets)
+        return size, ptrOffsets
+
     def set_addr(self, startAddress, f3d):
         startAddress = get64bitAlignedAddr(startAddress)
         self.startAddress = startAddress
@@ -2155,7 +2207,7 @@ class GfxList:
         romfile.write(self.to_binary(f3d, segments))
 
     def size(self, f3d):
-        return sum([command.size(f3d) for command in self.commands])
+        return self.get_layout(f3d)[0]
 
     # Size, including display lists called with SPDisplayList
     def size_total(self, f3d):
@@ -2170,19 +2222,19 @@ class GfxList:
         )
 
     def get_ptr_addresses(self, f3d):
-        ptrs = []
-        address = self.startAddress
-        for command in self.commands:
-            if type(command) in F3DClassesWithPointers:
-                for offset in command.get_ptr_offsets(f3d):
-                    ptrs.append(address + offset)
-            address += command.size(f3d)
-        return ptrs
+        return [self.startAddress + offset for offset in self.get_layout(f3d)[1]]
 
     def to_binary(self, f3d, segments):
         data = bytearray(0)
+        cache = GbiExportContext.binaryCache.setdefault(f3d, {}) if GbiExportContext.binaryCache is not None else None
         for command in self.commands:
-            data.extend(command.to_binary(f3d, segments))
+            if cache is not None and is_binary_cacheable(type(command)):
+                encoded = cache.get(command)
+                if encoded is None:
+                    encoded = cache[command] = command.to_binary(f3d, segments)
+                data.extend(encoded)
+            else:
+                data.extend(command.to_binary(f3d, segments))
         return data
 
     def to_c_static(self):
@@ -2306,11 +2358,28 @@ class FPaletteKey:
         return hash((self.palFormat, self.imagesSharingPalette))
 
     def __eq__(self, __o: object) -> bool:
-        if not isinstance(__o, FPaletteKey):
+        if type(__o) is not type(self):
             return False
         return self.palFormat == __o.palFormat and self.imagesSharingPalette == __o.imagesSharingPalette
 
 
+class FSharedPaletteKey(FPaletteKey):
+    """Key of a palette shared by the CI textures of several images, see CIPaletteSharing"""
+
+    def __init__(self, palFormat: str, texFormat: str, index: int):
+        super().__init__(palFormat)
+        self.texFormat = texFormat
+        self.index = index
+
+    def __hash__(self) -> int:
+        return hash((self.palFormat, self.texFormat, self.index))
+
+    def __eq__(self, __o: object) -> bool:
+        if type(__o) is not type(self):
+            return False
+        return self.palFormat == __o.palFormat and self.texFormat == __o.texFormat and self.index == __o.index
+
+
 class FModel:
     def __init__(
         self,
@@ -2323,6 +2392,16 @@ class FModel:
         self.lights: dict[str, Lights] = {}
         # dict of (texture, (texture format, palette format)) : FImage
         self.textures: dict[Union[FImageKey, FPaletteKey], FImage] = {}
+        # dict of texture key : key of the texture with identical data used instead
+        self.textureAliases: dict[Union[FImageKey, FPaletteKey], Union[FImageKey, FPaletteKey]] = {}
+        # dict of (format, size, dimensions, data hash) : texture key, see deduplicateTexture
+        self.texturesByData: dict[tuple, Union[FImageKey, FPaletteKey]] = {}
+        self.deduplicatedTextures: int = 0
+        self.deduplicatedTextureBytes: int = 0
+        # CIPaletteSharing of the root model, when sharing CI palettes
+        self.ciPaletteSharing = None
+        # TextureQuantizer of the root model, when converting RGBA textures to CI
+        self.textureQuantizer = None
         # dict of (material, drawLayer, FAreaData): (FMaterial, (width, height))
         self.materials: dict[Tuple[bpy.types.Material, str, FAreaData], Tuple[FMaterial, Tuple[int, int]]] = {}
         # dict of body part name : FMesh
@@ -2340,6 +2419,8 @@ class FModel:
         self.DLFormat: "DLFormat" = DLFormat
         self.matWriteMethod: GfxMatWriteMethod = matWriteMethod
         self.no_light_direction = False
+        # Replace eligible vertex UV scrolls by tile scrolls, for games whose formatter writes both
+        self.convertVertexScroll = False
         self.global_data: FGlobalData = FGlobalData()
         self.texturesSavedLastExport: int = 0  # hacky
 
@@ -2449,11 +2530,15 @@ class FModel:
         # Check if texture is in self
         if imageKey in self.textures:
             return self.textures[imageKey]
+        if imageKey in self.textureAliases:
+            return self.getTextureAndHandleShared(self.textureAliases[imageKey])
 
         if self.parentModel is not None:
             # Check if texture is in parent
             if imageKey in self.parentModel.textures:
                 return self.parentModel.textures[imageKey]
+            if imageKey in self.parentModel.textureAliases:
+                return self.getTextureAndHandleShared(self.parentModel.textureAliases[imageKey])
 
             # Check if texture is in siblings
             for subModel in self.parentModel.subModels:
@@ -2461,10 +2546,62 @@ class FModel:
                     fImage = subModel.textures.pop(imageKey)
                     self.parentModel.textures[imageKey] = fImage
                     return fImage
+                if imageKey in subModel.textureAliases:
+                    self.parentModel.textureAliases[imageKey] = subModel.textureAliases.pop(imageKey)
+                    return self.getTextureAndHandleShared(imageKey)
             return None
         else:
             return None
 
+    def getRootModel(self):
+        model = self
+        while model.parentModel is not None:
+            model = model.parentModel
+        return model
+
+    def deduplicateTexture(self, key: Union[FImageKey, FPaletteKey], fImage: FImage) -> FImage:
+        """
+        Called once a texture of this model is converted. If another texture of the model was converted to the
+        same data (e.g. duplicated images, the same png in two folders), ``key`` becomes an alias of it
+        and the returned texture should be referenced instead.
+        """
+
+        if not fImage.converted or self.textures.get(key) is not fImage:
+            return fImage
+
+        dataKey = (
+            fImage.fmt,
+            fImage.bitSize,
+            fImage.width,
+            fImage.height,
+            fImage.isLargeTexture,
+            hashlib.sha1(fImage.data).digest(),
+        )
+        existingKey = self.texturesByData.get(dataKey)
+        existing = self.textures.get(existingKey) if existingKey is not None else None
+        if existing is None or existing is fImage or existing.data != fImage.data:
+            self.texturesByData[dataKey] = key
+            return fImage
+
+        self.textures.pop(key)
+        self.textureAliases[key] = existingKey
+
+        rootModel = self.getRootModel()
+        rootModel.deduplicatedTextures += 1
+        rootModel.deduplicatedTextureBytes += get64bitAlignedAddr(fImage.size())
+        return existing
+
+    def printTextureReport(self):
+        if self.deduplicatedTextures > 0:
+            print(
+                f"{self.name}: {self.deduplicatedTextures} textures/palettes reuse identical data, "
+                f"{self.deduplicatedTextureBytes} bytes saved"
+            )
+        if self.ciPaletteSharing is not None:
+            self.ciPaletteSharing.print_report()
+        if self.textureQuantizer is not None:
+            self.textureQuantizer.print_report()
+
     def getLightAndHandleShared(self, lightName):
         # Check if light is in self
         if lightName in self.lights:
@@ -2521,6 +2658,7 @@ class FModel:
             materials.update(subModel.getAllMaterials())
         return materials
 
+    @gbi_export_context()
     def get_ptr_addresses(self, f3d):
         addresses = []
         for name, lod in self.LODGroups.items():
@@ -2533,7 +2671,10 @@ class FModel:
             addresses.extend(self.materialRevert.get_ptr_addresses(f3d))
         return addresses
 
+    @gbi_export_context()
     def set_addr(self, startAddress):
+        if self.parentModel is None:
+            self.printTextureReport()
         addrRange = (startAddress, startAddress)
         startAddrSet = False
         for name, lod in self.LODGroups.items():
@@ -2575,6 +2716,7 @@ class FModel:
                 startAddress = addrRange[0]
         return startAddress, addrRange[1]
 
+    @gbi_export_context()
     def save_binary(self, romfile, segments):
         for name, light in self.lights.items():
             light.save_binary(romfile)
@@ -2622,6 +2764,8 @@ class FModel:
             data.append(self.materialRevert.to_c(self.f3d))
         return data
 
+    @profile_stage("C Generation", item=lambda self, *args: self.name)
+    @gbi_export_context()
     def to_c(self, textureExportSettings: TextureExportSettings, gfxFormatter: GfxFormatter):
         texCSeparate = textureExportSettings.texCSeparate
         savePNG = textureExportSettings.savePNG
@@ -2659,6 +2803,8 @@ class FModel:
             self.texturesSavedLastExport = self.save_textures(textureExportSettings.exportPath)
 
         self.freePalettes()
+        if self.parentModel is None:
+            self.printTextureReport()
         return ExportCData(staticData, dynamicData, texC)
 
     def to_c_scroll(self, funcName: str, gfxFormatter: GfxFormatter) -> CScrollData:
@@ -2682,6 +2828,8 @@ class FModel:
 
     def to_c_vertex_scroll(self, gfxFormatter: GfxFormatter) -> CScrollData:
         data = CScrollData()
+        # dict of converted material name : vertex writes per frame
+        convertedScrolls: dict[str, int] = {}
         for _, mesh in self.meshes.items():
             mesh: FMesh
             for triGroup in mesh.triangleGroups:
@@ -2690,7 +2838,18 @@ class FModel:
                         triGroup.fMaterial, triGroup.vertexList.name, len(triGroup.vertexList.vertices)
                     )
                 )
-
+                axes = triGroup.fMaterial.scrollData.convertedVertexScrollAxes
+                if axes > 0:
+                    name = triGroup.fMaterial.material.name
+                    convertedScrolls[name] = convertedScrolls.get(name, 0) + axes * len(triGroup.vertexList.vertices)
+
+        if len(convertedScrolls) > 0:
+            print(
+                f"{self.name}: converted the vertex scrolling of {len(convertedScrolls)} materials to tile scrolling, "
+                f"{sum(convertedScrolls.values())} vertex writes per frame eliminated"
+            )
+            for name, writes in convertedScrolls.items():
+                print(f"\t{name}: {writes} vertex writes")
         return data
 
     def to_c_gfx_scroll(self, gfxFormatter: GfxFormatter) -> CScrollData:
@@ -2989,6 +3148,8 @@ class FScrollData:
         self.dimensions = [0, 0]
         self.tile_scroll_tex0 = FSetTileSizeScrollField()
         self.tile_scroll_tex1 = FSetTileSizeScrollField()
+        # Number of vertex scroll axes replaced by tile scrolling, see convertVertexScrollToTileScroll
+        self.convertedVertexScrollAxes = 0
 
 
 def get_f3d_mat_from_version(material: bpy.types.Material):
@@ -3333,25 +3494,35 @@ class FImage:
 # second arg of Dma is a pointer.
 def gsDma0p(c, s, l):
     words = _SHIFTL(c, 24, 8) | _SHIFTL(l, 0, 24), int(s)
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 def gsDma1p(c, s, l, p):
     words = _SHIFTL(c, 24, 8) | _SHIFTL(p, 16, 8) | _SHIFTL(l, 0, 16), int(s)
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 def gsDma2p(c, adrs, length, idx, ofs):
     words = _SHIFTL(c, 24, 8) | _SHIFTL((length - 1) / 8, 19, 5) | _SHIFTL(ofs / 8, 8, 8) | _SHIFTL(idx, 0, 8), int(
         adrs
     )
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 def gsSPNoOp(f3d):
     return gsDma0p(f3d.G_SPNOOP, 0, 0)
 
 
+@functools.cache
+def get_field_names(macroClass: type) -> tuple[str, ...]:
+    return tuple(field.name for field in fields(macroClass))
+
+
+def is_binary_cacheable(macroClass: type) -> bool:
+    # opt-in per class, subclasses don't inherit it since they may encode or compare differently
+    return macroClass.__dict__.get("_binary_cacheable", False)
+
+
 # base class for gbi macros
 @dataclass(unsafe_hash=True)
 class GbiMacro:
@@ -3374,15 +3545,23 @@ class GbiMacro:
     This is unannotated and will not be considered when calculating the hash.
     """
 
+    _binary_cacheable = False
+    """
+    Set on commands whose binary only depends on their fields and the microcode (no addresses),
+    their encoding is then reused for equal commands during an export. Equality must cover every field
+    the command is encoded from, so only set it on dataclasses without a custom __eq__ or __hash__.
+    Not inherited, see is_binary_cacheable.
+    """
+
     def get_ptr_offsets(self, f3d):
         return [4]
 
     def getargs(self, static):
-        return (self.getattr_virtual(getattr(self, field.name), static) for field in fields(self))
+        return (self.getattr_virtual(getattr(self, name), static) for name in get_field_names(type(self)))
 
     def getattr_virtual(self, field, static):
         if hasattr(field, "name"):
-            if self._segptrs and not static and bpy.context.scene.gameEditorMode == "Homebrew":
+            if self._segptrs and not static and is_homebrew_export():
                 return f"segmented_to_virtual({field.name})"
             if self._ptr_amp:
                 return f"&{field.name}"
@@ -3409,6 +3588,7 @@ class GbiMacro:
 class SPMatrix(GbiMacro):
     matrix: int
     param: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         matPtr = int(self.matrix, 16)
@@ -3442,7 +3622,7 @@ class SPVertex(GbiMacro):
                 vertPtr,
             )
 
-            return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+            return GFX_WORDS.pack(*words)
 
         elif f3d.F3DEX_GBI or f3d.F3DLP_GBI:
             return gsDma1p(f3d.G_VTX, vertPtr, (self.count << 10) | (VTX_SIZE * self.count - 1), self.index * 2)
@@ -3452,7 +3632,7 @@ class SPVertex(GbiMacro):
 
     def to_c(self, static=True):
         header = "gsSPVertex(" if static else "gSPVertex(glistp++, "
-        if not static and bpy.context.scene.gameEditorMode == "Homebrew":
+        if not static and is_homebrew_export():
             header += "segmented_to_virtual(" + self.vertList.name + " + " + str(self.offset) + ")"
         else:
             header += self.vertList.name + " + " + str(self.offset)
@@ -3490,7 +3670,7 @@ class SPDisplayList(GbiMacro):
             return "gsSPDisplayList(" + self.displayList.name + ")"
         elif self.displayList.DLFormat == DLFormat.Static:
             header = "gSPDisplayList(glistp++, "
-            if bpy.context.scene.gameEditorMode == "Homebrew":
+            if is_homebrew_export():
                 return header + "segmented_to_virtual(" + self.displayList.name + "))"
             else:
                 return header + self.displayList.name + ")"
@@ -3510,9 +3690,11 @@ class SPBranchList(GbiMacro):
 
 @dataclass(unsafe_hash=True)
 class SPEndDisplayList(GbiMacro):
+    _binary_cacheable = True
+
     def to_binary(self, f3d, segments):
         words = _SHIFTL(f3d.G_ENDDL, 24, 8), 0
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return GFX_WORDS.pack(*words)
 
 
 # SPSprite2DBase
@@ -3521,28 +3703,28 @@ class SPEndDisplayList(GbiMacro):
 # RSP short command (no DMA required) macros
 def gsImmp0(c):
     words = _SHIFTL((c), 24, 8), 0
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 def gsImmp1(c, p0):
     words = _SHIFTL((c), 24, 8), int(p0)
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 def gsImmp2(c, p0, p1):
     words = _SHIFTL((c), 24, 8), _SHIFTL((p0), 16, 16) | _SHIFTL((p1), 8, 8)
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 def gsImmp3(c, p0, p1, p2):
     words = _SHIFTL((c), 24, 8), (_SHIFTL((p0), 16, 16) | _SHIFTL((p1), 8, 8) | _SHIFTL((p2), 0, 8))
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 # last arg of Immp21 is a pointer.
 def gsImmp21(c, p0, p1, dat):
     words = _SHIFTL((c), 24, 8) | _SHIFTL((p0), 8, 16) | _SHIFTL((p1), 0, 8), int(dat)
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 def gsMoveWd(index, offset, data, f3d):
@@ -3625,6 +3807,7 @@ class SP1Triangle(GbiMacro):
     v1: int
     v2: int
     flag: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if f3d.F3DEX_GBI_2:
@@ -3632,7 +3815,7 @@ class SP1Triangle(GbiMacro):
         else:
             words = _SHIFTL(f3d.G_TRI1, 24, 8), _gsSP1Triangle_w1f(self.v0, self.v1, self.v2, self.flag, f3d)
 
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return GFX_WORDS.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -3640,6 +3823,7 @@ class SPLine3D(GbiMacro):
     v0: int
     v1: int
     flag: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if f3d.F3DEX_GBI_3:
@@ -3648,7 +3832,7 @@ class SPLine3D(GbiMacro):
             words = _SHIFTL(f3d.G_LINE3D, 24, 8) | _gsSPLine3D_w1f(self.v0, self.v1, 0, self.flag, f3d), 0
         else:
             words = _SHIFTL(f3d.G_LINE3D, 24, 8), _gsSPLine3D_w1f(self.v0, self.v1, 0, self.flag, f3d)
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return GFX_WORDS.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -3657,6 +3841,7 @@ class SPLineW3D(GbiMacro):
     v1: int
     wd: int
     flag: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if f3d.F3DEX_GBI_3:
@@ -3665,7 +3850,7 @@ class SPLineW3D(GbiMacro):
             words = _SHIFTL(f3d.G_LINE3D, 24, 8) | _gsSPLine3D_w1f(self.v0, self.v1, self.wd, self.flag, f3d), 0
         else:
             words = _SHIFTL(f3d.G_LINE3D, 24, 8), _gsSPLine3D_w1f(self.v0, self.v1, self.wd, self.flag, f3d)
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return GFX_WORDS.pack(*words)
 
 
 # SP1Quadrangle
@@ -3681,6 +3866,7 @@ class SP2Triangles(GbiMacro):
     v11: int
     v12: int
     flag1: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if f3d.F3DLP_GBI or f3d.F3DEX_GBI:
@@ -3690,7 +3876,7 @@ class SP2Triangles(GbiMacro):
         else:
             raise PluginError("SP2Triangles not available in Fast3D.")
 
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return GFX_WORDS.pack(*words)
 
 
 # F3DEX3 TODO: Encoding of _g*SP5Triangles commands (SPTriangleStrip, SPTriangleFan)
@@ -3701,19 +3887,21 @@ class SP2Triangles(GbiMacro):
 class SPCullDisplayList(GbiMacro):
     vstart: int
     vend: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if f3d.F3DLP_GBI or f3d.F3DEX_GBI:
             words = _SHIFTL(f3d.G_CULLDL, 24, 8) | _SHIFTL((self.vstart) * 2, 0, 16), _SHIFTL((self.vend) * 2, 0, 16)
         else:
             words = _SHIFTL(f3d.G_CULLDL, 24, 8) | ((0x0F & (self.vstart)) * 40), ((0x0F & ((self.vend) + 1)) * 40)
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return GFX_WORDS.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
 class SPSegment(GbiMacro):
     segment: int
     base: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         return gsMoveWd(f3d.G_MW_SEGMENT, (self.segment) * 4, self.base, f3d)
@@ -3726,6 +3914,7 @@ class SPSegment(GbiMacro):
 @dataclass(unsafe_hash=True)
 class SPClipRatio(GbiMacro):
     ratio: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if f3d.F3DEX_GBI_3:
@@ -3754,6 +3943,7 @@ class SPClipRatio(GbiMacro):
 class SPAmbOcclusionAmb(GbiMacro):
     amb: int
     _hex = 4
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if not f3d.F3DEX_GBI_3:
@@ -3765,6 +3955,7 @@ class SPAmbOcclusionAmb(GbiMacro):
 class SPAmbOcclusionDir(GbiMacro):
     dir: int
     _hex = 4
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if not f3d.F3DEX_GBI_3:
@@ -3776,6 +3967,7 @@ class SPAmbOcclusionDir(GbiMacro):
 class SPAmbOcclusionPoint(GbiMacro):
     point: int
     _hex = 4
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if not f3d.F3DEX_GBI_3:
@@ -3788,6 +3980,7 @@ class SPAmbOcclusionAmbDir(GbiMacro):
     amb: int
     dir: int
     _hex = 4
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if not f3d.F3DEX_GBI_3:
@@ -3800,6 +3993,7 @@ class SPAmbOcclusionDirPoint(GbiMacro):
     dir: int
     point: int
     _hex = 4
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if not f3d.F3DEX_GBI_3:
@@ -3831,6 +4025,7 @@ class SPAmbOcclusion(GbiMacro):
 class SPFresnelScale(GbiMacro):
     scale: int
     _hex = 4
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if not f3d.F3DEX_GBI_3:
@@ -3842,6 +4037,7 @@ class SPFresnelScale(GbiMacro):
 class SPFresnelOffset(GbiMacro):
     offset: int
     _hex = 4
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if not f3d.F3DEX_GBI_3:
@@ -3854,6 +4050,7 @@ class SPFresnel(GbiMacro):
     scale: int
     offset: int
     _hex = 4
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if not f3d.F3DEX_GBI_3:
@@ -3868,6 +4065,7 @@ class SPAttrOffsetST(GbiMacro):
     s: int
     t: int
     _hex = 4
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if not f3d.F3DEX_GBI_3:
@@ -3879,6 +4077,7 @@ class SPAttrOffsetST(GbiMacro):
 class SPAttrOffsetZ(GbiMacro):
     z: int
     _hex = 4
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if not f3d.F3DEX_GBI_3:
@@ -3890,6 +4089,7 @@ class SPAttrOffsetZ(GbiMacro):
 class SPAlphaCompareCull(GbiMacro):
     mode: str
     thresh: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if not f3d.F3DEX_GBI_3:
@@ -3908,6 +4108,7 @@ class SPAlphaCompareCull(GbiMacro):
 @dataclass(unsafe_hash=True)
 class SPNormalsMode(GbiMacro):
     mode: str
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if not f3d.F3DEX_GBI_3:
@@ -3929,6 +4130,7 @@ class SPModifyVertex(GbiMacro):
     vtx: int
     where: int
     val: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if f3d.F3DLP_GBI or f3d.F3DEX_GBI:
@@ -3936,7 +4138,7 @@ class SPModifyVertex(GbiMacro):
                 _SHIFTL(f3d.G_MODIFYVTX, 24, 8) | _SHIFTL((self.where), 16, 8) | _SHIFTL((self.vtx) * 2, 0, 16),
                 self.val,
             )
-            return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+            return GFX_WORDS.pack(*words)
         else:
             return gsMoveWd(f3d.G_MW_POINTS, (self.vtx) * 40 + (self.where), self.val, f3d)
 
@@ -3984,6 +4186,7 @@ class SPBranchLessZraw(GbiMacro):
 class SPNumLights(GbiMacro):
     # n is macro name (string)
     n: str
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         return gsMoveWd(f3d.G_MW_NUMLIGHT, f3d.G_MWO_NUMLIGHT, f3d.NUML(self.n), f3d)
@@ -4081,7 +4284,7 @@ class SPSetLights(GbiMacro):
     def to_c(self, static=True):
         n = len(self.lights.l)
         header = f"gsSPSetLights{n}(" if static else f"gSPSetLights{n}(glistp++, "
-        if not static and bpy.context.scene.gameEditorMode == "Homebrew":
+        if not static and is_homebrew_export():
             header += f"(*(Lights{n}*) segmented_to_virtual(&{self.lights.name}))"
         else:
             header += self.lights.name
@@ -4166,6 +4369,7 @@ class DPSetHilite2Tile(GbiMacro):
 class SPFogFactor(GbiMacro):
     fm: int
     fo: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         return gsMoveWd(f3d.G_MW_FOG, f3d.G_MWO_FOG, (_SHIFTL(self.fm, 16, 16) | _SHIFTL(self.fo, 0, 16)), f3d)
@@ -4199,6 +4403,7 @@ class SPTexture(GbiMacro):
     level: int
     tile: int
     on: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if f3d.F3DEX_GBI_2:
@@ -4216,7 +4421,7 @@ class SPTexture(GbiMacro):
                 | _SHIFTL((self.on), 0, 8)
             ), (_SHIFTL((self.s), 16, 16) | _SHIFTL((self.t), 0, 16))
 
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return GFX_WORDS.pack(*words)
 
 
 # SPTextureL
@@ -4225,6 +4430,7 @@ class SPTexture(GbiMacro):
 @dataclass(unsafe_hash=True)
 class SPPerspNormalize(GbiMacro):
     s: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if f3d.F3DEX_GBI_3:
@@ -4239,12 +4445,12 @@ class SPPerspNormalize(GbiMacro):
 
 def gsSPGeometryMode_F3DEX_GBI_2(c, s, f3d):
     words = (_SHIFTL(f3d.G_GEOMETRYMODE, 24, 8) | _SHIFTL(~c, 0, 24)), s
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 def gsSPGeometryMode_Non_F3DEX_GBI_2(word, f3d):
     words = _SHIFTL(f3d.G_SETGEOMETRYMODE, 24, 8), word
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 def geoFlagListToWord(flagList, f3d):
@@ -4286,7 +4492,7 @@ class SPSetGeometryMode(GbiMacro):
             return gsSPGeometryMode_F3DEX_GBI_2(0, word, f3d)
         else:
             words = _SHIFTL(f3d.G_SETGEOMETRYMODE, 24, 8), word
-            return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+            return GFX_WORDS.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -4299,7 +4505,7 @@ class SPClearGeometryMode(GbiMacro):
             return gsSPGeometryMode_F3DEX_GBI_2(word, 0, f3d)
         else:
             words = _SHIFTL(f3d.G_CLEARGEOMETRYMODE, 24, 8), word
-            return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+            return GFX_WORDS.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -4319,7 +4525,7 @@ def gsSPSetOtherMode(cmd, sft, length, data, f3d):
         words = _SHIFTL(cmd, 24, 8) | _SHIFTL(32 - (sft) - (length), 8, 8) | _SHIFTL((length) - 1, 0, 8), data
     else:
         words = _SHIFTL(cmd, 24, 8) | _SHIFTL(sft, 8, 8) | _SHIFTL(length, 0, 8), (data)
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -4342,6 +4548,7 @@ class SPSetOtherMode(GbiMacro):
 class DPPipelineMode(GbiMacro):
     # mode is a string
     mode: str
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if self.mode == "G_PM_1PRIMITIVE":
@@ -4355,6 +4562,7 @@ class DPPipelineMode(GbiMacro):
 class DPSetCycleType(GbiMacro):
     # mode is a string
     mode: str
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if self.mode == "G_CYC_1CYCLE":
@@ -4372,6 +4580,7 @@ class DPSetCycleType(GbiMacro):
 class DPSetTexturePersp(GbiMacro):
     # mode is a string
     mode: str
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if self.mode == "G_TP_NONE":
@@ -4385,6 +4594,7 @@ class DPSetTexturePersp(GbiMacro):
 class DPSetTextureDetail(GbiMacro):
     # mode is a string
     mode: str
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if self.mode == "G_TD_CLAMP":
@@ -4400,6 +4610,7 @@ class DPSetTextureDetail(GbiMacro):
 class DPSetTextureLOD(GbiMacro):
     # mode is a string
     mode: str
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if self.mode == "G_TL_TILE":
@@ -4413,6 +4624,7 @@ class DPSetTextureLOD(GbiMacro):
 class DPSetTextureLUT(GbiMacro):
     # mode is a string
     mode: str
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if self.mode == "G_TT_NONE":
@@ -4430,6 +4642,7 @@ class DPSetTextureLUT(GbiMacro):
 class DPSetTextureFilter(GbiMacro):
     # mode is a string
     mode: str
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if self.mode == "G_TF_POINT":
@@ -4445,6 +4658,7 @@ class DPSetTextureFilter(GbiMacro):
 class DPSetTextureConvert(GbiMacro):
     # mode is a string
     mode: str
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if self.mode == "G_TC_CONV":
@@ -4460,6 +4674,7 @@ class DPSetTextureConvert(GbiMacro):
 class DPSetCombineKey(GbiMacro):
     # mode is a string
     mode: str
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if self.mode == "G_CK_NONE":
@@ -4473,6 +4688,7 @@ class DPSetCombineKey(GbiMacro):
 class DPSetColorDither(GbiMacro):
     # mode is a string
     mode: str
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if self.mode == "G_CD_MAGICSQ":
@@ -4492,6 +4708,7 @@ class DPSetColorDither(GbiMacro):
 class DPSetAlphaDither(GbiMacro):
     # mode is a string
     mode: str
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if self.mode == "G_AD_PATTERN":
@@ -4509,6 +4726,7 @@ class DPSetAlphaDither(GbiMacro):
 class DPSetAlphaCompare(GbiMacro):
     # mask is a string
     mode: str
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if self.mode == "G_AC_NONE":
@@ -4524,6 +4742,7 @@ class DPSetAlphaCompare(GbiMacro):
 class DPSetDepthSource(GbiMacro):
     # src is a string
     src: str
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if self.src == "G_ZS_PIXEL":
@@ -4621,7 +4840,7 @@ class DPSetRenderMode(GbiMacro):
 
 def gsSetImage(cmd, fmt, siz, width, i):
     words = _SHIFTL(cmd, 24, 8) | _SHIFTL(fmt, 21, 3) | _SHIFTL(siz, 19, 2) | _SHIFTL((width) - 1, 0, 12), i
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 # DPSetColorImage
@@ -4645,7 +4864,7 @@ class DPSetTextureImage(GbiMacro):
 
 def gsDPSetCombine(muxs0, muxs1, f3d):
     words = _SHIFTL(f3d.G_SETCOMBINE, 24, 8) | _SHIFTL(muxs0, 0, 24), muxs1
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 def GCCc0w0(saRGB0, mRGB0, saA0, mA0):
@@ -4691,6 +4910,7 @@ class DPSetCombineMode(GbiMacro):
     Ab1: str
     Ac1: str
     Ad1: str
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         words = _SHIFTL(f3d.G_SETCOMBINE, 24, 8) | _SHIFTL(
@@ -4706,7 +4926,7 @@ class DPSetCombineMode(GbiMacro):
             ACMUXDict[self.Ab1],
             ACMUXDict[self.Ad1],
         )
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return GFX_WORDS.pack(*words)
 
     def to_c(self, static=True):
         if static:
@@ -4717,7 +4937,7 @@ class DPSetCombineMode(GbiMacro):
 
 def gsDPSetColor(c, d):
     words = _SHIFTL(c, 24, 8), d
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 def sDPRGBColor(cmd, r, g, b, a):
@@ -4730,6 +4950,7 @@ class DPSetEnvColor(GbiMacro):
     g: int
     b: int
     a: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         return sDPRGBColor(f3d.G_SETENVCOLOR, self.r, self.g, self.b, self.a)
@@ -4741,6 +4962,7 @@ class DPSetBlendColor(GbiMacro):
     g: int
     b: int
     a: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         return sDPRGBColor(f3d.G_SETBLENDCOLOR, self.r, self.g, self.b, self.a)
@@ -4752,6 +4974,7 @@ class DPSetFogColor(GbiMacro):
     g: int
     b: int
     a: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         return sDPRGBColor(f3d.G_SETFOGCOLOR, self.r, self.g, self.b, self.a)
@@ -4760,6 +4983,7 @@ class DPSetFogColor(GbiMacro):
 @dataclass(unsafe_hash=True)
 class DPSetFillColor(GbiMacro):
     d: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         return gsDPSetColor(f3d.G_SETFILLCOLOR, self.d)
@@ -4769,6 +4993,7 @@ class DPSetFillColor(GbiMacro):
 class DPSetPrimDepth(GbiMacro):
     z: int = 0
     dz: int = 0
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         return gsDPSetColor(f3d.G_SETPRIMDEPTH, _SHIFTL(self.z, 16, 16) | _SHIFTL(self.dz, 0, 16))
@@ -4782,12 +5007,13 @@ class DPSetPrimColor(GbiMacro):
     g: int
     b: int
     a: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         words = (_SHIFTL(f3d.G_SETPRIMCOLOR, 24, 8) | _SHIFTL(self.m, 8, 8) | _SHIFTL(self.l, 0, 8)), (
             _SHIFTL(self.r, 24, 8) | _SHIFTL(self.g, 16, 8) | _SHIFTL(self.b, 8, 8) | _SHIFTL(self.a, 0, 8)
         )
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return GFX_WORDS.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -4795,6 +5021,7 @@ class SPLightToRDP(GbiMacro):
     light: int
     alpha: int
     word0: int  # word0 of the command to write, which is word1 of this command
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         if not f3d.F3DEX_GBI_3:
@@ -4841,14 +5068,14 @@ class DPSetOtherMode(GbiMacro):
         for mode in self.mode1:
             mode1 |= getattr(f3d, str(mode), mode)
         words = _SHIFTL(f3d.G_RDPSETOTHERMODE, 24, 8) | _SHIFTL(mode0, 0, 24), mode1
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return GFX_WORDS.pack(*words)
 
 
 def gsDPLoadTileGeneric(c, tile, uls, ult, lrs, lrt):
     words = _SHIFTL(c, 24, 8) | _SHIFTL(uls, 12, 12) | _SHIFTL(ult, 0, 12), _SHIFTL(tile, 24, 3) | _SHIFTL(
         lrs, 12, 12
     ) | _SHIFTL(lrt, 0, 12)
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -4858,6 +5085,7 @@ class DPSetTileSize(GbiMacro):
     ult: int
     lrs: int
     lrt: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         return gsDPLoadTileGeneric(f3d.G_SETTILESIZE, self.tile, self.uls, self.ult, self.lrs, self.lrt)
@@ -4873,6 +5101,7 @@ class DPLoadTile(GbiMacro):
     ult: int
     lrs: int
     lrt: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         return gsDPLoadTileGeneric(f3d.G_LOADTILE, self.tile, self.uls, self.ult, self.lrs, self.lrt)
@@ -4913,7 +5142,7 @@ class DPSetTile(GbiMacro):
             | _SHIFTL(self.masks, 4, 4)
             | _SHIFTL(self.shifts, 0, 4)
         )
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return GFX_WORDS.pack(*words)
 
     def is_LOADTILE(self, f3d):
         return self.tile == f3d.G_TX_LOADTILE
@@ -4926,6 +5155,7 @@ class DPLoadBlock(GbiMacro):
     ult: int
     lrs: int
     dxt: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         words = (_SHIFTL(f3d.G_LOADBLOCK, 24, 8) | _SHIFTL(self.uls, 12, 12) | _SHIFTL(self.ult, 0, 12)), (
@@ -4933,17 +5163,18 @@ class DPLoadBlock(GbiMacro):
             | _SHIFTL((min(self.lrs, f3d.G_TX_LDBLK_MAX_TXL)), 12, 12)
             | _SHIFTL(self.dxt, 0, 12)
         )
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return GFX_WORDS.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
 class DPLoadTLUTCmd(GbiMacro):
     tile: int
     count: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         words = _SHIFTL(f3d.G_LOADTLUT, 24, 8), _SHIFTL((self.tile), 24, 3) | _SHIFTL((self.count), 14, 10)
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return GFX_WORDS.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -5475,12 +5706,13 @@ class DPSetConvert(GbiMacro):
     k3: int
     k4: int
     k5: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         words = (
             _SHIFTL(f3d.G_SETCONVERT, 24, 8) | _SHIFTL(self.k0, 13, 9) | _SHIFTL(self.k1, 4, 9) | _SHIFTL(self.k2, 5, 4)
         ), (_SHIFTL(self.k2, 27, 5) | _SHIFTL(self.k3, 18, 9) | _SHIFTL(self.k4, 9, 9) | _SHIFTL(self.k5, 0, 9))
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return GFX_WORDS.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -5488,12 +5720,13 @@ class DPSetKeyR(GbiMacro):
     cR: int
     sR: int
     wR: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         words = _SHIFTL(f3d.G_SETKEYR, 24, 8), _SHIFTL(self.wR, 16, 12) | _SHIFTL(self.cR, 8, 8) | _SHIFTL(
             self.sR, 0, 8
         )
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return GFX_WORDS.pack(*words)
 
 
 @dataclass(unsafe_hash=True)
@@ -5504,22 +5737,23 @@ class DPSetKeyGB(GbiMacro):
     cB: int
     sB: int
     wB: int
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         words = (_SHIFTL(f3d.G_SETKEYGB, 24, 8) | _SHIFTL(self.wG, 12, 12) | _SHIFTL(self.wB, 0, 12)), (
             _SHIFTL(self.cG, 24, 8) | _SHIFTL(self.sG, 16, 8) | _SHIFTL(self.cB, 8, 8) | _SHIFTL(self.sB, 0, 8)
         )
-        return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+        return GFX_WORDS.pack(*words)
 
 
 def gsDPNoParam(cmd):
     words = _SHIFTL(cmd, 24, 8), 0
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 def gsDPParam(cmd, param):
     words = _SHIFTL(cmd, 24, 8), (param)
-    return words[0].to_bytes(4, "big") + words[1].to_bytes(4, "big")
+    return GFX_WORDS.pack(*words)
 
 
 # gsDPTextureRectangle
@@ -5537,6 +5771,7 @@ class SPTextureRectangle(GbiMacro):
     t: int
     dsdx: int = 4 << 10
     dtdy: int = 1 << 10
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         words = (
@@ -5568,6 +5803,7 @@ class SPScisTextureRectangle(GbiMacro):
     t: int
     dsdx: int = 4 << 10
     dtdy: int = 1 << 10
+    _binary_cacheable = True
 
     def to_binary(self, f3d, segments):
         raise PluginError("SPScisTextureRectangle not implemented for binary.")
@@ -5582,24 +5818,32 @@ class SPScisTextureRectangle(GbiMacro):
 
 @dataclass(unsafe_hash=True)
 class DPFullSync(GbiMacro):
+    _binary_cacheable = True
+
     def to_binary(self, f3d, segments):
         return gsDPNoParam(f3d.G_RDPFULLSYNC)
 
 
 @dataclass(unsafe_hash=True)
 class DPTileSync(GbiMacro):
+    _binary_cacheable = True
+
     def to_binary(self, f3d, segments):
         return gsDPNoParam(f3d.G_RDPTILESYNC)
 
 
 @dataclass(unsafe_hash=True)
 class DPPipeSync(GbiMacro):
+    _binary_cacheable = True
+
     def to_binary(self, f3d, segments):
         return gsDPNoParam(f3d.G_RDPPIPESYNC)
 
 
 @dataclass(unsafe_hash=True)
 class DPLoadSync(GbiMacro):
+    _binary_cacheable = True
+
     def to_binary(self, f3d, segments):
         return gsDPNoParam(f3d.G_RDPLOADSYNC)
 
@@ -5623,3 +5867,4 @@ F3DClassesWithPointers = [
     DPLoadTLUT_pal256,
     DPLoadTLUT,
 ]
+F3DClassesWithPointersSet = set(F3DClassesWithPointers)
@@ -1,5 +1,6 @@
 import logging
 import bpy, math, os
+from types import SimpleNamespace
 from bpy.types import (
     Attribute,
     Context,
@@ -36,12 +37,30 @@ from .f3d_material_presets import *
 from ..utility import *
 from ..render_settings import Fast64RenderSettings_Properties, update_scene_props_from_render_settings
 from .f3d_material_helpers import F3DMaterial_UpdateLock, node_tree_copy
+from .f3d_tmem import getTmemWordUsage, getTmemMax, planTmem, TmemPlan, TmemTexture
 from bpy.app.handlers import persistent
 from typing import Generator, Optional, Tuple, Any, Dict, Union
 
 F3D_MAT_CUR_VERSION = 6  # Increment this when changing the nodes
 
-F3DMaterialHash = Any  # giant tuple
+
+class F3DMaterialHash(tuple):
+    """Giant tuple of material properties, its hash is only computed once since it's used as a dict key"""
+
+    def __hash__(self):
+        if "hash" not in self.__dict__:
+            self.__dict__["hash"] = tuple.__hash__(self)
+        return self.__dict__["hash"]
+
+    def __eq__(self, other):
+        # different materials usually differ in their hash, which avoids comparing the whole tuples
+        if isinstance(other, F3DMaterialHash) and hash(self) != hash(other):
+            return False
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
 
 logging.basicConfig(format="%(asctime)s: %(message)s", datefmt="%m/%d/%Y %I:%M:%S %p")
 logger = logging.getLogger(__name__)
@@ -189,9 +208,10 @@ def get_world_layer_defaults(scene, game_mode: str, layer: str):
         ), f"game_mode={game_mode} has no draw layer defaults, this function should not have been called at all with it"
 
 
-def rendermode_preset_to_advanced(material: bpy.types.Material):
+def get_rendermode_presets(material: bpy.types.Material) -> Optional[tuple[str, str, bool]]:
     """
-    Set all individual controls for the rendermode from the preset rendermode.
+    Get the preset rendermode for both cycles and whether it comes from the draw layer defaults,
+    None if the individual controls are used as they are.
     """
     scene = bpy.context.scene
     f3d_mat = material.f3d_mat
@@ -200,28 +220,26 @@ def rendermode_preset_to_advanced(material: bpy.types.Material):
 
     if settings.rendermode_advanced_enabled and settings.set_rendermode:
         # Rendermode is being set by the material and in advanced mode, don't overwrite any settings
-        return
+        return None
 
     cycle_1, cycle_2 = settings.rendermode_preset_cycle_1, settings.rendermode_preset_cycle_2
     if not settings.set_rendermode:
         game_mode = scene.gameEditorMode
         layer = getattr(f3d_mat.draw_layer, game_mode.lower(), None)
         if layer is None:  # Game mode has no layer, don´t change anything
-            return
+            return None
 
         possible_cycle_1, possible_cycle_2 = get_world_layer_defaults(scene, game_mode, layer)
         if getattr(f3d, possible_cycle_1, None) is not None and getattr(f3d, possible_cycle_2, None) is not None:
-            cycle_1, cycle_2 = possible_cycle_1, possible_cycle_2
+            return possible_cycle_1, possible_cycle_2, True
+    return cycle_1, cycle_2, False
 
-            # Some presets are not implemented in the blender enum, so print a warning and turn on advanced
-            try:
-                settings.rendermode_preset_cycle_1, settings.rendermode_preset_cycle_2 = cycle_1, cycle_2
-                settings.rendermode_advanced_enabled = False
-            except TypeError as exc:
-                print(
-                    f"Render mode presets {cycle_1} or {cycle_2} probably not included in render mode preset enum:\n{exc}",
-                )
-                settings.rendermode_advanced_enabled = True
+
+def get_preset_rendermode_settings(settings: "RDPSettings", cycle_1: str, cycle_2: str) -> dict[str, bool | str]:
+    """
+    Get the individual controls for the rendermode from the preset rendermode, without setting them.
+    """
+    f3d = get_F3D_GBI()
 
     def get_with_default(preset, default):
         # Use the material's settings even if we are not setting rendermode.
@@ -242,27 +260,68 @@ def rendermode_preset_to_advanced(material: bpy.types.Material):
         # bits to the cycle 2 slots. r2 is only read for the cycle dependent settings below.
         r2 = r >> 2
 
-    # cycle independent
-    settings.aa_en = (r & f3d.AA_EN) != 0
-    settings.z_cmp = (r & f3d.Z_CMP) != 0
-    settings.z_upd = (r & f3d.Z_UPD) != 0
-    settings.im_rd = (r & f3d.IM_RD) != 0
-    settings.clr_on_cvg = (r & f3d.CLR_ON_CVG) != 0
-    settings.cvg_dst = f3d.cvgDstDict[r & f3d.CVG_DST_SAVE]
-    settings.zmode = f3d.zmodeDict[r & f3d.ZMODE_DEC]
-    settings.cvg_x_alpha = (r & f3d.CVG_X_ALPHA) != 0
-    settings.alpha_cvg_sel = (r & f3d.ALPHA_CVG_SEL) != 0
-    settings.force_bl = (r & f3d.FORCE_BL) != 0
-
-    # cycle dependent / lerp
-    settings.blend_p1 = f3d.blendColorDict[(r1 >> 30) & 3]
-    settings.blend_p2 = f3d.blendColorDict[(r2 >> 28) & 3]
-    settings.blend_a1 = f3d.blendAlphaDict[(r1 >> 26) & 3]
-    settings.blend_a2 = f3d.blendAlphaDict[(r2 >> 24) & 3]
-    settings.blend_m1 = f3d.blendColorDict[(r1 >> 22) & 3]
-    settings.blend_m2 = f3d.blendColorDict[(r2 >> 20) & 3]
-    settings.blend_b1 = f3d.blendMixDict[(r1 >> 18) & 3]
-    settings.blend_b2 = f3d.blendMixDict[(r2 >> 16) & 3]
+    return {
+        # cycle independent
+        "aa_en": (r & f3d.AA_EN) != 0,
+        "z_cmp": (r & f3d.Z_CMP) != 0,
+        "z_upd": (r & f3d.Z_UPD) != 0,
+        "im_rd": (r & f3d.IM_RD) != 0,
+        "clr_on_cvg": (r & f3d.CLR_ON_CVG) != 0,
+        "cvg_dst": f3d.cvgDstDict[r & f3d.CVG_DST_SAVE],
+        "zmode": f3d.zmodeDict[r & f3d.ZMODE_DEC],
+        "cvg_x_alpha": (r & f3d.CVG_X_ALPHA) != 0,
+        "alpha_cvg_sel": (r & f3d.ALPHA_CVG_SEL) != 0,
+        "force_bl": (r & f3d.FORCE_BL) != 0,
+        # cycle dependent / lerp
+        "blend_p1": f3d.blendColorDict[(r1 >> 30) & 3],
+        "blend_p2": f3d.blendColorDict[(r2 >> 28) & 3],
+        "blend_a1": f3d.blendAlphaDict[(r1 >> 26) & 3],
+        "blend_a2": f3d.blendAlphaDict[(r2 >> 24) & 3],
+        "blend_m1": f3d.blendColorDict[(r1 >> 22) & 3],
+        "blend_m2": f3d.blendColorDict[(r2 >> 20) & 3],
+        "blend_b1": f3d.blendMixDict[(r1 >> 18) & 3],
+        "blend_b2": f3d.blendMixDict[(r2 >> 16) & 3],
+    }
+
+
+def get_rendermode_settings(material: bpy.types.Material) -> Union["RDPSettings", SimpleNamespace]:
+    """
+    Get the individual controls for the rendermode as rendermode_preset_to_advanced would set them,
+    without modifying the material.
+    """
+    settings = material.f3d_mat.rdp_settings
+    presets = get_rendermode_presets(material)
+    if presets is None:
+        return settings
+    return SimpleNamespace(
+        g_mdsft_cycletype=settings.g_mdsft_cycletype,
+        **get_preset_rendermode_settings(settings, presets[0], presets[1]),
+    )
+
+
+def rendermode_preset_to_advanced(material: bpy.types.Material):
+    """
+    Set all individual controls for the rendermode from the preset rendermode.
+    """
+    settings = material.f3d_mat.rdp_settings
+
+    presets = get_rendermode_presets(material)
+    if presets is None:
+        return
+    cycle_1, cycle_2, is_layer_default = presets
+    if is_layer_default:
+        # Some presets are not implemented in the blender enum, so print a warning and turn on advanced
+        try:
+            settings.rendermode_preset_cycle_1, settings.rendermode_preset_cycle_2 = cycle_1, cycle_2
+            settings.rendermode_advanced_enabled = False
+        except TypeError as exc:
+            print(
+                f"Render mode presets {cycle_1} or {cycle_2} probably not included in render mode preset enum:\n{exc}",
+            )
+            settings.rendermode_advanced_enabled = True
+
+    for name, value in get_preset_rendermode_settings(settings, cycle_1, cycle_2).items():
+        setattr(settings, name, value)
 
 
 def does_blender_use_mix(settings: "RDPSettings", mix: str, default_for_no_rendermode: bool = False) -> bool:
@@ -301,7 +360,10 @@ def is_blender_doing_fog(settings: "RDPSettings") -> bool:
 
 def get_output_method(material: bpy.types.Material) -> str:
     rendermode_preset_to_advanced(material)  # Make sure advanced settings are updated
-    settings = material.f3d_mat.rdp_settings
+    return get_settings_output_method(material.f3d_mat.rdp_settings)
+
+
+def get_settings_output_method(settings: "RDPSettings") -> str:
     if settings.cvg_x_alpha:
         return "CLIP"
     if settings.force_bl and is_blender_equation_equal(
@@ -336,13 +398,39 @@ class DrawLayerProperty(PropertyGroup):
         return (self.sm64, self.oot)
 
 
-def getTmemWordUsage(texFormat, width, height):
-    texelsPerWord = 64 // texBitSizeInt[texFormat]
-    return (width + texelsPerWord - 1) // texelsPerWord * height
+def getMaterialTmemPlan(material: Material) -> TmemPlan:
+    """TMEM layout of the textures of a material, assuming the largest palettes since colors aren't counted here"""
+
+    f3dMat = material.f3d_mat
+    useDict = all_combiner_uses(f3dMat)
+    textures: list[TmemTexture] = []
+    for index in range(2):
+        texProp = getattr(f3dMat, f"tex{index}")
+        if not useDict[f"Texture {index}"] or not texProp.tex_set:
+            continue
+        if texProp.use_tex_reference:
+            width, height = texProp.tex_reference_size
+        elif texProp.tex is not None:
+            width, height = texProp.tex.size
+        else:
+            continue
+        if width > 0 and height > 0:
+            textures.append(TmemTexture(index, texProp.tex_format, width, height))
 
+    ciTextures = [tex for tex in textures if tex.isCI]
+    if len(ciTextures) == 2 and ciTextures[0].texFormat == ciTextures[1].texFormat == "CI4":
+        ciTextures[0].palLen = ciTextures[1].palLen = 16
+        ciTextures[1].palAddr = 16
+    elif len(ciTextures) > 0:
+        # palettes of two CI textures with a CI8 are merged
+        ciTextures[0].palLen = 16 if len(ciTextures) == 1 and ciTextures[0].texFormat == "CI4" else 256
 
-def getTmemMax(texFormat):
-    return 4096 if texFormat[:2] != "CI" else 2048
+    tex0, tex1 = f3dMat.tex0, f3dMat.tex1
+    sameTextures = len(textures) == 2 and (
+        (not tex0.use_tex_reference and not tex1.use_tex_reference and tex0.tex == tex1.tex)
+        or (tex0.use_tex_reference and tex1.use_tex_reference and tex0.tex_reference == tex1.tex_reference)
+    )
+    return planTmem(textures, sameTextures, material.mat_ver > 3 and f3dMat.use_large_textures)
 
 
 # Necessary for UV half pixel offset (see 13.7.5.3)
@@ -704,6 +792,28 @@ class F3DPanel(Panel):
             inputGroup.label(text="Large texture edges:")
             inputGroup.prop(material, "large_edges", text="")
 
+    def ui_quantize(self, material, layout, context):
+        scene = context.scene
+        # the scene option already converts the textures of every material
+        if not scene.saveTextures and not scene.autoQuantizeCI:
+            layout.prop(material, "quantize_textures")
+
+    def ui_tmem_map(self, material, layout):
+        plan = getMaterialTmemPlan(material)
+        if len(plan.regions) == 0:
+            return
+        box = layout.box().column()
+        box.label(text="TMEM Map")
+        for region in sorted(plan.regions, key=lambda region: region.start):
+            start, end = region.start * 8, (region.start + region.size) * 8 - 1
+            box.label(text=f"0x{start:03X} - 0x{end:03X}: {region.label}")
+        if plan.fits:
+            box.label(text=f"{(plan.capacity - plan.occupied) * 8} / {plan.capacity * 8} texture bytes free")
+        else:
+            box.label(text="Textures don't fit in TMEM.", icon="ERROR")
+            for suggestion in plan.suggestions:
+                box.label(text=suggestion)
+
     def ui_scale(self, material, layout):
         inputGroup = layout.row().split(factor=0.5)
         prop_input = inputGroup.column()
@@ -1159,7 +1269,9 @@ class F3DPanel(Panel):
 
         if useDict["Texture"]:
             self.ui_large(f3dMat, inputCol)
+            self.ui_quantize(f3dMat, inputCol, context)
             self.ui_scale(f3dMat, inputCol)
+            self.ui_tmem_map(material, inputCol)
 
         if useDict["Primitive"] and f3dMat.set_prim:
             self.ui_prim(material, inputCol, "set_prim", f3dMat.set_prim, False)
@@ -1248,7 +1360,9 @@ class F3DPanel(Panel):
 
             if useDict["Texture"]:
                 self.ui_large(f3dMat, inputCol)
+                self.ui_quantize(f3dMat, inputCol, context)
                 self.ui_scale(f3dMat, inputCol)
+                self.ui_tmem_map(material, inputCol)
 
             if useDict["Primitive"]:
                 self.ui_prim(material, inputCol, "set_prim", f3dMat.set_prim, True)
@@ -4000,6 +4114,7 @@ class AddPresetF3D(AddPresetBase, Operator):
         "f3d_mat.f3d_update_flag",
         "f3d_mat.name",
         "f3d_mat.use_large_textures",
+        "f3d_mat.quantize_textures",
     }
 
     def execute(self, context):
@@ -4546,6 +4661,11 @@ class F3DMaterialProperty(PropertyGroup):
     draw_layer: bpy.props.PointerProperty(type=DrawLayerProperty)
     use_large_textures: bpy.props.BoolProperty(name="Large Texture Mode")
     large_edges: bpy.props.EnumProperty(items=enumLargeEdges, default="Clamp")
+    quantize_textures: bpy.props.BoolProperty(
+        name="Convert RGBA Texture To CI",
+        description="Exports a single RGBA16 / RGBA32 texture as CI4 or CI8 with an RGBA16 palette "
+        "when the quantized texture stays within the scene's error limits, otherwise the original format is kept",
+    )
 
     expand_cel_shading_ui: bpy.props.BoolProperty(name="Expand Cel Shading UI")
     use_cel_shading: bpy.props.BoolProperty(name="Use Cel Shading", update=update_cel_cutout_source)
@@ -4553,87 +4673,90 @@ class F3DMaterialProperty(PropertyGroup):
 
     def key(self) -> F3DMaterialHash:
         useDefaultLighting = self.set_lights and self.use_default_lighting
-        return (
-            self.scale_autoprop,
-            self.uv_basis,
-            self.UVanim0.key(),
-            self.UVanim1.key(),
-            tuple([round(value, 4) for value in self.tex_scale]),
-            self.tex0.key(),
-            self.tex1.key(),
-            self.rdp_settings.key(),
-            self.draw_layer.key(),
-            self.use_large_textures,
-            self.use_cel_shading,
-            self.cel_shading.tintPipeline if self.use_cel_shading else None,
-            (
-                tuple(
-                    [
-                        (
-                            c.threshMode,
-                            c.threshold,
-                            c.tintType,
-                            c.tintFixedLevel,
-                            c.tintFixedColor,
-                            c.tintSegmentNum,
-                            c.tintSegmentOffset,
-                            c.tintLightSlot,
-                        )
-                        for c in self.cel_shading.levels
-                    ]
-                )
-                if self.use_cel_shading
-                else None
-            ),
-            self.use_default_lighting,
-            self.set_blend,
-            self.set_prim,
-            self.set_env,
-            self.set_key,
-            self.set_k0_5,
-            self.set_combiner,
-            self.set_lights,
-            self.set_fog,
-            tuple([round(value, 4) for value in self.blend_color]) if self.set_blend else None,
-            tuple([round(value, 4) for value in self.prim_color]) if self.set_prim else None,
-            round(self.prim_lod_frac, 4) if self.set_prim else None,
-            round(self.prim_lod_min, 4) if self.set_prim else None,
-            tuple([round(value, 4) for value in self.env_color]) if self.set_env else None,
-            tuple([round(value, 4) for value in self.key_center]) if self.set_key else None,
-            tuple([round(value, 4) for value in self.key_scale]) if self.set_key else None,
-            tuple([round(value, 4) for value in self.key_width]) if self.set_key else None,
-            round(self.k0, 4) if self.set_k0_5 else None,
-            round(self.k1, 4) if self.set_k0_5 else None,
-            round(self.k2, 4) if self.set_k0_5 else None,
-            round(self.k3, 4) if self.set_k0_5 else None,
-            round(self.k4, 4) if self.set_k0_5 else None,
-            round(self.k5, 4) if self.set_k0_5 else None,
-            self.combiner1.key() if self.set_combiner else None,
-            self.combiner2.key() if self.set_combiner else None,
+        return F3DMaterialHash(
             (
-                tuple([round(value, 4) for value in (self.ao_ambient, self.ao_directional, self.ao_point)])
-                if self.set_ao
-                else None
-            ),
-            tuple([round(value, 4) for value in (self.fresnel_lo, self.fresnel_hi)]) if self.set_fresnel else None,
-            tuple([round(value, 4) for value in self.attroffs_st]) if self.set_attroffs_st else None,
-            self.attroffs_z if self.set_attroffs_z else None,
-            tuple([round(value, 4) for value in self.fog_color]) if self.set_fog else None,
-            tuple([round(value, 4) for value in self.fog_position]) if self.set_fog else None,
-            tuple([round(value, 4) for value in self.default_light_color]) if useDefaultLighting else None,
-            self.set_ambient_from_light if useDefaultLighting else None,
-            (
-                tuple([round(value, 4) for value in self.ambient_light_color])
-                if useDefaultLighting and not self.set_ambient_from_light
-                else None
-            ),
-            self.f3d_light1 if not useDefaultLighting else None,
-            self.f3d_light2 if not useDefaultLighting else None,
-            self.f3d_light3 if not useDefaultLighting else None,
-            self.f3d_light4 if not useDefaultLighting else None,
-            self.f3d_light5 if not useDefaultLighting else None,
-            self.f3d_light6 if not useDefaultLighting else None,
-            self.f3d_light7 if not useDefaultLighting else None,
+                self.scale_autoprop,
+                self.uv_basis,
+                self.UVanim0.key(),
+                self.UVanim1.key(),
+                tuple([round(value, 4) for value in self.tex_scale]),
+                self.tex0.key(),
+                self.tex1.key(),
+                self.rdp_settings.key(),
+                self.draw_layer.key(),
+                self.use_large_textures,
+                self.quantize_textures,
+                self.use_cel_shading,
+                self.cel_shading.tintPipeline if self.use_cel_shading else None,
+                (
+                    tuple(
+                        [
+                            (
+                                c.threshMode,
+                                c.threshold,
+                                c.tintType,
+                                c.tintFixedLevel,
+                                c.tintFixedColor,
+                                c.tintSegmentNum,
+                                c.tintSegmentOffset,
+                                c.tintLightSlot,
+                            )
+                            for c in self.cel_shading.levels
+                        ]
+                    )
+                    if self.use_cel_shading
+                    else None
+                ),
+                self.use_default_lighting,
+                self.set_blend,
+                self.set_prim,
+                self.set_env,
+                self.set_key,
+                self.set_k0_5,
+                self.set_combiner,
+                self.set_lights,
+                self.set_fog,
+                tuple([round(value, 4) for value in self.blend_color]) if self.set_blend else None,
+                tuple([round(value, 4) for value in self.prim_color]) if self.set_prim else None,
+                round(self.prim_lod_frac, 4) if self.set_prim else None,
+                round(self.prim_lod_min, 4) if self.set_prim else None,
+                tuple([round(value, 4) for value in self.env_color]) if self.set_env else None,
+                tuple([round(value, 4) for value in self.key_center]) if self.set_key else None,
+                tuple([round(value, 4) for value in self.key_scale]) if self.set_key else None,
+                tuple([round(value, 4) for value in self.key_width]) if self.set_key else None,
+                round(self.k0, 4) if self.set_k0_5 else None,
+                round(self.k1, 4) if self.set_k0_5 else None,
+                round(self.k2, 4) if self.set_k0_5 else None,
+                round(self.k3, 4) if self.set_k0_5 else None,
+                round(self.k4, 4) if self.set_k0_5 else None,
+                round(self.k5, 4) if self.set_k0_5 else None,
+                self.combiner1.key() if self.set_combiner else None,
+                self.combiner2.key() if self.set_combiner else None,
+                (
+                    tuple([round(value, 4) for value in (self.ao_ambient, self.ao_directional, self.ao_point)])
+                    if self.set_ao
+                    else None
+                ),
+                tuple([round(value, 4) for value in (self.fresnel_lo, self.fresnel_hi)]) if self.set_fresnel else None,
+                tuple([round(value, 4) for value in self.attroffs_st]) if self.set_attroffs_st else None,
+                self.attroffs_z if self.set_attroffs_z else None,
+                tuple([round(value, 4) for value in self.fog_color]) if self.set_fog else None,
+                tuple([round(value, 4) for value in self.fog_position]) if self.set_fog else None,
+                tuple([round(value, 4) for value in self.default_light_color]) if useDefaultLighting else None,
+                self.set_ambient_from_light if useDefaultLighting else None,
+                (
+                    tuple([round(value, 4) for value in self.ambient_light_color])
+                    if useDefaultLighting and not self.set_ambient_from_light
+                    else None
+                ),
+                self.f3d_light1 if not useDefaultLighting else None,
+                self.f3d_light2 if not useDefaultLighting else None,
+                self.f3d_light3 if not useDefaultLighting else None,
+                self.f3d_light4 if not useDefaultLighting else None,
+                self.f3d_light5 if not useDefaultLighting else None,
+                self.f3d_light6 if not useDefaultLighting else None,
+                self.f3d_light7 if not useDefaultLighting else None,
+            )
         )
 
 
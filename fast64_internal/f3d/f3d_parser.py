@@ -1,5 +1,6 @@
 from typing import Union, Optional, Callable, Any, TYPE_CHECKING
 import bmesh, bpy, mathutils, re, math, traceback
+import numpy as np
 from mathutils import Vector
 from bpy.utils import register_class, unregister_class
 from .f3d_gbi import *
@@ -480,6 +481,8 @@ class F3DContext:
 
         self.vertexData: dict[str, list[F3DVert]] = {}  # c name : parsed data
         self.textureData: dict[str, bpy.types.Image] = {}  # c name : blender texture
+        # (format, size, width, is LUT, data) : blender texture, to reuse identical non CI textures
+        self.decodedTextures: dict[tuple[str, str, int, bool, bytes], bpy.types.Image] = {}
 
         self.tlutAppliedTextures: str = []  # c name
         self.currentTextureName: str | None = None
@@ -537,6 +540,7 @@ class F3DContext:
     def clearGeometry(self):
         savedMaterialDict = self.materialDict
         savedTextureData = self.textureData
+        savedDecodedTextures = self.decodedTextures
         savedTlutAppliedTextures = self.tlutAppliedTextures
         savedImagesDontApplyTlut = self.imagesDontApplyTlut
         savedLightData = self.lightData
@@ -547,6 +551,7 @@ class F3DContext:
 
         self.materialDict = savedMaterialDict
         self.textureData = savedTextureData
+        self.decodedTextures = savedDecodedTextures
         self.tlutAppliedTextures = savedTlutAppliedTextures
         self.imagesDontApplyTlut = savedImagesDontApplyTlut
         self.lightData = savedLightData
@@ -748,9 +753,9 @@ class F3DContext:
         return material.f3d_mat.key()
 
     def getMaterialIndex(self):
-        key = self.getMaterialKey(self.materialContext)
-        if key in self.materialDict:
-            material = self.materialDict[key]
+        # only computed when the material state changed, see materialChanged
+        material = self.materialDict.get(self.getMaterialKey(self.materialContext))
+        if material is not None:
             if material in self.materials:
                 return self.materials.index(material)
             else:
@@ -1518,17 +1523,14 @@ class F3DContext:
         self.materialChanged = True
 
     def applyTLUT(self, image, tlut):
-        invalidIndicesDetected = False
-        for i in range(int(len(image.pixels) / 4)):
-            lutIndex = int(round(image.pixels[4 * i] * 255))
-            newValues = tlut.pixels[4 * lutIndex : 4 * (lutIndex + 1)]
-            if len(newValues) < 4:
-                # print("Invalid LUT Index " + str(lutIndex))
-                invalidIndicesDetected = True
-            else:
-                image.pixels[4 * i : 4 * (i + 1)] = newValues
-
-        if invalidIndicesDetected:
+        pixels = getImagePixels(image).reshape(-1, 4)
+        tlutPixels = getImagePixels(tlut).reshape(-1, 4)
+        lutIndices = np.round(pixels[:, 0] * 255).astype(np.int64)
+        validIndices = lutIndices < len(tlutPixels)
+        pixels[validIndices] = tlutPixels[lutIndices[validIndices]]
+        image.pixels.foreach_set(pixels.reshape(-1))
+
+        if not validIndices.all():
             print("Invalid LUT Indices detected.")
 
     def getVertexDataStart(self, vertexDataParam: str, f3d: F3D):
@@ -2067,6 +2069,70 @@ def CI4toRGBA32(value):
     return [value / 255, value / 255, value / 255, 1]
 
 
+def decodeTextureData(data: bytes, imageFormat: str, imageSize: str) -> Optional[np.ndarray]:
+    """
+    Decodes N64 texture data to an (N, 4) float32 RGBA array, in the same way as the *toRGBA32 functions.
+    CI textures are decoded to grayscale index / 255 until their TLUT is applied.
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if imageSize == "G_IM_SIZ_4b":
+        texels = np.empty(len(raw) * 2, dtype=np.uint32)
+        texels[0::2] = raw >> 4
+        texels[1::2] = raw & 15
+    elif imageSize == "G_IM_SIZ_8b":
+        texels = raw.astype(np.uint32)
+    elif imageSize == "G_IM_SIZ_16b":
+        texels = raw[: len(raw) // 2 * 2].view(">u2").astype(np.uint32)
+    elif imageSize == "G_IM_SIZ_32b":
+        texels = raw[: len(raw) // 4 * 4].reshape(-1, 4)
+    else:
+        texels = None
+
+    fmtSize = (imageFormat, imageSize)
+    if texels is None:
+        print("Unhandled size: " + str(imageSize))
+        return None
+    elif fmtSize == ("G_IM_FMT_RGBA", "G_IM_SIZ_32b"):
+        return (texels / 255).astype(np.float32)
+
+    rgba = np.ones((len(texels), 4), dtype=np.float32)
+    if fmtSize == ("G_IM_FMT_RGBA", "G_IM_SIZ_16b"):
+        rgba[:, 0] = ((texels >> 11) & 31) / 31
+        rgba[:, 1] = ((texels >> 6) & 31) / 31
+        rgba[:, 2] = ((texels >> 1) & 31) / 31
+        rgba[:, 3] = texels & 1
+    elif fmtSize == ("G_IM_FMT_IA", "G_IM_SIZ_16b"):
+        rgba[:, :3] = ((texels >> 8) / 255)[:, None]
+        rgba[:, 3] = (texels & 255) / 255
+    elif fmtSize == ("G_IM_FMT_IA", "G_IM_SIZ_8b"):
+        rgba[:, :3] = ((texels >> 4) / 15)[:, None]
+        rgba[:, 3] = (texels & 15) / 15
+    elif fmtSize == ("G_IM_FMT_IA", "G_IM_SIZ_4b"):
+        rgba[:, :3] = (((texels >> 1) & 7) / 7)[:, None]
+        rgba[:, 3] = texels & 1
+    elif fmtSize == ("G_IM_FMT_I", "G_IM_SIZ_8b"):
+        rgba[:, :3] = (texels / 255)[:, None]
+    elif fmtSize == ("G_IM_FMT_I", "G_IM_SIZ_4b"):
+        rgba[:, :3] = (texels / 15)[:, None]
+    elif fmtSize in {("G_IM_FMT_CI", "G_IM_SIZ_8b"), ("G_IM_FMT_CI", "G_IM_SIZ_4b")}:
+        rgba[:, :3] = (texels / 255)[:, None]
+    else:
+        print("Unhandled size for " + str(imageFormat) + ": " + str(imageSize))
+        return None
+    return rgba
+
+
+def getImagePixels(image: bpy.types.Image) -> np.ndarray:
+    pixels = np.empty(len(image.pixels), dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    return pixels
+
+
+def flipImageRows(pixels: np.ndarray, width: int, height: int) -> np.ndarray:
+    # Blender UV origin is bottom right, while N64 is top right
+    return np.ascontiguousarray(pixels.reshape(height, -1)[::-1]).reshape(-1)
+
+
 def parseTextureData(dlData, textureName, f3dContext, imageFormat, imageSize, width, isLUT, f3d):
     matchResult = re.search(
         r"([A-Za-z0-9\_]+)\s*" + re.escape(textureName) + r"\s*\[\s*[0-9a-fA-Fx]*\s*\]\s*=\s*\{([^\}]*)\s*\}\s*;\s*",
@@ -2092,86 +2158,58 @@ def parseTextureData(dlData, textureName, f3dContext, imageFormat, imageSize, wi
 
         # Blender UV origin is bottom right, while N64 is top right, so we must flip LUT since we read it as data
         if isLUT:
-            flippedValues = image.pixels[:]
             width, height = image.size
-            for j in range(height):
-                image.pixels[width * j * 4 : width * (j + 1) * 4] = flippedValues[
-                    width * (height - (j + 1)) * 4 : width * (height - j) * 4
-                ]
+            image.pixels.foreach_set(flipImageRows(getImagePixels(image), width, height))
 
         loadedFromImageFile = True
     else:
-        values = [value.strip() for value in data.split(",") if value.strip() != ""]
-        newValues = []
-        for value in values:
-            intValue = math_eval(value, f3d)
-            if valueSize == "u8" or valueSize == "s8" or valueSize == "char" or valueSize == "Texture":
-                size = 1
-            elif valueSize == "u16" or valueSize == "s16" or valueSize == "short":
-                size = 2
-            elif valueSize == "u32" or valueSize == "s32" or valueSize == "int":
-                size = 4
-            else:
-                size = 8
-            newValues.extend(int.to_bytes(intValue, size, "big")[:])
-        values = newValues
+        if valueSize == "u8" or valueSize == "s8" or valueSize == "char" or valueSize == "Texture":
+            size = 1
+        elif valueSize == "u16" or valueSize == "s16" or valueSize == "short":
+            size = 2
+        elif valueSize == "u32" or valueSize == "s32" or valueSize == "int":
+            size = 4
+        else:
+            size = 8
+        values = bytearray()
+        for value in data.split(","):
+            value = value.strip()
+            if value == "":
+                continue
+            try:
+                intValue = int(value, 0)
+            except ValueError:
+                intValue = math_eval(value, f3d)
+            values.extend(intValue.to_bytes(size, "big"))
+        values = bytes(values)
 
         if width == 0:
             width = 16
+
+        # CI images are modified in place when their TLUT is applied, so they can't be shared
+        decodedKey = (imageFormat, imageSize, width, isLUT, values)
+        if imageFormat != "G_IM_FMT_CI" and decodedKey in f3dContext.decodedTextures:
+            return f3dContext.decodedTextures[decodedKey], loadedFromImageFile
+
         height = int(ceil(len(values) / (width * int(imageSize[9:-1]) / 8)))
         # print("Texture: " + str(len(values)) + ", width = " + str(width) + ", height = " + str(height))
         image = bpy.data.images.new(textureName, width, height, alpha=True)
-        if imageFormat == "G_IM_FMT_RGBA":
-            if imageSize == "G_IM_SIZ_16b":
-                for i in range(int(len(values) / 2)):
-                    image.pixels[4 * i : 4 * (i + 1)] = RGBA16toRGBA32(
-                        int.from_bytes(values[2 * i : 2 * (i + 1)], "big")
-                    )
-            elif imageSize == "G_IM_SIZ_32b":
-                image.pixels[:] = values
-            else:
-                print("Unhandled size for RGBA: " + str(imageSize))
-        elif imageFormat == "G_IM_FMT_IA":
-            if imageSize == "G_IM_SIZ_4b":
-                for i in range(len(values)):
-                    image.pixels[8 * i : 8 * i + 4] = IA4toRGBA32((values[i] >> 4) & 15)
-                    image.pixels[8 * i + 4 : 8 * i + 8] = IA4toRGBA32(values[i] & 15)
-            elif imageSize == "G_IM_SIZ_8b":
-                for i in range(len(values)):
-                    image.pixels[4 * i : 4 * (i + 1)] = IA8toRGBA32(values[i])
-            elif imageSize == "G_IM_SIZ_16b":
-                for i in range(int(len(values) / 2)):
-                    image.pixels[4 * i : 4 * (i + 1)] = IA16toRGBA32(int.from_bytes(values[2 * i : 2 * (i + 1)], "big"))
-            else:
-                print("Unhandled size for IA: " + str(imageSize))
-        elif imageFormat == "G_IM_FMT_I":
-            if imageSize == "G_IM_SIZ_4b":
-                for i in range(len(values)):
-                    image.pixels[8 * i : 8 * i + 4] = I4toRGBA32((values[i] >> 4) & 15)
-                    image.pixels[8 * i + 4 : 8 * i + 8] = I4toRGBA32(values[i] & 15)
-            elif imageSize == "G_IM_SIZ_8b":
-                for i in range(len(values)):
-                    image.pixels[4 * i : 4 * (i + 1)] = I8toRGBA32(values[i])
-            else:
-                print("Unhandled size for I: " + str(imageSize))
-        elif imageFormat == "G_IM_FMT_CI":
-            if imageSize == "G_IM_SIZ_4b":
-                for i in range(len(values)):
-                    image.pixels[8 * i : 8 * i + 4] = CI4toRGBA32((values[i] >> 4) & 15)
-                    image.pixels[8 * i + 4 : 8 * i + 8] = CI4toRGBA32(values[i] & 15)
-            elif imageSize == "G_IM_SIZ_8b":
-                for i in range(len(values)):
-                    image.pixels[4 * i : 4 * (i + 1)] = CI8toRGBA32(values[i])
-            else:
-                print("Unhandled size for CI: " + str(imageSize))
+
+        pixels = np.zeros((width * height, 4), dtype=np.float32)
+        pixels[:, 3] = 1
+        texels = decodeTextureData(values, imageFormat, imageSize)
+        if texels is not None:
+            texelCount = min(len(texels), len(pixels))
+            pixels[:texelCount] = texels[:texelCount]
+        pixels = pixels.reshape(-1)
 
         # Blender UV origin is bottom right, while N64 is top right, so we must flip non LUT
         if not isLUT:
-            flippedValues = image.pixels[:]
-            for j in range(height):
-                image.pixels[width * j * 4 : width * (j + 1) * 4] = flippedValues[
-                    width * (height - (j + 1)) * 4 : width * (height - j) * 4
-                ]
+            pixels = flipImageRows(pixels, width, height)
+        image.pixels.foreach_set(pixels)
+
+        if imageFormat != "G_IM_FMT_CI":
+            f3dContext.decodedTextures[decodedKey] = image
 
     return image, loadedFromImageFile
 
@@ -2379,6 +2417,10 @@ class F3D_ImportDLPanel(bpy.types.Panel):
         box.label(text="All data must be contained within file.")
         box.label(text="The only exception are pngs converted to inc.c.")
 
+        box = col.box().column()
+        box.operator("object.f3d_analyze_imported_dl_cost")
+        prop_split(box, context.scene, "DLCostSortKey", "Sort By")
+
         # col.template_list('F3D_UL_ImportDLPathList', '', context.scene,
         # 	'DLImportOtherFiles', context.scene, 'DLImportOtherFilesIndex')
 
@@ -0,0 +1,219 @@
+import bpy, math
+import numpy as np
+from typing import Optional
+from .f3d_material import getTmemWordUsage
+from .f3d_enums import texBitSizeInt
+
+# alpha is weighted more so that transparent and opaque texels never share a palette entry
+QUANTIZE_CHANNEL_WEIGHTS = np.array([1.0, 1.0, 1.0, 4.0])
+QUANTIZE_KMEANS_ITERATIONS = 8
+QUANTIZE_CHUNK_SIZE = 4096
+
+
+class QuantizedTexture:
+    """An RGBA texture converted to CI, with its RGBA16 palette and indices in N64 row order"""
+
+    def __init__(self, texFormat: str, palette: list[int], indices: np.ndarray, psnr: float, maxDelta: float):
+        self.texFormat = texFormat
+        self.palette = palette
+        self.indices = indices
+        self.psnr = psnr
+        self.maxDelta = maxDelta
+
+
+class TexturePropertyOverride:
+    """Wraps a TextureProperty to export its image in another format, other properties are read from the original"""
+
+    def __init__(self, texProp, tex_format: str, ci_format: str):
+        self.texProp = texProp
+        self.tex_format = tex_format
+        self.ci_format = ci_format
+
+    def __getattr__(self, name):
+        return getattr(self.texProp, name)
+
+
+def getImageRGBA(image: bpy.types.Image) -> np.ndarray:
+    """Returns the pixels of an image as a (height * width, 4) array, top row first like on the N64"""
+
+    width, height = image.size
+    channels = image.channels
+    pixels = np.empty(width * height * channels, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    rgba = np.ones((height, width, 4), dtype=np.float32)
+    rgba[:, :, : min(channels, 4)] = pixels.reshape(height, width, channels)[:, :, :4]
+    return rgba[::-1].reshape(-1, 4)
+
+
+def getExportedColors(rgba: np.ndarray, texFormat: str) -> np.ndarray:
+    """Colors (0-255) that the texture would have when exported in its RGBA format"""
+
+    if texFormat == "RGBA16":
+        colors = np.round(rgba * 0x1F) * (255 / 0x1F)
+        colors[:, 3] = np.where(rgba[:, 3] > 0.5, 255, 0)
+        return colors
+    return np.round(rgba * 0xFF)
+
+
+def encodeRGBA16(colors: np.ndarray) -> np.ndarray:
+    """Encodes 0-255 colors to RGBA16 values, rounding like getRGBA16Tuple"""
+
+    rgb = np.round(colors[:, :3] / 255 * 0x1F).astype(np.int64) & 0x1F
+    alpha = (colors[:, 3] > 127.5).astype(np.int64)
+    return (rgb[:, 0] << 11) | (rgb[:, 1] << 6) | (rgb[:, 2] << 1) | alpha
+
+
+def decodeRGBA16(values: np.ndarray) -> np.ndarray:
+    colors = np.empty((len(values), 4))
+    colors[:, 0] = (values >> 11) & 0x1F
+    colors[:, 1] = (values >> 6) & 0x1F
+    colors[:, 2] = (values >> 1) & 0x1F
+    colors *= 255 / 0x1F
+    colors[:, 3] = (values & 1) * 255
+    return colors
+
+
+def nearestPaletteIndices(colors: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    weightedPalette = palette * QUANTIZE_CHANNEL_WEIGHTS
+    indices = np.empty(len(colors), dtype=np.int64)
+    for start in range(0, len(colors), QUANTIZE_CHUNK_SIZE):
+        chunk = colors[start : start + QUANTIZE_CHUNK_SIZE] * QUANTIZE_CHANNEL_WEIGHTS
+        distances = ((chunk[:, None, :] - weightedPalette[None, :, :]) ** 2).sum(axis=2)
+        indices[start : start + QUANTIZE_CHUNK_SIZE] = distances.argmin(axis=1)
+    return indices
+
+
+def medianCut(colors: np.ndarray, counts: np.ndarray, maxColors: int) -> np.ndarray:
+    """Splits the color space at weighted medians until there are maxColors boxes, returns their mean colors"""
+
+    boxes = [np.arange(len(colors))]
+    while len(boxes) < maxColors:
+        # split the box with the largest weighted channel range
+        bestBox, bestScore, bestChannel = None, 0, 0
+        for i, box in enumerate(boxes):
+            if len(box) < 2:
+                continue
+            ranges = (colors[box].max(axis=0) - colors[box].min(axis=0)) * QUANTIZE_CHANNEL_WEIGHTS
+            channel = int(ranges.argmax())
+            score = ranges[channel] * counts[box].sum()
+            if score > bestScore:
+                bestBox, bestScore, bestChannel = i, score, channel
+        if bestBox is None:
+            break
+
+        box = boxes.pop(bestBox)
+        box = box[np.argsort(colors[box, bestChannel], kind="stable")]
+        cumulative = np.cumsum(counts[box])
+        split = int(np.searchsorted(cumulative, cumulative[-1] / 2))
+        split = min(max(split, 1), len(box) - 1)
+        boxes.extend((box[:split], box[split:]))
+
+    return np.array([np.average(colors[box], axis=0, weights=counts[box]) for box in boxes])
+
+
+def quantizeColors(colors: np.ndarray, counts: np.ndarray, maxColors: int):
+    """Median cut refined by weighted k-means, returns (RGBA16 palette values, palette index of each color)"""
+
+    if len(colors) <= maxColors:
+        palette = colors
+    else:
+        palette = medianCut(colors, counts, maxColors)
+        for _ in range(QUANTIZE_KMEANS_ITERATIONS):
+            assignment = nearestPaletteIndices(colors, palette)
+            weights = np.bincount(assignment, weights=counts, minlength=len(palette))
+            used = weights > 0
+            sums = np.stack(
+                [np.bincount(assignment, weights=colors[:, c] * counts, minlength=len(palette)) for c in range(4)],
+                axis=1,
+            )
+            palette = sums[used] / weights[used][:, None]
+
+    paletteValues = np.unique(encodeRGBA16(palette))
+    return paletteValues, nearestPaletteIndices(colors, decodeRGBA16(paletteValues))
+
+
+def quantizeTexture(rgba: np.ndarray, texFormat: str, ciFormat: str) -> QuantizedTexture:
+    reference = getExportedColors(rgba, texFormat)
+    colors, inverse, counts = np.unique(reference, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+
+    paletteValues, colorIndices = quantizeColors(colors, counts, 16 if ciFormat == "CI4" else 256)
+
+    errors = np.abs(decodeRGBA16(paletteValues)[colorIndices] - colors)
+    mse = (errors**2).sum(axis=1) @ counts / (counts.sum() * 4)
+    psnr = math.inf if mse == 0 else 10 * math.log10(255**2 / mse)
+    return QuantizedTexture(
+        ciFormat, [int(value) for value in paletteValues], colorIndices[inverse], psnr, float(errors.max())
+    )
+
+
+class TextureQuantizer:
+    """
+    Converts RGBA textures to CI4 / CI8 during export when the result is close enough to the original,
+    the conversions are cached per image for the whole (root) model.
+    """
+
+    def __init__(self, name: str, minPSNR: float, maxDelta: float, allowCI4: bool):
+        self.name = name
+        self.minPSNR = minPSNR
+        self.maxDelta = maxDelta
+        self.allowCI4 = allowCI4
+        self.quantized: dict[tuple[bpy.types.Image, str], Optional[QuantizedTexture]] = {}
+        self.converted = {"CI4": 0, "CI8": 0}
+        self.rejected = 0
+        self.bytesSaved = 0
+        self.tmemSaved = 0
+
+    def quantize(self, image: bpy.types.Image, texFormat: str) -> Optional[QuantizedTexture]:
+        key = (image, texFormat)
+        if key not in self.quantized:
+            self.quantized[key] = self.quantizeUncached(image, texFormat)
+        return self.quantized[key]
+
+    def quantizeUncached(self, image: bpy.types.Image, texFormat: str):
+        width, height = image.size
+        rgba = getImageRGBA(image)
+        for ciFormat in ("CI4", "CI8"):
+            if ciFormat == "CI4" and (not self.allowCI4 or width % 2 != 0):
+                continue
+            # CI textures can only use the lower half of TMEM
+            if getTmemWordUsage(ciFormat, width, height) > 256:
+                continue
+            quantized = quantizeTexture(rgba, texFormat, ciFormat)
+            if quantized.psnr >= self.minPSNR and quantized.maxDelta <= self.maxDelta:
+                self.converted[ciFormat] += 1
+                texels = width * height
+                self.bytesSaved += (
+                    texels * texBitSizeInt[texFormat] // 8
+                    - texels * texBitSizeInt[ciFormat] // 8
+                    - len(quantized.palette) * 2
+                )
+                self.tmemSaved += (
+                    getTmemWordUsage(texFormat, width, height) - getTmemWordUsage(ciFormat, width, height)
+                ) * 8
+                return quantized
+
+        self.rejected += 1
+        print(f"Keeping {image.name} as {texFormat}, CI conversion would exceed the error threshold.")
+        return None
+
+    def print_report(self):
+        if sum(self.converted.values()) + self.rejected == 0:
+            return
+        print(
+            f"{self.name}: converted {self.converted['CI4']} textures to CI4 and {self.converted['CI8']} to CI8, "
+            f"{self.rejected} kept their format. ROM bytes saved: {self.bytesSaved}, TMEM bytes saved: {self.tmemSaved}"
+        )
+
+
+def writeQuantizedCITextureData(fImage, quantized: QuantizedTexture, palette: list[int]):
+    if fImage.converted:
+        return
+
+    # the palette can contain other colors when it is merged or shared
+    remap = np.array([palette.index(color) for color in quantized.palette], dtype=np.uint8)
+    texture = remap[quantized.indices]
+    if quantized.texFormat == "CI4":
+        texture = (texture[0::2] << 4) | texture[1::2]
+    fImage.data = bytearray(texture.tobytes())
+    fImage.converted = True
@@ -1,6 +1,6 @@
 from typing import Union, Optional
 from dataclasses import dataclass, field
-import bpy
+import bpy, copy
 from math import ceil, floor
 
 from .f3d_enums import *
@@ -12,12 +12,16 @@ from .f3d_material import (
     TextureProperty,
     F3DMaterialProperty,
     isTexturePointSampled,
+    get_textlut_mode,
 )
 from .f3d_gbi import *
 from .f3d_gbi import _DPLoadTextureBlock
 from .flipbook import TextureFlipbook
+from .f3d_tmem import TmemTexture, chooseLargeTexture, planTmem
+from .f3d_quantize import QuantizedTexture, TextureQuantizer, TexturePropertyOverride, writeQuantizedCITextureData
 
 from ..utility import *
+from ..profiler import profile_stage
 
 
 def UVtoSTLarge(obj, loopIndex, uv_data, texDimensions):
@@ -152,17 +156,114 @@ class TileLoad:
         # one loading 60-68 (size 64) and another 0-8, that could be merged to
         # one load 60-72. But this is likely to be uncommon and won't be generated
         # by the operator.
-        new_sl = min(self.sl, other.sl)
-        new_sh = max(self.sh, other.sh)
-        new_tl = min(self.tl, other.tl)
-        new_th = max(self.th, other.th)
-        ret, new_sl, new_sh, new_tl, new_th, soffset, toffset = self.fixRegion(new_sl, new_sh, new_tl, new_th)
-        if not ret:
+        region = self.getSubsumedRegion(other)
+        if region is None:
             return False
-        self.sl, self.sh, self.tl, self.th = new_sl, new_sh, new_tl, new_th
+        self.subsume(other, region)
+        return True
+
+    def getSubsumedRegion(self, other):
+        """Returns the (sl, sh, tl, th) region covering both TileLoads, or None if it can't be loaded"""
+        ret, new_sl, new_sh, new_tl, new_th, soffset, toffset = self.fixRegion(
+            min(self.sl, other.sl), max(self.sh, other.sh), min(self.tl, other.tl), max(self.th, other.th)
+        )
+        return (new_sl, new_sh, new_tl, new_th) if ret else None
+
+    def subsume(self, other, region):
+        self.sl, self.sh, self.tl, self.th = region
         self.faces.extend(other.faces)
         self.offsets.extend(other.offsets)
-        return True
+
+    def copy(self):
+        tileLoad = copy.copy(self)
+        tileLoad.faces = list(self.faces)
+        tileLoad.offsets = list(self.offsets)
+        return tileLoad
+
+    def getLoadedBytes(self, region=None):
+        sl, sh, tl, th = region if region is not None else (self.sl, self.sh, self.tl, self.th)
+        return getTmemWordUsage(self.texFormat, sh - sl + 1, th - tl + 1) * 8
+
+
+# Approximate cost of the commands and RDP setup of one tile load, in bytes of texture data loaded
+TILE_LOAD_OVERHEAD_BYTES = 64
+
+
+def getTileLoadsCost(tileLoads: list[TileLoad]):
+    return sum(tileLoad.getLoadedBytes() + TILE_LOAD_OVERHEAD_BYTES for tileLoad in tileLoads)
+
+
+def planTileLoadsFirstFit(faceTileLoads: list[TileLoad]) -> list[TileLoad]:
+    """Adds each face to the first load that can subsume it, in mesh order"""
+    tileLoads = []
+    for faceTileLoad in faceTileLoads:
+        faceTileLoad = faceTileLoad.copy()
+        for tileLoad in tileLoads:
+            if tileLoad.trySubsume(faceTileLoad):
+                break
+        else:
+            tileLoads.append(faceTileLoad)
+    return tileLoads
+
+
+def planTileLoadsBestFit(faceTileLoads: list[TileLoad]) -> list[TileLoad]:
+    """
+    Sweeps the faces in texture space (by T then S) and adds each to the load it grows the least,
+    then merges loads whenever one larger load costs less than the two separate ones.
+    """
+    tileLoads: list[TileLoad] = []
+    for faceTileLoad in sorted(faceTileLoads, key=lambda tileLoad: (tileLoad.tl, tileLoad.sl)):
+        faceTileLoad = faceTileLoad.copy()
+        best, bestRegion, bestGrowth = None, None, None
+        for tileLoad in tileLoads:
+            region = tileLoad.getSubsumedRegion(faceTileLoad)
+            if region is None:
+                continue
+            growth = tileLoad.getLoadedBytes(region) - tileLoad.getLoadedBytes()
+            if bestGrowth is None or growth < bestGrowth:
+                best, bestRegion, bestGrowth = tileLoad, region, growth
+        if best is not None and bestGrowth <= faceTileLoad.getLoadedBytes() + TILE_LOAD_OVERHEAD_BYTES:
+            best.subsume(faceTileLoad, bestRegion)
+        else:
+            tileLoads.append(faceTileLoad)
+
+    merged = True
+    while merged:
+        merged = False
+        i = 0
+        while i < len(tileLoads):
+            best, bestRegion, bestSaving = None, None, 0
+            for j in range(i + 1, len(tileLoads)):
+                region = tileLoads[i].getSubsumedRegion(tileLoads[j])
+                if region is None:
+                    continue
+                saving = (
+                    tileLoads[i].getLoadedBytes()
+                    + tileLoads[j].getLoadedBytes()
+                    + TILE_LOAD_OVERHEAD_BYTES
+                    - tileLoads[i].getLoadedBytes(region)
+                )
+                if saving > bestSaving:
+                    best, bestRegion, bestSaving = j, region, saving
+            if best is not None:
+                tileLoads[i].subsume(tileLoads.pop(best), bestRegion)
+                merged = True
+            else:
+                i += 1
+    return tileLoads
+
+
+def planTileLoads(faceTileLoads: list[TileLoad], materialName: str) -> list[TileLoad]:
+    """Groups the faces of a large texture material into tile loads, reporting the result against first fit"""
+    firstFit = planTileLoadsFirstFit(faceTileLoads)
+    bestFit = planTileLoadsBestFit(faceTileLoads)
+    tileLoads = bestFit if getTileLoadsCost(bestFit) < getTileLoadsCost(firstFit) else firstFit
+    print(
+        f"Large texture material {materialName}: {len(tileLoads)} tile loads, "
+        f"{sum(tileLoad.getLoadedBytes() for tileLoad in tileLoads)} bytes loaded "
+        f"(first fit: {len(firstFit)} tile loads, {sum(tileLoad.getLoadedBytes() for tileLoad in firstFit)} bytes)"
+    )
+    return tileLoads
 
 
 def maybeSaveSingleLargeTextureSetup(
@@ -347,6 +448,111 @@ def saveOrGetPaletteDefinition(
     return paletteKey, fPalette
 
 
+class SharedCIPalette:
+    """
+    A palette shared by the CI textures of several images, which only ever appends colors.
+    Its data is padded to the capacity so the TLUT loads of all materials using it are the same from the start.
+    """
+
+    def __init__(self, key: FSharedPaletteKey, fPalette: FImage, capacity: int):
+        self.key = key
+        self.fPalette = fPalette
+        self.capacity = capacity
+        self.colors: list[int] = []
+        self.colorSet: set[int] = set()
+
+    def countNewColors(self, colors: list[int]):
+        return sum(1 for color in colors if color not in self.colorSet)
+
+    def addColors(self, colors: list[int]):
+        # existing colors keep their index, so textures converted before stay valid
+        for color in colors:
+            if color not in self.colorSet:
+                self.colorSet.add(color)
+                self.colors.append(color)
+
+        self.fPalette.data = bytearray(b"".join(color.to_bytes(2, "big") for color in self.colors))
+        self.fPalette.data.extend(bytes(2 * (self.capacity - len(self.colors))))
+        self.fPalette.converted = True
+
+
+class CIPaletteSharing:
+    """
+    Assigns the single CI textures of a model and its sub models to as few shared palettes as possible,
+    so that materials using different images can share a palette and bleeding can skip their TLUT loads.
+    Textures are assigned as materials are converted, each to the palette it adds the fewest colors to.
+    """
+
+    def __init__(self, fModel: FModel):
+        self.fModel = fModel
+        self.palettes: list[SharedCIPalette] = []
+        # dict of (image, texture format, palette format, colors) : SharedCIPalette
+        self.imagePalettes: dict[tuple[bpy.types.Image, str, str, tuple[int, ...]], SharedCIPalette] = {}
+        self.unsharedPaletteBytes = 0
+        self.tlutLoads = 0
+
+    def assign(self, fMaterial: FMaterial, image: bpy.types.Image, texFormat: str, palFormat: str, colors: list[int]):
+        # the colors differ when the image is also exported as a quantized texture
+        imageKey = (image, texFormat, palFormat, tuple(colors))
+        sharedPalette = self.imagePalettes.get(imageKey)
+        if sharedPalette is None:
+            capacity = 16 if texFormat == "CI4" else 256
+            bestNewColors = None
+            for palette in self.palettes:
+                if palette.key.texFormat != texFormat or palette.key.palFormat != palFormat:
+                    continue
+                newColors = palette.countNewColors(colors)
+                if len(palette.colors) + newColors <= capacity and (bestNewColors is None or newColors < bestNewColors):
+                    sharedPalette, bestNewColors = palette, newColors
+
+            if sharedPalette is None:
+                key = FSharedPaletteKey(palFormat, texFormat, len(self.palettes))
+                name, filename = getTextureNamesFromBasename(
+                    f"shared_{texFormat.lower()}_{len(self.palettes)}", palFormat, self.fModel, True
+                )
+                sharedPalette = SharedCIPalette(
+                    key, FImage(name, texFormatOf[palFormat], "G_IM_SIZ_16b", 1, capacity, filename), capacity
+                )
+                self.fModel.textures[key] = sharedPalette.fPalette
+                self.palettes.append(sharedPalette)
+
+            sharedPalette.addColors(colors)
+            self.imagePalettes[imageKey] = sharedPalette
+            self.unsharedPaletteBytes += len(colors) * 2
+
+        fMaterial.usedImages.append(sharedPalette.key)
+        self.tlutLoads += 1
+        return sharedPalette
+
+    def print_report(self):
+        if len(self.imagePalettes) == 0:
+            return
+        sharedPaletteBytes = sum(palette.capacity * 2 for palette in self.palettes)
+        print(
+            f"{self.fModel.name}: CI palettes {len(self.imagePalettes)} -> {len(self.palettes)}, "
+            f"palette bytes {self.unsharedPaletteBytes} -> {sharedPaletteBytes}, "
+            f"TLUT loads in materials {self.tlutLoads} using {len(self.palettes)} distinct palettes"
+        )
+
+
+def getCIPaletteSharing(fModel: FModel) -> CIPaletteSharing:
+    rootModel = fModel.getRootModel()
+    if rootModel.ciPaletteSharing is None:
+        rootModel.ciPaletteSharing = CIPaletteSharing(rootModel)
+    return rootModel.ciPaletteSharing
+
+
+def getTextureQuantizer(fModel: FModel) -> TextureQuantizer:
+    rootModel = fModel.getRootModel()
+    if rootModel.textureQuantizer is None:
+        scene = bpy.context.scene
+        rootModel.textureQuantizer = TextureQuantizer(
+            rootModel.name, scene.autoQuantizeMinPSNR, scene.autoQuantizeMaxDelta, scene.autoQuantizeAllowCI4
+        )
+    return rootModel.textureQuantizer
+
+
+@profile_stage("Texture Definition", counters=lambda *args: {"textures": 1})
 def saveOrGetTextureDefinition(
     fMaterial: FMaterial,
     parent: Union[FModel, FTexRect],
@@ -405,6 +611,8 @@ class TexInfo:
     palDependencies: list[bpy.types.Image] = field(default_factory=list)
     palBaseName: str = ""
     loadPal: bool = False
+    sharedPalette: Optional[SharedCIPalette] = None
+    quantized: Optional[QuantizedTexture] = None
     doTexLoad: bool = True
     doTexTile: bool = True
 
@@ -463,6 +671,21 @@ class TexInfo:
 
         return True
 
+    def tryQuantize(self, fModel: FModel) -> None:
+        """Exports an RGBA texture as CI when it can be quantized within the error limits"""
+
+        if not self.useTex or self.isTexRef or self.texFormat not in {"RGBA16", "RGBA32"}:
+            return
+        self.quantized = getTextureQuantizer(fModel).quantize(self.texProp.tex, self.texFormat)
+        if self.quantized is None:
+            return
+
+        self.texFormat = self.quantized.texFormat
+        self.isTexCI = True
+        self.palFormat = "RGBA16"
+        self.texProp = TexturePropertyOverride(self.texProp, self.texFormat, self.palFormat)
+        self.tmemSize = getTmemWordUsage(self.texFormat, *self.imageDims)
+
     def moreSetupFromModel(
         self,
         material: bpy.types.Material,
@@ -481,6 +704,11 @@ class TexInfo:
                     self.palLen = len(self.pal)
                 else:
                     self.palLen = self.texProp.pal_reference_size
+            elif self.quantized is not None:
+                # the indices of a quantized texture differ from a CI texture of the same image
+                self.imDependencies = self.imDependencies + [self.quantized]
+                self.pal = list(self.quantized.palette)
+                self.palLen = len(self.pal)
             else:
                 assert self.flipbook is None
                 self.pal = getColorsUsedInImage(self.texProp.tex, self.palFormat)
@@ -521,27 +749,18 @@ class TexInfo:
             fMaterial, fModel, self.texProp, self.imDependencies, fMaterial.isTexLarge[self.indexInMat]
         )
         fMaterial.imageKey[self.indexInMat] = imageKey
-        if self.loadPal:
-            _, fPalette = saveOrGetPaletteDefinition(
+        if self.sharedPalette is not None:
+            fPalette = self.sharedPalette.fPalette
+        elif self.loadPal:
+            paletteKey, fPalette = saveOrGetPaletteDefinition(
                 fMaterial, fModel, self.texProp, self.isPalRef, self.palDependencies, self.palBaseName, self.palLen
             )
 
-        # Write loads
-        loadGfx = fMaterial.texture_DL
-        f3d = fModel.f3d
-        if self.loadPal:
-            savePaletteLoad(loadGfx, fPalette, self.palFormat, self.palAddr, self.palLen, 5 - self.indexInMat, f3d)
-        if self.doTexLoad:
-            saveTextureLoadOnly(fImage, loadGfx, self.texProp, None, 7 - self.indexInMat, self.texAddr, f3d)
-        if self.doTexTile:
-            saveTextureTile(
-                fImage, fMaterial, loadGfx, self.texProp, None, self.indexInMat, self.texAddr, self.palIndex, f3d
-            )
-
-        # Write texture data
+        # Write texture data, before the loads so that textures with identical data can share one definition
         if convertTextureData:
-            if self.loadPal and not self.isPalRef:
+            if self.loadPal and not self.isPalRef and self.sharedPalette is None:
                 writePaletteData(fPalette, self.pal)
+                fPalette = fModel.deduplicateTexture(paletteKey, fPalette)
             if self.isTexRef:
                 if self.isTexCI:
                     fModel.writeTexRefCITextures(
@@ -550,10 +769,25 @@ class TexInfo:
                 else:
                     fModel.writeTexRefNonCITextures(self.flipbook, self.texFormat)
             else:
-                if self.isTexCI:
+                if self.quantized is not None:
+                    writeQuantizedCITextureData(fImage, self.quantized, self.pal)
+                elif self.isTexCI:
                     writeCITextureData(self.texProp.tex, fImage, self.pal, self.palFormat, self.texFormat)
                 else:
                     writeNonCITextureData(self.texProp.tex, fImage, self.texFormat)
+                fImage = fModel.deduplicateTexture(imageKey, fImage)
+
+        # Write loads
+        loadGfx = fMaterial.texture_DL
+        f3d = fModel.f3d
+        if self.loadPal:
+            savePaletteLoad(loadGfx, fPalette, self.palFormat, self.palAddr, self.palLen, 5 - self.indexInMat, f3d)
+        if self.doTexLoad:
+            saveTextureLoadOnly(fImage, loadGfx, self.texProp, None, 7 - self.indexInMat, self.texAddr, f3d)
+        if self.doTexTile:
+            saveTextureTile(
+                fImage, fMaterial, loadGfx, self.texProp, None, self.indexInMat, self.texAddr, self.palIndex, f3d
+            )
 
 
 class MultitexManager:
@@ -569,6 +803,13 @@ class MultitexManager:
             raise PluginError(f"In {material.name} tex0: {self.ti0.errorMsg}")
         if not self.ti1.fromMat(1, f3dMat):
             raise PluginError(f"In {material.name} tex1: {self.ti1.errorMsg}")
+        if (
+            (bpy.context.scene.autoQuantizeCI or f3dMat.quantize_textures)
+            and not bpy.context.scene.saveTextures
+            and self.ti0.useTex != self.ti1.useTex
+            and not (material.mat_ver > 3 and f3dMat.use_large_textures)
+        ):
+            (self.ti0 if self.ti0.useTex else self.ti1).tryQuantize(fModel)
         self.ti0.moreSetupFromModel(material, fMaterial, fModel)
         self.ti1.moreSetupFromModel(material, fMaterial, fModel)
 
@@ -612,6 +853,16 @@ class MultitexManager:
 
         self.palFormat = self.ti0.palFormat if self.ti0.useTex else self.ti1.palFormat
 
+    def getTmemTextures(self) -> list[TmemTexture]:
+        return [TmemTexture(ti.indexInMat, ti.texFormat, *ti.imageDims) for ti in (self.ti0, self.ti1) if ti.useTex]
+
+    def getTextlutMode(self, f3dMat: F3DMaterialProperty) -> str:
+        """The TLUT mode of the material, quantized textures always use an RGBA16 palette"""
+
+        if self.ti0.quantized is not None or self.ti1.quantized is not None:
+            return "G_TT_RGBA16"
+        return get_textlut_mode(f3dMat)
+
     def writeAll(
         self, material: bpy.types.Material, fMaterial: FMaterial, fModel: FModel, convertTextureData: bool
     ) -> None:
@@ -754,6 +1005,28 @@ class MultitexManager:
                             # The up-to-32 entries in self.ti0.pal depend on both images. But the
                             # CIs in both im0 and im1 are the same as if there was no shared palette.
                             self.ti0.palDependencies = self.ti0.imDependencies + self.ti1.imDependencies
+
+        useLargeTextures = material.mat_ver > 3 and f3dMat.use_large_textures
+        if (
+            self.isCI
+            and convertTextureData
+            and bpy.context.scene.shareCIPalettes
+            and self.ti0.useTex != self.ti1.useTex
+            and not useLargeTextures
+        ):
+            ti = self.ti0 if self.ti0.useTex else self.ti1
+            if not ti.isTexRef:
+                ti.sharedPalette = getCIPaletteSharing(fModel).assign(
+                    fMaterial, ti.texProp.tex, ti.texFormat, ti.palFormat, ti.pal
+                )
+                # The CIs of the image now depend on the shared palette
+                ti.imDependencies = ti.palDependencies = [ti.sharedPalette.key] + (
+                    [ti.quantized] if ti.quantized is not None else []
+                )
+                ti.pal = ti.sharedPalette.colors
+                # the whole palette is loaded, its colors are only final once every material is converted
+                ti.palLen = ti.sharedPalette.capacity
+
         fMaterial.texPaletteIndex = [self.ti0.palIndex, self.ti1.palIndex]
         self.ti0.palBaseName = self.ti0.getPaletteName()
         self.ti1.palBaseName = self.ti1.getPaletteName()
@@ -774,7 +1047,6 @@ class MultitexManager:
                 )
             )
         )
-        useLargeTextures = material.mat_ver > 3 and f3dMat.use_large_textures
         tmemSize = 256 if self.isCI else 512
         self.ti1.texAddr = None  # must be set whenever tex 1 used (and loaded or tiled)
         tmemOccupied = self.texDimensions = None  # must be set on all codepaths
@@ -800,10 +1072,11 @@ class MultitexManager:
         else:  # useLargeTextures
             if self.ti0.useTex and self.ti1.useTex:
                 tmemOccupied = tmemSize
+                # The smaller texture is loaded normally and the large one gets the rest of TMEM.
                 # TODO: Could change this in the future to do the face tile assigments
-                # first, to see how large a tile the large texture(s) needed, instead
-                # of arbitrarily assigning half of TMEM to each of the two textures.
-                if self.ti0.tmemSize <= tmemSize // 2:
+                # first, to see how large a tile the large texture(s) needed.
+                largeIndex = chooseLargeTexture(self.ti0.tmemSize, self.ti1.tmemSize, tmemSize)
+                if largeIndex == 1:
                     # Tex 0 normal, tex 1 large
                     self.texDimensions = self.ti1.imageDims
                     fMaterial.largeTexFmt = self.ti1.texFormat
@@ -811,7 +1084,7 @@ class MultitexManager:
                     fMaterial.largeTexAddr[1] = self.ti0.tmemSize
                     fMaterial.largeTexWords = tmemSize - self.ti0.tmemSize
                     self.ti1.doTexLoad = self.ti1.doTexTile = False
-                elif self.ti1.tmemSize <= tmemSize // 2:
+                elif largeIndex == 0:
                     # Tex 0 large, tex 1 normal
                     self.texDimensions = self.ti0.imageDims
                     fMaterial.largeTexFmt = self.ti0.texFormat
@@ -822,10 +1095,12 @@ class MultitexManager:
                     self.ti1.texAddr = tmemSize - self.ti1.tmemSize
                 else:
                     # Both textures large
+                    suggestions = planTmem(self.getTmemTextures(), False, True).suggestions
                     raise PluginError(
                         'Error in "'
                         + material.name
                         + '": Multitexture with two large textures is not currently supported.'
+                        + ("\nChanges that would fit:\n" + "\n".join(suggestions) if len(suggestions) > 0 else "")
                     )
                     # Limited cases of 2x large textures could be supported in the
                     # future. However, these cases are either of questionable
@@ -870,13 +1145,19 @@ class MultitexManager:
                     + '": Using the same texture for Tex0 and Tex1 is not compatible with large textures.'
                 )
             elif not bpy.context.scene.ignoreTextureRestrictions:
+                suggestions = planTmem(self.getTmemTextures(), sameTextures, useLargeTextures).suggestions
                 raise PluginError(
                     'Error in "'
                     + material.name
                     + '": Textures are too big. Max TMEM size is 4k '
                     + "bytes, ex. 2 32x32 RGBA 16 bit textures.\nNote that texture width will be internally padded to 64 bit boundaries."
+                    + ("\nChanges that would fit:\n" + "\n".join(suggestions) if len(suggestions) > 0 else "")
                 )
 
+        if fModel.convertVertexScroll:
+            textures = [ti for ti in (self.ti0, self.ti1) if ti.useTex]
+            convertVertexScrollToTileScroll(f3dMat, fMaterial, textures)
+
         self.ti0.writeAll(fMaterial, fModel, convertTextureData)
         self.ti1.writeAll(fMaterial, fModel, convertTextureData)
 
@@ -1043,6 +1324,54 @@ def saveTextureTile(
         fMaterial.tileSizeCommands[rendertile] = tileSizeCommand
 
 
+def convertVertexScrollToTileScroll(f3dMat, fMaterial: FMaterial, textures: list[TexInfo]) -> bool:
+    """
+    Replaces the linear vertex UV scroll of a material by tile scrolling its textures, which has a constant cost
+    per frame instead of rewriting every vertex. Only done when the result looks the same: the scrolled axes must wrap
+    without clamping and the offsets must be whole quarter texels (the SetTileSize unit) on every texture tile.
+    """
+
+    scrollFields = fMaterial.scrollData.fields[0]
+    axes = [i for i in range(2) if scrollFields[i].animType != "None"]
+    if len(axes) == 0 or len(textures) == 0:
+        return False
+    # sine and noise scrolls change their speed every frame, tile scrolls can't
+    if any(scrollFields[i].animType != "Linear" for i in axes):
+        return False
+    # only the render tile is scrolled, not the mipmap tiles
+    if f3dMat.rdp_settings.g_mdsft_textlod == "G_TL_LOD":
+        return False
+
+    tileSpeeds = {}
+    for ti in textures:
+        tileScroll = getattr(fMaterial.scrollData, f"tile_scroll_tex{ti.indexInMat}")
+        if fMaterial.isTexLarge[ti.indexInMat] or not ti.doTexTile or tileScroll.s or tileScroll.t:
+            return False
+        speeds = [0, 0]
+        for i in axes:
+            texField = ti.texProp.S if i == 0 else ti.texProp.T
+            # the tile coordinates wrap every 1024 texels, which must be a multiple of the texture period
+            if texField.clamp or texField.mask == 0 or texField.mask + texField.mirror > 10:
+                return False
+            # the tile size is subtracted from the texture coordinates, after the texture scale and tile shift
+            speed = -scrollFields[i].speed * 4 * f3dMat.tex_scale[i] / 2**texField.shift
+            if speed != round(speed) or abs(speed) > 4095:
+                return False
+            speeds[i] = round(speed)
+        tileSpeeds[ti.indexInMat] = speeds
+
+    for texIndex, (s, t) in tileSpeeds.items():
+        tileScroll = getattr(fMaterial.scrollData, f"tile_scroll_tex{texIndex}")
+        tileScroll.s = s
+        tileScroll.t = t
+        # the vertex scroll moves every frame, an interval from the unused tile scroll settings would slow it down
+        tileScroll.interval = 1
+    for i in axes:
+        scrollFields[i].animType = "None"
+    fMaterial.scrollData.convertedVertexScrollAxes = len(axes)
+    return True
+
+
 # palAddr is the address within the second half of tmem (0-255), normally 16*palette num
 # palLen is the number of colors
 def savePaletteLoad(
@@ -1135,6 +1464,11 @@ def writePaletteData(fPalette: FImage, palette: list[int]):
     fPalette.converted = True
 
 
+@profile_stage(
+    "Texture Encoding",
+    item=lambda image, *args: image.name,
+    counters=lambda image, *args: {"texels": image.size[0] * image.size[1]},
+)
 def writeCITextureData(
     image: bpy.types.Image,
     fImage: FImage,
@@ -1154,6 +1488,11 @@ def writeCITextureData(
     fImage.converted = True
 
 
+@profile_stage(
+    "Texture Encoding",
+    item=lambda image, *args: image.name,
+    counters=lambda image, *args: {"texels": image.size[0] * image.size[1]},
+)
 def writeNonCITextureData(image: bpy.types.Image, fImage: FImage, texFmt: str):
     if fImage.converted:
         return
@@ -0,0 +1,178 @@
+from dataclasses import dataclass, field
+from typing import Optional
+from .f3d_enums import texBitSizeInt
+
+TMEM_WORDS = 512
+# CI textures can only use the lower half of TMEM, the upper half holds the palettes
+TMEM_CI_WORDS = 256
+# Smallest amount of TMEM left for the tiles of a large texture next to a normal texture
+LARGE_TEXTURE_MIN_WORDS = 64
+
+# Formats suggested when a texture doesn't fit, from the least to the most lossy
+tmemSmallerFormats = {
+    "RGBA32": ["RGBA16"],
+    "IA16": ["IA8", "IA4"],
+    "IA8": ["IA4"],
+    "I8": ["I4"],
+    "CI8": ["CI4"],
+}
+# Only suggested for single textures, multitexture can't mix CI and non-CI
+tmemSmallerCIFormats = {"RGBA32": ["CI8", "CI4"], "RGBA16": ["CI8", "CI4"]}
+
+
+def getTmemWordUsage(texFormat, width, height):
+    texelsPerWord = 64 // texBitSizeInt[texFormat]
+    return (width + texelsPerWord - 1) // texelsPerWord * height
+
+
+def getTmemMax(texFormat):
+    return 4096 if texFormat[:2] != "CI" else 2048
+
+
+@dataclass
+class TmemTexture:
+    index: int
+    texFormat: str
+    width: int
+    height: int
+    # Palette entries loaded for this texture and their index in the upper half of TMEM, 0 if not loaded
+    palLen: int = 0
+    palAddr: int = 0
+
+    @property
+    def isCI(self):
+        return self.texFormat[:2] == "CI"
+
+    @property
+    def words(self):
+        return getTmemWordUsage(self.texFormat, self.width, self.height)
+
+    @property
+    def bits(self):
+        return self.width * self.height * texBitSizeInt[self.texFormat]
+
+    def describe(self):
+        return f"{self.texFormat} {self.width}x{self.height}"
+
+
+@dataclass
+class TmemRegion:
+    start: int  # in 64 bit words
+    size: int
+    label: str
+
+
+@dataclass
+class TmemPlan:
+    capacity: int
+    regions: list[TmemRegion] = field(default_factory=list)
+    # Index in the material of the texture loaded in tiles, or None
+    largeIndex: Optional[int] = None
+    fits: bool = True
+    suggestions: list[str] = field(default_factory=list)
+
+    @property
+    def occupied(self):
+        return sum(region.size for region in self.regions if region.start < self.capacity)
+
+
+def chooseLargeTexture(words0: int, words1: int, capacity: int) -> Optional[int]:
+    """
+    Returns the index of the texture of a multitexture material to load in tiles, the other one is loaded normally.
+    The large texture gets the TMEM left by the other one, so the smaller texture is loaded normally.
+    Returns None if neither texture leaves enough TMEM.
+    """
+
+    candidates = [
+        largeIndex for largeIndex, words in ((1, words0), (0, words1)) if capacity - words >= LARGE_TEXTURE_MIN_WORDS
+    ]
+    if len(candidates) == 0:
+        return None
+    return max(candidates, key=lambda largeIndex: capacity - (words0 if largeIndex == 1 else words1))
+
+
+def planTmem(
+    textures: list[TmemTexture], sameTextures: bool = False, useLargeTextures: bool = False, suggest: bool = True
+) -> TmemPlan:
+    """Lays out the used textures of a material in TMEM, like MultitexManager.writeAll"""
+
+    capacity = TMEM_CI_WORDS if any(tex.isCI for tex in textures) else TMEM_WORDS
+    plan = TmemPlan(capacity)
+    if len(textures) == 0:
+        return plan
+
+    if sameTextures:
+        plan.regions.append(TmemRegion(0, textures[0].words, f"Texture 0 / 1 ({textures[0].describe()})"))
+        plan.fits = textures[0].words <= capacity and not useLargeTextures
+    elif not useLargeTextures or sum(tex.words for tex in textures) <= capacity:
+        addr = 0
+        for tex in textures:
+            plan.regions.append(TmemRegion(addr, tex.words, f"Texture {tex.index} ({tex.describe()})"))
+            addr += tex.words
+        plan.fits = addr <= capacity
+    elif len(textures) == 1:
+        plan.largeIndex = textures[0].index
+        plan.regions.append(TmemRegion(0, capacity, f"Texture {textures[0].index} tiles ({textures[0].describe()})"))
+    else:
+        tex0, tex1 = textures
+        plan.largeIndex = chooseLargeTexture(tex0.words, tex1.words, capacity)
+        if plan.largeIndex is None:
+            plan.fits = False
+        elif plan.largeIndex == 1:
+            plan.regions.append(TmemRegion(0, tex0.words, f"Texture 0 ({tex0.describe()})"))
+            plan.regions.append(TmemRegion(tex0.words, capacity - tex0.words, f"Texture 1 tiles ({tex1.describe()})"))
+        else:
+            plan.regions.append(TmemRegion(0, capacity - tex1.words, f"Texture 0 tiles ({tex0.describe()})"))
+            plan.regions.append(TmemRegion(capacity - tex1.words, tex1.words, f"Texture 1 ({tex1.describe()})"))
+
+    for tex in textures:
+        if tex.isCI and tex.palLen > 0:
+            plan.regions.append(TmemRegion(TMEM_CI_WORDS + tex.palAddr, tex.palLen, f"Palette {tex.index}"))
+
+    if not plan.fits and suggest:
+        plan.suggestions = suggestTmemChanges(textures, sameTextures, useLargeTextures)
+    return plan
+
+
+def getTmemCandidates(tex: TmemTexture, allowCI: bool):
+    formats = tmemSmallerFormats.get(tex.texFormat, [])
+    if allowCI:
+        formats = formats + tmemSmallerCIFormats.get(tex.texFormat, [])
+    for texFormat in formats:
+        yield "format", TmemTexture(tex.index, texFormat, tex.width, tex.height)
+
+    minWidth = 2 if texBitSizeInt[tex.texFormat] == 4 else 1
+    height = tex.height // 2
+    while height >= 1:
+        yield "size", TmemTexture(tex.index, tex.texFormat, tex.width, height)
+        height //= 2
+    width = tex.width // 2
+    while width >= minWidth and (minWidth == 1 or width % 2 == 0):
+        yield "size", TmemTexture(tex.index, tex.texFormat, width, tex.height)
+        width //= 2
+
+
+def suggestTmemChanges(
+    textures: list[TmemTexture], sameTextures: bool, useLargeTextures: bool, maxSuggestions: int = 3
+) -> list[str]:
+    """
+    Finds the smallest format change and size change of each texture that make the textures fit in TMEM,
+    sorted by the amount of texture data they keep.
+    """
+
+    if sameTextures:
+        textures = textures[:1]
+    suggestions: list[tuple[int, str]] = []
+    for i, tex in enumerate(textures):
+        best: dict[str, TmemTexture] = {}
+        for kind, candidate in getTmemCandidates(tex, len(textures) == 1):
+            if kind in best and candidate.bits <= best[kind].bits:
+                continue
+            changed = textures[:i] + [candidate] + textures[i + 1 :]
+            if planTmem(changed, sameTextures, useLargeTextures, False).fits:
+                best[kind] = candidate
+        for candidate in best.values():
+            suggestions.append((candidate.bits, f"Texture {tex.index}: {tex.describe()} -> {candidate.describe()}"))
+
+    suggestions.sort(key=lambda entry: entry[0], reverse=True)
+    return [suggestion for _, suggestion in suggestions[:maxSuggestions]]
@@ -14,11 +14,12 @@ from .f3d_material import (
     get_textlut_mode,
     RDPSettings,
 )
-from .f3d_texture_writer import MultitexManager, TileLoad, maybeSaveSingleLargeTextureSetup
+from .f3d_texture_writer import MultitexManager, TileLoad, maybeSaveSingleLargeTextureSetup, planTileLoads
 from .f3d_gbi import *
 from .f3d_bleed import BleedGraphics
 
 from ..utility import *
+from ..profiler import profile_stage, profile_export
 
 
 def getColorLayer(mesh: bpy.types.Mesh, layer="Col"):
@@ -335,16 +336,12 @@ def saveMeshWithLargeTexturesByFaces(
     if fMaterial.imageKey[1] is not None:
         fImage1 = fModel.getTextureAndHandleShared(fMaterial.imageKey[1])
 
-    tileLoads = []
+    faceTileLoads = []
     for face in faces:
         faceTileLoad = TileLoad(material, fMaterial, texDimensions)
         faceTileLoad.initWithFace(obj, face)
-
-        for tileLoad in tileLoads:
-            if tileLoad.trySubsume(faceTileLoad):
-                break
-        else:
-            tileLoads.append(faceTileLoad)
+        faceTileLoads.append(faceTileLoad)
+    tileLoads = planTileLoads(faceTileLoads, material.name)
 
     if material.name != lastMaterialName:
         fMesh.add_material_call(fMaterial)
@@ -412,6 +409,14 @@ def saveMeshWithLargeTexturesByFaces(
 
 # Make sure to set original_name before calling this
 # used when duplicating an object
+@profile_stage(
+    "Mesh Conversion",
+    item=lambda triConverterInfo, fModel, obj, *args: obj.name,
+    counters=lambda triConverterInfo, fModel, obj, *args: {
+        "triangles": len(obj.data.loop_triangles),
+        "vertices": len(obj.data.vertices),
+    },
+)
 def saveStaticModel(
     triConverterInfo, fModel, obj, transformMatrix, ownerName, convertTextureData, revertMatAtEnd, drawLayerField
 ):
@@ -1287,6 +1292,7 @@ def getTexDimensions(material):
     return texDimensions
 
 
+@profile_stage("Material Conversion", item=lambda material, *args: material.name)
 def saveOrGetF3DMaterial(material, fModel, obj, drawLayer, convertTextureData):
     print(f"Writing material {material.name}")
     if material.mat_ver > 3:
@@ -1441,7 +1447,7 @@ def saveOrGetF3DMaterial(material, fModel, obj, drawLayer, convertTextureData):
     saveOtherModeHDefinition(
         fMaterial,
         f3dMat.rdp_settings,
-        get_textlut_mode(f3dMat),
+        multitexManager.getTextlutMode(f3dMat),
         defaults,
         fModel.matWriteMethod,
         fModel.f3d,
@@ -1931,6 +1937,7 @@ class F3D_ExportDL(bpy.types.Operator):
 
     # Called on demand (i.e. button press, menu item)
     # Can also be called from operator search menu (Spacebar)
+    @profile_export("Export Display List")
     def execute(self, context):
         if context.mode != "OBJECT":
             bpy.ops.object.mode_set(mode="OBJECT")
@@ -2013,6 +2020,10 @@ class F3D_ExportDLPanel(bpy.types.Panel):
             prop_split(col, context.scene, "DLTexDir", "Texture Include Path")
             col.prop(context.scene, "DLSeparateTextureDef")
 
+        box = col.box().column()
+        box.operator("object.f3d_analyze_dl_cost")
+        prop_split(box, context.scene, "DLCostSortKey", "Sort By")
+
 
 f3d_writer_classes = (
     F3D_ExportDL,
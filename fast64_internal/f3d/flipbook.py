@@ -232,31 +232,53 @@ def ootFlipbookRequirementMessage(layout: bpy.types.UILayout):
     layout.label(text="texture reference with name = 0x0?000000.")
 
 
-def ootFlipbookAnimUpdate(self, armatureObj: bpy.types.Object, segment: str, index: int):
+def ootGetFlipbookSegmentTextures(armatureObj: bpy.types.Object) -> dict[str, list[tuple[bpy.types.Material, int]]]:
+    """Returns the (material, texture index) of each flipbook texture of the armature's meshes, by segment"""
+    segmentTextures: dict[str, list[tuple[bpy.types.Material, int]]] = {}
     for child in armatureObj.children:
         if child.type != "MESH":
             continue
         for material in child.data.materials:
+            if material is None:
+                continue
             for i in range(2):
                 flipbook = getattr(material.flipbookGroup, "flipbook" + str(i))
                 texProp = getattr(material.f3d_mat, "tex" + str(i))
                 if usesFlipbook(material, flipbook, i, True, ootFlipbookReferenceIsValid):
                     match = re.search(f"0x0([0-9A-F])000000", texProp.tex_reference)
-                    if match is None:
-                        continue
-                    if match.group(1) == segment:
-                        # Remember that index 0 = auto, and keyframed values start at 1
-                        flipbookIndex = min((index - 1 if index > 0 else 0), len(flipbook.textures) - 1)
-                        setTexNodeImage(material, i, flipbookIndex)
+                    if match is not None:
+                        segmentTextures.setdefault(match.group(1), []).append((material, i))
+    return segmentTextures
+
+
+def ootSetFlipbookTextures(textures: list[tuple[bpy.types.Material, int]], index: int):
+    for material, i in textures:
+        flipbook = getattr(material.flipbookGroup, "flipbook" + str(i))
+        # Remember that index 0 = auto, and keyframed values start at 1
+        flipbookIndex = min((index - 1 if index > 0 else 0), len(flipbook.textures) - 1)
+        setTexNodeImage(material, i, flipbookIndex)
+
+
+def ootFlipbookAnimUpdate(self, armatureObj: bpy.types.Object, segment: str, index: int):
+    ootSetFlipbookTextures(ootGetFlipbookSegmentTextures(armatureObj).get(segment, []), index)
+    # the textures were set outside of the animation handler
+    flipbookAnimApplied.pop((armatureObj.name, segment), None)
 
 
 # END GAME SPECIFIC CALLBACKS
 
+# keyframed armature name -> segment -> (material name, texture index), rebuilt after depsgraph updates
+flipbookAnimIndex: Optional[dict[str, dict[str, list[tuple[str, int]]]]] = None
+# (armature name, segment) -> last flipbook index set by the handler
+flipbookAnimApplied: dict[tuple[str, str], int] = {}
+ootFlipbookAnimSegments = (("8", "eyes"), ("9", "mouth"))
 
-# we use a handler since update functions are not called when a property is animated.
-@persistent
-def flipbookAnimHandler(dummy):
-    if bpy.context.scene.gameEditorMode == "OOT":
+
+def getFlipbookAnimIndex():
+    global flipbookAnimIndex
+    if flipbookAnimIndex is None:
+        flipbookAnimApplied.clear()
+        flipbookAnimIndex = {}
         for obj in bpy.data.objects:
             if obj.type == "ARMATURE":
                 # we only want to update texture on keyframed armatures.
@@ -268,12 +290,57 @@ def flipbookAnimHandler(dummy):
                     action.fcurves.find("ootLinkTextureAnim.eyes") is None
                     or action.fcurves.find("ootLinkTextureAnim.mouth") is None
                 ):
-                    ootFlipbookAnimUpdate(obj.data, obj, "8", obj.ootLinkTextureAnim.eyes)
-                    ootFlipbookAnimUpdate(obj.data, obj, "9", obj.ootLinkTextureAnim.mouth)
+                    flipbookAnimIndex[obj.name] = {
+                        segment: [(material.name, i) for material, i in textures]
+                        for segment, textures in ootGetFlipbookSegmentTextures(obj).items()
+                    }
+    return flipbookAnimIndex
+
+
+def invalidateFlipbookAnimIndex():
+    global flipbookAnimIndex
+    flipbookAnimIndex = None
+
+
+# we use a handler since update functions are not called when a property is animated.
+@persistent
+def flipbookAnimHandler(dummy):
+    if bpy.context.scene.gameEditorMode == "OOT":
+        for armatureName, segmentTextures in getFlipbookAnimIndex().items():
+            obj = bpy.data.objects.get(armatureName)
+            if obj is None:
+                continue
+            for segment, propName in ootFlipbookAnimSegments:
+                index = getattr(obj.ootLinkTextureAnim, propName)
+                if flipbookAnimApplied.get((armatureName, segment)) == index:
+                    continue
+                flipbookAnimApplied[(armatureName, segment)] = index
+                textures = [
+                    (bpy.data.materials[name], i)
+                    for name, i in segmentTextures.get(segment, [])
+                    if name in bpy.data.materials
+                ]
+                ootSetFlipbookTextures(textures, index)
     else:
         pass
 
 
+@persistent
+def flipbookDepsgraphHandler(scene: bpy.types.Scene, depsgraph: bpy.types.Depsgraph):
+    # frame changes don't run this handler, only edits (parenting, materials, keyframes, ...)
+    if flipbookAnimIndex is None:
+        return
+    for update in depsgraph.updates:
+        if isinstance(update.id, (bpy.types.Object, bpy.types.Material, bpy.types.Action, bpy.types.Mesh)):
+            invalidateFlipbookAnimIndex()
+            return
+
+
+@persistent
+def flipbookLoadHandler(dummy):
+    invalidateFlipbookAnimIndex()
+
+
 class Flipbook_MaterialPanel(bpy.types.Panel):
     bl_label = "Flipbook Material"
     bl_idname = "MATERIAL_PT_Flipbook_Material_Inspector"
@@ -325,6 +392,10 @@ def flipbook_register():
         register_class(cls)
 
     bpy.app.handlers.frame_change_pre.append(flipbookAnimHandler)
+    bpy.app.handlers.depsgraph_update_post.append(flipbookDepsgraphHandler)
+    bpy.app.handlers.load_post.append(flipbookLoadHandler)
+    bpy.app.handlers.undo_post.append(flipbookLoadHandler)
+    bpy.app.handlers.redo_post.append(flipbookLoadHandler)
     bpy.types.Material.flipbookGroup = bpy.props.PointerProperty(type=FlipbookGroupProperty)
 
 
@@ -333,4 +404,9 @@ def flipbook_unregister():
         unregister_class(cls)
 
     bpy.app.handlers.frame_change_pre.remove(flipbookAnimHandler)
+    bpy.app.handlers.depsgraph_update_post.remove(flipbookDepsgraphHandler)
+    bpy.app.handlers.load_post.remove(flipbookLoadHandler)
+    bpy.app.handlers.undo_post.remove(flipbookLoadHandler)
+    bpy.app.handlers.redo_post.remove(flipbookLoadHandler)
+    invalidateFlipbookAnimIndex()
     del bpy.types.Material.flipbookGroup
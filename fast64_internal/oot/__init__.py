@@ -80,6 +80,13 @@ class OOT_Properties(bpy.types.PropertyGroup):
         name="Use decomp for export", description="Use names and macros from decomp when exporting", default=True
     )
 
+    persistentSourceCache: bpy.props.BoolProperty(
+        name="Keep Decomp Files Cached",
+        description="Keep the decomp files read by importers cached between imports. "
+        "Files are read again when their modification time or size changes",
+        default=False,
+    )
+
     exportMotionOnly: bpy.props.BoolProperty(
         name="Export CS Motion Data Only",
         description=(
@@ -2,6 +2,7 @@ import math
 import mathutils
 import bpy
 from ....utility import PluginError, toAlnum
+from ....profiler import profile_stage
 from ...skeleton.exporter import ootConvertArmatureToSkeletonWithoutMesh
 from .classes import OOTAnimation, OOTLinkAnimation
 
@@ -85,6 +86,7 @@ def ootGetAnimBoneRot(bone, poseBone, convertTransformMatrix, isRoot):
     return finalRotation
 
 
+@profile_stage("Animation Conversion", item=lambda anim, armatureObj, *args, **kwargs: armatureObj.name)
 def ootConvertNonLinkAnimationData(anim, armatureObj, convertTransformMatrix, *, frame_start, frame_count):
     checkForStartBone(armatureObj)
     bonesToProcess = [getStartBone(armatureObj)]
@@ -151,6 +153,7 @@ def ootConvertNonLinkAnimationData(anim, armatureObj, convertTransformMatrix, *,
     return armatureFrameData
 
 
+@profile_stage("Animation Conversion", item=lambda anim, armatureObj, *args, **kwargs: armatureObj.name)
 def ootConvertLinkAnimationData(anim, armatureObj, convertTransformMatrix, *, frame_start, frame_count):
     checkForStartBone(armatureObj)
     bonesToProcess = [getStartBone(armatureObj)]
@@ -3,8 +3,8 @@ import bpy
 import re
 import math
 from ....utility import PluginError, hexOrDecInt
-from ....f3d.f3d_parser import getImportData
 from ...oot_model_classes import ootGetIncludedAssetData
+from ...oot_source_cache import ootSourceCache
 
 from ....utility_anim import (
     getTranslationRelativeToRest,
@@ -55,7 +55,7 @@ def getJointIndices(filepath, animData, jointIndicesName):
 
 
 def ootImportNonLinkAnimationC(armatureObj, filepath, animName, actorScale, isCustomImport: bool):
-    animData = getImportData([filepath])
+    animData = ootSourceCache.readFiles([filepath])
     if not isCustomImport:
         basePath = bpy.path.abspath(bpy.context.scene.ootDecompPath)
         animData = ootGetIncludedAssetData(basePath, [filepath], animData) + animData
@@ -162,8 +162,8 @@ def ootImportLinkAnimationC(
     numLimbs: int,
     isCustomImport: bool,
 ):
-    animHeaderData = getImportData([animHeaderFilepath])
-    animData = getImportData([animFilepath])
+    animHeaderData = ootSourceCache.readFiles([animHeaderFilepath])
+    animData = ootSourceCache.readFiles([animFilepath])
     if not isCustomImport:
         basePath = bpy.path.abspath(bpy.context.scene.ootDecompPath)
         animHeaderData = ootGetIncludedAssetData(basePath, [animHeaderFilepath], animHeaderData) + animHeaderData
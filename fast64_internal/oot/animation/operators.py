@@ -4,6 +4,8 @@ from bpy.props import StringProperty, BoolProperty
 from bpy.utils import register_class, unregister_class
 from bpy.ops import object
 from ...utility import PluginError, toAlnum, writeCData, raisePluginError
+from ...profiler import profile_export
+from ..oot_source_cache import use_oot_source_cache
 from .properties import OOTAnimExportSettingsProperty, OOTAnimImportSettingsProperty
 from .exporter import ootExportLinkAnimation, ootExportNonLinkAnimation
 from .importer import ootImportLinkAnimationC, ootImportNonLinkAnimationC
@@ -109,6 +111,7 @@ class OOT_ExportAnim(Operator):
 
     # Called on demand (i.e. button press, menu item)
     # Can also be called from operator search menu (Spacebar)
+    @profile_export("Export Animation")
     def execute(self, context):
         try:
             if len(context.selected_objects) == 0 or not isinstance(context.selected_objects[0].data, Armature):
@@ -141,6 +144,7 @@ class OOT_ImportAnim(Operator):
 
     # Called on demand (i.e. button press, menu item)
     # Can also be called from operator search menu (Spacebar)
+    @use_oot_source_cache("Import Animation")
     def execute(self, context):
         try:
             if len(context.selected_objects) == 0 or not isinstance(context.selected_objects[0].data, Armature):
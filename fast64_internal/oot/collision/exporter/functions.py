@@ -2,6 +2,7 @@ import bpy
 import mathutils
 
 from ....utility import PluginError
+from ....profiler import profile_stage
 from ...oot_utility import convertIntTo2sComplement
 from .classes import OOTCollisionVertex, OOTCollisionPolygon, getPolygonType
 
@@ -82,6 +83,7 @@ def addCollisionTriangles(obj, collisionDict, includeChildren, transformMatrix,
 
 
 # water boxes handled by level writer
+@profile_stage("Collision Conversion", item=lambda collision, obj, *args: obj.name)
 def exportCollisionCommon(collision, obj, transformMatrix, includeChildren, name):
     bpy.ops.object.select_all(action="DESELECT")
     obj.select_set(True)
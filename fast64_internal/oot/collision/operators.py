@@ -3,6 +3,7 @@ from bpy.utils import register_class, unregister_class
 from bpy.ops import object
 from mathutils import Matrix
 from ...utility import PluginError, raisePluginError
+from ...profiler import profile_export
 from ..oot_utility import getOOTScale
 from ..collision.exporter.to_c import exportCollisionToC
 from .properties import OOTCollisionExportSettings
@@ -14,6 +15,7 @@ class OOT_ExportCollision(Operator):
     bl_label = "Export Collision"
     bl_options = {"REGISTER", "UNDO", "PRESET"}
 
+    @profile_export("Export Collision")
     def execute(self, context):
         obj = None
         if context.mode != "OBJECT":
@@ -7,7 +7,7 @@ from ....utility import PluginError
 from ...oot_constants import ootData
 from ..classes import CutsceneObjectFactory
 from ..constants import ootEnumCSActorCueListCommandType
-from ..preview import initFirstFrame, setupCompositorNodes
+from ..preview import initFirstFrame, setupCompositorNodes, invalidateCutscenePreview
 from .utility import (
     setupActorCuePreview,
     metersToBlend,
@@ -78,6 +78,7 @@ class CutsceneCmdPlayPreview(Operator):
                 previewSettings.ootCSPreviewNodesReady = False
                 setupCompositorNodes()
                 initFirstFrame(csObj, previewSettings.ootCSPreviewNodesReady, cameraObj)
+                invalidateCutscenePreview()
                 bpy.ops.screen.animation_cancel()
                 bpy.ops.screen.animation_play()
                 return {"FINISHED"}
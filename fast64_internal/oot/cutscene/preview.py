@@ -1,6 +1,7 @@
 import bpy
 
-from math import isclose
+from dataclasses import dataclass
+from typing import Optional
 from bpy.types import Scene, Object, Node
 from bpy.app.handlers import persistent
 from ...utility import gammaInverse, hexOrDecInt
@@ -104,89 +105,177 @@ def initFirstFrame(csObj: Object, useNodeFeatures: bool, defaultCam: Object):
         bpy.context.scene.node_tree.nodes["CSTrans_RGB"].outputs[0].default_value = color
         bpy.context.scene.node_tree.nodes["CSMisc_RGB"].outputs[0].default_value = color
         csObj.ootCutsceneProperty.preview.trigger = False
-    csObj.ootCutsceneProperty.preview.isFixedCamSet = False
     if defaultCam is not None:
         bpy.context.scene.camera = defaultCam
 
 
-def processCurrentFrame(csObj: Object, curFrame: float, useNodeFeatures: bool, cameraObjects: Object):
-    """Execute the actions of each command to create the preview for the current frame"""
-    # this function was partially adapted from ``z_demo.c``
-
-    if curFrame == 0:
-        initFirstFrame(csObj, useNodeFeatures, cameraObjects[1])
-
-    if useNodeFeatures:
-        previewProp = csObj.ootCutsceneProperty.preview
-        for transitionCmd in csObj.ootCutsceneProperty.preview.transitionList:
-            startFrame = transitionCmd.startFrame
-            endFrame = transitionCmd.endFrame
-            frameCur = curFrame
-            isTriggerInstance = transitionCmd.type == "trigger_instance"
-            linear160 = getColor(160.0)
-
-            if transitionCmd.type == "Unknown":
+# frames between two saved preview states, seeking replays at most this many frames
+PREVIEW_CHECKPOINT_INTERVAL = 32
+MISC_EVENT_TYPES = ("set_locked_viewpoint", "stop_cutscene")
+MISC_COLOR_TYPES = ("vismono_sepia", "vismono_black_and_white", "red_pulsating_lights")
+
+
+@dataclass(frozen=True)
+class CutscenePreviewCommand:
+    startFrame: int
+    endFrame: int
+    type: str
+
+
+@dataclass(frozen=True)
+class CutscenePreviewState:
+    """State of the preview after a frame, only kept in memory"""
+
+    trigger: bool = False  # for ``CS_TRANS_TRIGGER_INSTANCE``
+    isFixedCamSet: bool = False
+    cameraIndex: Optional[int] = None  # index in ``cameraNames``, None to keep the current camera
+    transColor: tuple[float, float, float, float] = (0.0, 0.0, 0.0, 0.0)
+    miscColor: tuple[float, float, float, float] = (0.0, 0.0, 0.0, 0.0)
+
+
+def getFrameIndex(commands: list[CutscenePreviewCommand], getRange) -> tuple[list[list[int]], list[int]]:
+    """
+    Returns the indices of the commands to process for each frame, in list order,
+    and the ones to process after the last indexed frame. ``getRange`` returns (first, last) or (first, None) if endless.
+    """
+
+    ranges = [getRange(cmd) for cmd in commands]
+    frameCount = max([first for first, _ in ranges] + [last + 1 for _, last in ranges if last is not None] + [0])
+    frames: list[list[int]] = [[] for _ in range(frameCount)]
+    for i, (first, last) in enumerate(ranges):
+        for frame in range(max(first, 0), frameCount if last is None else last + 1):
+            frames[frame].append(i)
+    return frames, [i for i, (_, last) in enumerate(ranges) if last is None]
+
+
+class CutscenePreviewTimeline:
+    """
+    The preview commands of a cutscene compiled once, with the preview state saved every few frames
+    so that scrubbing only replays the frames since the last checkpoint.
+    """
+
+    def __init__(self, csObj: Object):
+        self.csObjName = csObj.name
+
+        # the cutscene camera and the first found prerend fixed camera
+        cameraObjects = [findPrerenderCamera(), getCutsceneCamera(csObj)]
+        self.cameraNames = [obj.name if obj is not None else None for obj in cameraObjects]
+
+        self.transitions: list[CutscenePreviewCommand] = []
+        self.misc: list[CutscenePreviewCommand] = []
+        for item in csObj.ootCutsceneProperty.csLists:
+            if item.listType == "Transition":
+                self.transitions.append(
+                    CutscenePreviewCommand(item.transitionStartFrame, item.transitionEndFrame, item.transitionType)
+                )
+            elif item.listType == "MiscList":
+                for miscEntry in item.miscList:
+                    self.misc.append(
+                        CutscenePreviewCommand(miscEntry.startFrame, miscEntry.endFrame, miscEntry.csMiscType)
+                    )
+
+        for cmd in self.transitions + self.misc:
+            if cmd.type == "Unknown":
                 print("ERROR: Unknown command!")
 
-            if curFrame == 0:
-                # makes transitions appear a frame earlier if frame 0
-                frameCur += 1
+        # trigger instances are processed every frame until the trigger is set
+        self.transitionFrames, self.transitionTail = getFrameIndex(
+            self.transitions,
+            lambda cmd: (0, None) if cmd.type == "trigger_instance" else (cmd.startFrame, cmd.endFrame),
+        )
+        self.miscEventFrames, _ = getFrameIndex(
+            [cmd for cmd in self.misc if cmd.type in MISC_EVENT_TYPES], lambda cmd: (cmd.startFrame, cmd.startFrame)
+        )
+        self.miscEvents = [cmd for cmd in self.misc if cmd.type in MISC_EVENT_TYPES]
+        # the colors of misc commands with the same start and end frames stay until the end
+        self.miscColors = [cmd for cmd in self.misc if cmd.type in MISC_COLOR_TYPES]
+        self.miscColorFrames, self.miscColorTail = getFrameIndex(
+            self.miscColors,
+            lambda cmd: (cmd.startFrame, None if cmd.endFrame == cmd.startFrame else cmd.endFrame - 1),
+        )
+
+        self.useNodeFeatures = False
+        self.checkpoints = [CutscenePreviewState()]  # state before frame ``i * PREVIEW_CHECKPOINT_INTERVAL``
+        self.lastFrame = -1
+        self.lastState = CutscenePreviewState()
+
+    def getIndexed(self, frames: list[list[int]], tail: list[int], frame: int):
+        return frames[frame] if frame < len(frames) else tail
+
+    def processFrame(self, state: CutscenePreviewState, curFrame: int) -> tuple[CutscenePreviewState, bool]:
+        """Returns the state after processing a frame and whether the playback should stop"""
+        # this function was partially adapted from ``z_demo.c``
+
+        trigger, isFixedCamSet, cameraIndex = state.trigger, state.isFixedCamSet, state.cameraIndex
+        transColor, miscColor = state.transColor, state.miscColor
+        stop = False
+
+        if curFrame == 0:
+            # set default values for frame 0
+            transColor = miscColor = (0.0, 0.0, 0.0, 0.0)
+            trigger = isFixedCamSet = False
+            if self.cameraNames[1] is not None:
+                cameraIndex = 1
+
+        if self.useNodeFeatures:
+            # makes transitions appear a frame earlier if frame 0
+            frameCur = curFrame + 1 if curFrame == 0 else curFrame
+            linear160 = getColor(160.0)
 
-            if isTriggerInstance and not previewProp.trigger:
-                color = [linear160, linear160, linear160, 1.0]
-                bpy.context.scene.node_tree.nodes["CSTrans_RGB"].outputs[0].default_value = color
+            for i in self.getIndexed(self.transitionFrames, self.transitionTail, frameCur):
+                transitionCmd = self.transitions[i]
+                startFrame = transitionCmd.startFrame
+                endFrame = transitionCmd.endFrame
+                isTriggerInstance = transitionCmd.type == "trigger_instance"
 
-            if frameCur >= startFrame and frameCur <= endFrame:
-                color = [0.0, 0.0, 0.0, 0.0]
-                lerp = getLerp(endFrame, startFrame, frameCur)
-                linear255 = getColor(255.0)
-                linear155 = getColor(155.0)
+                if isTriggerInstance and not trigger:
+                    transColor = (linear160, linear160, linear160, 1.0)
 
-                if isTriggerInstance:
-                    previewProp.trigger = True
+                if frameCur >= startFrame and frameCur <= endFrame:
+                    color = [0.0, 0.0, 0.0, 0.0]
+                    lerp = getLerp(endFrame, startFrame, frameCur)
+                    linear255 = getColor(255.0)
+                    linear155 = getColor(155.0)
 
-                if transitionCmd.type.endswith("in"):
-                    alpha = linear255 * lerp
-                else:
-                    alpha = (1.0 - lerp) * linear255
+                    if isTriggerInstance:
+                        trigger = True
 
-                if "half" in transitionCmd.type:
-                    if "_in_" in transitionCmd.type:
-                        alpha = linear255 - ((1.0 - lerp) * linear155)
+                    if transitionCmd.type.endswith("in"):
+                        alpha = linear255 * lerp
                     else:
-                        alpha = linear255 - (linear155 * lerp)
-
-                if "gray_" in transitionCmd.type or previewProp.trigger:
-                    color[0] = color[1] = color[2] = linear160 * alpha
-                elif "red_" in transitionCmd.type:
-                    color[0] = linear255 * alpha
-                elif "green_" in transitionCmd.type:
-                    color[1] = linear255 * alpha
-                elif "blue_" in transitionCmd.type:
-                    color[2] = linear255 * alpha
-
-                color[3] = alpha
-                bpy.context.scene.node_tree.nodes["CSTrans_RGB"].outputs[0].default_value = color
-
-    for miscCmd in csObj.ootCutsceneProperty.preview.miscList:
-        startFrame = miscCmd.startFrame
-        endFrame = miscCmd.endFrame
-
-        if miscCmd.type == "Unknown":
-            print("ERROR: Unknown command!")
-
-        if curFrame == startFrame:
-            if miscCmd.type == "set_locked_viewpoint" and not None in cameraObjects:
-                bpy.context.scene.camera = cameraObjects[int(csObj.ootCutsceneProperty.preview.isFixedCamSet)]
-                csObj.ootCutsceneProperty.preview.isFixedCamSet ^= True
-
+                        alpha = (1.0 - lerp) * linear255
+
+                    if "half" in transitionCmd.type:
+                        if "_in_" in transitionCmd.type:
+                            alpha = linear255 - ((1.0 - lerp) * linear155)
+                        else:
+                            alpha = linear255 - (linear155 * lerp)
+
+                    if "gray_" in transitionCmd.type or trigger:
+                        color[0] = color[1] = color[2] = linear160 * alpha
+                    elif "red_" in transitionCmd.type:
+                        color[0] = linear255 * alpha
+                    elif "green_" in transitionCmd.type:
+                        color[1] = linear255 * alpha
+                    elif "blue_" in transitionCmd.type:
+                        color[2] = linear255 * alpha
+
+                    color[3] = alpha
+                    transColor = tuple(color)
+
+        for i in self.getIndexed(self.miscEventFrames, [], curFrame):
+            miscCmd = self.miscEvents[i]
+            if miscCmd.type == "set_locked_viewpoint" and not None in self.cameraNames:
+                cameraIndex = int(isFixedCamSet)
+                isFixedCamSet ^= True
             elif miscCmd.type == "stop_cutscene":
-                # stop the playback and set the frame to 0
-                bpy.ops.screen.animation_cancel()
-                bpy.context.scene.frame_set(bpy.context.scene.frame_start)
+                stop = True
 
-        if curFrame >= startFrame and (curFrame < endFrame or endFrame == startFrame):
-            if useNodeFeatures:
+        if self.useNodeFeatures:
+            for i in self.getIndexed(self.miscColorFrames, self.miscColorTail, curFrame):
+                miscCmd = self.miscColors[i]
+                startFrame = miscCmd.startFrame
+                endFrame = miscCmd.endFrame
                 color = [0.0, 0.0, 0.0, 0.0]
                 lerp = getLerp(endFrame - 1, startFrame, curFrame)
 
@@ -200,10 +289,10 @@ def processCurrentFrame(csObj: Object, curFrame: float, useNodeFeatures: bool, c
                         color[i] = getColor(col[i])
 
                     color[3] = getColor(255.0) * lerp
-                    bpy.context.scene.node_tree.nodes["CSMisc_RGB"].outputs[0].default_value = color
+                    miscColor = tuple(color)
 
                 elif miscCmd.type == "red_pulsating_lights":
-                    color = bpy.context.scene.node_tree.nodes["CSMisc_RGB"].outputs[0].default_value
+                    color = list(miscColor)
                     color[0] = getColor(255.0)
                     color[1] = color[2] = 0.0
                     step = 0.05
@@ -213,80 +302,156 @@ def processCurrentFrame(csObj: Object, curFrame: float, useNodeFeatures: bool, c
                     else:
                         if color[3] > 0.05:
                             color[3] -= step
-                    bpy.context.scene.node_tree.nodes["CSMisc_RGB"].outputs[0].default_value = color
+                    miscColor = tuple(color)
 
+        return CutscenePreviewState(trigger, isFixedCamSet, cameraIndex, transColor, miscColor), stop
 
-@persistent
-def cutscenePreviewFrameHandler(scene: Scene):
-    """Preview frame handler, executes each frame when the cutscene is played"""
-    previewSettings = scene.ootPreviewSettingsProperty
-    csObj: Object = previewSettings.ootCSPreviewCSObj
+    def getState(self, frame: int) -> tuple[CutscenePreviewState, bool]:
+        """Returns the state after processing ``frame``, stepping once while playing or replaying from a checkpoint"""
 
-    if csObj is None or not csObj.type == "EMPTY" and not csObj.ootEmptyType == "Cutscene":
-        return
+        if frame == self.lastFrame:
+            return self.lastState, False
+
+        if frame == self.lastFrame + 1:
+            state, stop = self.processFrame(self.lastState, frame)
+        else:
+            index = min(frame // PREVIEW_CHECKPOINT_INTERVAL, len(self.checkpoints) - 1)
+            state = self.checkpoints[index]
+            for curFrame in range(index * PREVIEW_CHECKPOINT_INTERVAL, frame + 1):
+                self.saveCheckpoint(state, curFrame)
+                state, _ = self.processFrame(state, curFrame)
+            # events are only executed while playing, not when seeking past them
+            stop = False
 
-    # populate ``cameraObjects`` with the cutscene camera and the first found prerend fixed camera
-    cameraObjects = [None, getCutsceneCamera(csObj)]
+        self.saveCheckpoint(state, frame + 1)
+        self.lastFrame, self.lastState = frame, state
+        return state, stop
 
-    foundObj = None
+    def saveCheckpoint(self, state: CutscenePreviewState, nextFrame: int):
+        if nextFrame == len(self.checkpoints) * PREVIEW_CHECKPOINT_INTERVAL:
+            self.checkpoints.append(state)
+
+
+def findPrerenderCamera():
     for obj in bpy.data.objects:
         if obj.type == "CAMERA" and obj.parent is not None and obj.parent.ootEmptyType in ["Scene", "Room"]:
             camPosProp = obj.ootCameraPositionProperty
             camTypes = ["CAM_SET_PREREND0", "CAM_SET_PREREND_FIXED"]
             if camPosProp.camSType != "Custom" and camPosProp.camSType in camTypes:
-                foundObj = obj
-                break
+                return obj
             elif camPosProp.camSType == "Custom":
                 if camPosProp.camSTypeCustom.startswith("0x"):
                     if hexOrDecInt(camPosProp.camSTypeCustom) == 25:
-                        foundObj = obj
-                        break
+                        return obj
                 elif camPosProp.camSTypeCustom in camTypes:
-                    foundObj = obj
-                    break
+                    return obj
+    return None
+
+
+previewTimeline: Optional[CutscenePreviewTimeline] = None
+# last values written to the scene, to only write the ones that changed
+previewApplied: dict[str, object] = {}
+
+
+def invalidateCutscenePreview():
+    """Drops the compiled preview, it's compiled again on the next frame change"""
+    global previewTimeline
+    previewTimeline = None
+    previewApplied.clear()
 
-    if foundObj is not None:
-        cameraObjects[0] = foundObj
-
-    # setup nodes
-    previewSettings.ootCSPreviewNodesReady = False
-    setupCompositorNodes()
-    previewProp = csObj.ootCutsceneProperty.preview
-
-    # set preview properties
-    previewProp.miscList.clear()
-    previewProp.transitionList.clear()
-    for item in csObj.ootCutsceneProperty.csLists:
-        if item.listType == "Transition":
-            newProp = previewProp.transitionList.add()
-            newProp.startFrame = item.transitionStartFrame
-            newProp.endFrame = item.transitionEndFrame
-            newProp.type = item.transitionType
-        elif item.listType == "MiscList":
-            for miscEntry in item.miscList:
-                newProp = previewProp.miscList.add()
-                newProp.startFrame = miscEntry.startFrame
-                newProp.endFrame = miscEntry.endFrame
-                newProp.type = miscEntry.csMiscType
-
-    # execute the main preview logic
-    curFrame = bpy.context.scene.frame_current
-    if isclose(curFrame, previewProp.prevFrame, abs_tol=1) and isclose(curFrame, previewProp.nextFrame, abs_tol=1):
-        processCurrentFrame(csObj, curFrame, previewSettings.ootCSPreviewNodesReady, cameraObjects)
-    else:
-        # Simulate cutscene for all frames up to present
-        for i in range(bpy.context.scene.frame_current):
-            processCurrentFrame(csObj, i, previewSettings.ootCSPreviewNodesReady, cameraObjects)
-
-    # since we reached the end of the function, the current frame becomes the previous one
-    previewProp.nextFrame = curFrame + 2 if curFrame > previewProp.prevFrame else curFrame - 2
-    previewProp.prevFrame = curFrame
+
+def getCutscenePreviewTimeline(csObj: Object):
+    global previewTimeline
+    if previewTimeline is None or previewTimeline.csObjName != csObj.name:
+        previewApplied.clear()
+        previewTimeline = CutscenePreviewTimeline(csObj)
+        bpy.context.scene.ootPreviewSettingsProperty.ootCSPreviewNodesReady = False
+        setupCompositorNodes()
+        previewTimeline.useNodeFeatures = bpy.context.scene.ootPreviewSettingsProperty.ootCSPreviewNodesReady
+    return previewTimeline
+
+
+def applyPreviewValue(key: str, value, setValue):
+    if previewApplied.get(key) != value:
+        setValue(value)
+        previewApplied[key] = value
+
+
+def applyPreviewState(scene: Scene, timeline: CutscenePreviewTimeline, state: CutscenePreviewState):
+    if timeline.useNodeFeatures:
+        nodes = scene.node_tree.nodes
+        for key, nodeName in (("transColor", "CSTrans_RGB"), ("miscColor", "CSMisc_RGB")):
+            socket = nodes[nodeName].outputs[0]
+            applyPreviewValue(key, getattr(state, key), lambda value: setattr(socket, "default_value", value))
+
+    if state.cameraIndex is not None:
+        camera = bpy.data.objects.get(timeline.cameraNames[state.cameraIndex])
+        if camera is not None and scene.camera != camera:
+            scene.camera = camera
+
+
+@persistent
+def cutscenePreviewFrameHandler(scene: Scene):
+    """Preview frame handler, executes each frame when the cutscene is played"""
+    previewSettings = scene.ootPreviewSettingsProperty
+    csObj: Object = previewSettings.ootCSPreviewCSObj
+
+    if csObj is None or not csObj.type == "EMPTY" and not csObj.ootEmptyType == "Cutscene":
+        return
+
+    timeline = getCutscenePreviewTimeline(csObj)
+    curFrame = scene.frame_current
+    if curFrame < 0:
+        return
+
+    state, stop = timeline.getState(curFrame)
+    applyPreviewState(scene, timeline, state)
+
+    if stop:
+        # stop the playback and set the frame to 0
+        bpy.ops.screen.animation_cancel()
+        scene.frame_set(scene.frame_start)
+
+
+@persistent
+def cutscenePreviewDepsgraphHandler(scene: Scene, depsgraph: bpy.types.Depsgraph):
+    """Invalidates the compiled preview when the cutscene object or a scene/room camera is edited"""
+    if previewTimeline is None:
+        return
+
+    for update in depsgraph.updates:
+        obj = update.id.original if isinstance(update.id, Object) else None
+        if obj is not None and (
+            obj.name == previewTimeline.csObjName
+            or obj.type == "CAMERA"
+            and obj.parent is not None
+            and obj.parent.ootEmptyType in ["Scene", "Room"]
+        ):
+            invalidateCutscenePreview()
+            return
+
+
+@persistent
+def cutscenePreviewLoadHandler(dummy):
+    invalidateCutscenePreview()
 
 
 def cutscene_preview_register():
     bpy.app.handlers.frame_change_pre.append(cutscenePreviewFrameHandler)
+    bpy.app.handlers.depsgraph_update_post.append(cutscenePreviewDepsgraphHandler)
+    bpy.app.handlers.load_post.append(cutscenePreviewLoadHandler)
+    bpy.app.handlers.undo_post.append(cutscenePreviewLoadHandler)
+    bpy.app.handlers.redo_post.append(cutscenePreviewLoadHandler)
 
 
 def cutscene_preview_unregister():
-    if cutscenePreviewFrameHandler in bpy.app.handlers.frame_change_pre:
-        bpy.app.handlers.frame_change_pre.remove(cutscenePreviewFrameHandler)
+    invalidateCutscenePreview()
+    for handlers, handler in (
+        (bpy.app.handlers.frame_change_pre, cutscenePreviewFrameHandler),
+        (bpy.app.handlers.depsgraph_update_post, cutscenePreviewDepsgraphHandler),
+        (bpy.app.handlers.load_post, cutscenePreviewLoadHandler),
+        (bpy.app.handlers.undo_post, cutscenePreviewLoadHandler),
+        (bpy.app.handlers.redo_post, cutscenePreviewLoadHandler),
+    ):
+        if handler in handlers:
+            handlers.remove(handler)
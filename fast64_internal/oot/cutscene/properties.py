@@ -280,27 +280,8 @@ class OOTCSListProperty(PropertyGroup):
             box.label(text="No items in " + getEnumName(ootEnumCSListType, self.listType))
 
 
-class OOTCutsceneCommandBase:
-    startFrame: IntProperty(min=0)
-    endFrame: IntProperty(min=0)
-
-
-class OOTCutsceneTransitionProperty(OOTCutsceneCommandBase, PropertyGroup):
-    type: StringProperty(default="Unknown")
-
-
-class OOTCutsceneMiscProperty(OOTCutsceneCommandBase, PropertyGroup):
-    type: StringProperty(default="Unknown")
-
-
 class OOTCutscenePreviewProperty(PropertyGroup):
-    transitionList: CollectionProperty(type=OOTCutsceneTransitionProperty)
-    miscList: CollectionProperty(type=OOTCutsceneMiscProperty)
-
     trigger: BoolProperty(default=False)  # for ``CS_TRANS_TRIGGER_INSTANCE``
-    isFixedCamSet: BoolProperty(default=False)
-    prevFrame: IntProperty(default=-1)
-    nextFrame: IntProperty(default=1)
 
 
 class OOTCutscenePreviewSettingsProperty(PropertyGroup):
@@ -432,8 +413,6 @@ classes = (
     OOTCSMiscProperty,
     OOTCSRumbleProperty,
     OOTCSListProperty,
-    OOTCutsceneTransitionProperty,
-    OOTCutsceneMiscProperty,
     OOTCutscenePreviewProperty,
     OOTCutscenePreviewSettingsProperty,
     OOTCutsceneProperty,
@@ -2,12 +2,14 @@ import bpy
 import os
 
 from mathutils import Matrix
+from typing import Optional
 from bpy.types import Object
 from ...f3d.f3d_gbi import DLFormat, TextureExportSettings
 from ..oot_model_classes import OOTModel
 from ..oot_f3d_writer import writeTextureArraysNew, writeTextureArraysExisting1D
 from .scene import Scene
-from .decomp_edit import Files
+from .decomp_edit import Files, DecompEditSession
+from ...profiler import profile_stage
 
 from ...utility import (
     PluginError,
@@ -29,9 +31,11 @@ from ..oot_utility import (
 )
 
 
-def writeTextureArraysExistingScene(fModel: OOTModel, exportPath: str, sceneInclude: str):
+def writeTextureArraysExistingScene(
+    fModel: OOTModel, exportPath: str, sceneInclude: str, session: Optional[DecompEditSession] = None
+):
     drawConfigPath = os.path.join(exportPath, "src/code/z_scene_table.c")
-    drawConfigData = readFile(drawConfigPath)
+    drawConfigData = session.getText("src/code/z_scene_table.c") if session is not None else readFile(drawConfigPath)
     newData = drawConfigData
 
     if f'#include "{sceneInclude}"' not in newData:
@@ -46,13 +50,17 @@ def writeTextureArraysExistingScene(fModel: OOTModel, exportPath: str, sceneIncl
             raise PluginError("Scenes can only use array flipbooks.")
 
     if newData != drawConfigData:
-        writeFile(drawConfigPath, newData)
+        if session is not None:
+            session.setText("src/code/z_scene_table.c", newData)
+        else:
+            writeFile(drawConfigPath, newData)
 
 
 class SceneExport:
     """This class is the main exporter class, it handles generating the C data and writing the files"""
 
     @staticmethod
+    @profile_stage("OoT Scene Conversion", item=lambda originalSceneObj, *args: originalSceneObj.name)
     def create_scene(originalSceneObj: Object, transform: Matrix, exportInfo: ExportInfo) -> Scene:
         """Returns and creates scene data"""
         # init
@@ -88,8 +96,13 @@ class SceneExport:
         return newScene
 
     @staticmethod
-    def export(originalSceneObj: Object, transform: Matrix, exportInfo: ExportInfo):
-        """Main function"""
+    def export(
+        originalSceneObj: Object,
+        transform: Matrix,
+        exportInfo: ExportInfo,
+        session: Optional[DecompEditSession] = None,
+    ):
+        """Main function, the decomp file edits are written when ``session`` ends if it's given"""
         # circular import fixes
         from .decomp_edit.config import Config
 
@@ -113,7 +126,7 @@ class SceneExport:
         sceneFile = scene.getNewSceneFile(path, exportInfo.isSingleFile, textureExportSettings)
 
         if not isCustomExport:
-            writeTextureArraysExistingScene(scene.model, exportPath, sceneInclude + sceneName + "_scene.h")
+            writeTextureArraysExistingScene(scene.model, exportPath, sceneInclude + sceneName + "_scene.h", session)
         else:
             textureArrayData = writeTextureArraysNew(scene.model, None)
             sceneFile.sceneTextures += textureArrayData.source
@@ -124,7 +137,7 @@ class SceneExport:
             room.roomShape.copy_bg_images(path)
 
         if not isCustomExport:
-            Files.add_scene_edits(exportInfo, scene, sceneFile)
+            Files.add_scene_edits(exportInfo, scene, sceneFile, session)
 
         hackerootBootOption = exportInfo.hackerootBootOption
         if hackerootBootOption is not None and hackerootBootOption.bootToScene:
@@ -6,6 +6,7 @@ from bpy.types import Mesh, Object
 from bpy.ops import object
 from typing import Optional
 from ....utility import PluginError, CData, indent
+from ....profiler import profile_stage
 from ...oot_utility import convertIntTo2sComplement
 from ..utility import Utility
 from .polygons import CollisionPoly, CollisionPolygons
@@ -214,6 +215,7 @@ class CollisionHeader:
     waterbox: WaterBoxes
 
     @staticmethod
+    @profile_stage("Collision Conversion", item=lambda name, *args: name)
     def new(
         name: str,
         sceneName: str,
@@ -2,11 +2,64 @@ import os
 import re
 import shutil
 
+from typing import Optional
+from ....utility import PluginError, readFile, writeFile
 from ...oot_utility import ExportInfo, RemoveInfo, getSceneDirFromLevelName
 from ..scene import Scene
 from ..file import SceneFile
-from .scene_table import SceneTableUtility
-from .spec import SpecUtility
+from .scene_table import SceneTable, SceneTableUtility, get_scene_enum_from_name
+from .spec import SpecFile, SpecUtility
+
+
+class DecompEditSession:
+    """
+    Holds the decomp files edited by one or more scene exports, each file is read and parsed once
+    and written once at the end, only if its content changed.
+    """
+
+    def __init__(self, exportPath: str):
+        self.exportPath = exportPath
+        # path -> (original text, parsed file or edited text)
+        self.files: dict[str, tuple[str, object]] = {}
+        self.written: list[str] = []
+
+    def getFile(self, subPath: str, parse):
+        path = os.path.join(self.exportPath, subPath)
+        if path not in self.files:
+            if not os.path.isfile(path):
+                raise PluginError(f"ERROR: Can't find {subPath}!")
+            text = readFile(path)
+            self.files[path] = (text, parse(text) if parse is not None else text)
+        return self.files[path][1]
+
+    def getSpec(self) -> SpecFile:
+        return self.getFile("spec", SpecFile.from_data)
+
+    def getSceneTable(self) -> SceneTable:
+        return self.getFile("include/tables/scene_table.h", SceneTable.from_data)
+
+    def getText(self, subPath: str) -> str:
+        return self.getFile(subPath, None)
+
+    def setText(self, subPath: str, text: str):
+        path = os.path.join(self.exportPath, subPath)
+        self.getText(subPath)
+        self.files[path] = (self.files[path][0], text)
+
+    def write(self):
+        """Writes the files that changed since they were read"""
+
+        for path, (original, data) in self.files.items():
+            text = data if isinstance(data, str) else data.to_c()
+            if text != original:
+                writeFile(path, text)
+                self.written.append(path)
+        self.files = {}
+
+    def print_report(self, name: str, sceneCount: int):
+        print(f"{name}: exported {sceneCount} scenes, wrote {len(self.written)} decomp files")
+        for path in self.written:
+            print(f"\t{os.path.relpath(path, self.exportPath)}")
 
 
 class Files:  # TODO: find a better name
@@ -39,21 +92,36 @@ class Files:  # TODO: find a better name
             shutil.rmtree(scenePath)
 
     @staticmethod
-    def add_scene_edits(exportInfo: "ExportInfo", scene: "Scene", sceneFile: "SceneFile"):
-        """Edits decomp files"""
+    def add_scene_edits(
+        exportInfo: "ExportInfo",
+        scene: "Scene",
+        sceneFile: "SceneFile",
+        session: Optional[DecompEditSession] = None,
+    ):
+        """Edits decomp files, if a session is given the files are written when it ends"""
+
+        ownSession = session is None
+        if ownSession:
+            session = DecompEditSession(exportInfo.exportPath)
 
         Files.remove_old_room_files(exportInfo, scene)
-        SpecUtility.add_segments(exportInfo, scene, sceneFile)
+        SpecUtility.add_segments(exportInfo, scene, sceneFile, session.getSpec())
         SceneTableUtility.edit_scene_table(
             exportInfo.exportPath,
             exportInfo.name,
             scene.mainHeader.infos.drawConfig,
+            session.getSceneTable(),
         )
 
+        if ownSession:
+            session.write()
+
     @staticmethod
     def remove_scene(remove_info: "RemoveInfo"):
         """Removes data from decomp files"""
 
+        session = DecompEditSession(remove_info.exportPath)
         Files.remove_scene_dir(remove_info)
-        SpecUtility.remove_segments(remove_info.exportPath, remove_info.name)
-        SceneTableUtility.delete_scene_table_entry(remove_info.exportPath, remove_info.name)
+        SpecUtility.remove_segments_from_spec(session.getSpec(), remove_info.name)
+        session.getSceneTable().remove(get_scene_enum_from_name(remove_info.name))
+        session.write()
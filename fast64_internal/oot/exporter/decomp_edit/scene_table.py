@@ -101,11 +101,13 @@ class SceneTable:
         try:
             with open(export_path) as file_data:
                 data = file_data.read()
-                file_data.seek(0)
-                lines = file_data.readlines()
         except FileNotFoundError:
             raise PluginError("ERROR: Can't find scene_table.h!")
 
+        return SceneTable.from_data(data)
+
+    @staticmethod
+    def from_data(data: str):
         # Find first instance of "DEFINE_SCENE(", indicating a scene define macro
         first_macro_index = data.index("DEFINE_SCENE(")
         if first_macro_index == -1:
@@ -264,16 +266,21 @@ class SceneTableUtility:
         raise PluginError(f"ERROR: Scene name {scene_name} not found in scene table.")
 
     @staticmethod
-    def edit_scene_table(export_path: str, export_name: str, draw_config: str):
-        """Update the scene table entry of the selected scene"""
+    def edit_scene_table(
+        export_path: str, export_name: str, draw_config: str, scene_table: Optional[SceneTable] = None
+    ):
+        """Update the scene table entry of the selected scene, the file is written unless ``scene_table`` is given"""
         path = os.path.join(export_path, "include/tables/scene_table.h")
-        scene_table = SceneTable.new(path)
+        write_table = scene_table is None
+        if write_table:
+            scene_table = SceneTable.new(path)
         export_enum = get_scene_enum_from_name(export_name)
 
         scene_table.update(SceneTableEntry.from_scene(export_name, draw_config), export_enum)
 
         # write the file with the final data
-        writeFile(path, scene_table.to_c())
+        if write_table:
+            writeFile(path, scene_table.to_c())
 
     @staticmethod
     def delete_scene_table_entry(export_path: str, export_name: str):
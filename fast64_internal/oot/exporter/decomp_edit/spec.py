@@ -1,5 +1,4 @@
 import os
-import bpy
 import re
 
 from dataclasses import dataclass, field
@@ -92,6 +91,10 @@ class SpecFile:
         except FileNotFoundError:
             raise PluginError("ERROR: Can't find spec!")
 
+        return SpecFile.from_data(data)
+
+    @staticmethod
+    def from_data(data: str):
         # Find first instance of "/assets/scenes/", indicating a scene file
         first_scene_include_index = data.index("/assets/scenes/")
         if first_scene_include_index == -1:
@@ -216,7 +219,11 @@ class SpecUtility:
             spec_file.remove(segment_name)
 
     @staticmethod
-    def add_segments(exportInfo: "ExportInfo", scene: "Scene", sceneFile: "SceneFile"):
+    def add_segments(
+        exportInfo: "ExportInfo", scene: "Scene", sceneFile: "SceneFile", specFile: Optional[SpecFile] = None
+    ):
+        """Adds the segments of the scene to the spec, the file is written unless ``specFile`` is given"""
+
         hasSceneTex = sceneFile.hasSceneTextures()
         hasSceneCS = sceneFile.hasCutscenes()
         roomTotal = len(scene.rooms.entries)
@@ -229,7 +236,9 @@ class SpecUtility:
 
         # get the spec's data
         exportPath = os.path.join(exportInfo.exportPath, "spec")
-        specFile = SpecFile.new(exportPath)
+        writeSpec = specFile is None
+        if writeSpec:
+            specFile = SpecFile.new(exportPath)
         build_directory = specFile.build_directory
 
         # get the scene and current segment name and remove the scene
@@ -238,7 +247,7 @@ class SpecUtility:
         SpecUtility.remove_segments_from_spec(specFile, exportInfo.name)
 
         assert build_directory is not None
-        isSingleFile = bpy.context.scene.ootSceneExportSettings.singleFile
+        isSingleFile = exportInfo.isSingleFile
         includeDir = f"{build_directory}/"
         if exportInfo.customSubPath is not None:
             includeDir += f"{exportInfo.customSubPath + sceneName}"
@@ -297,4 +306,5 @@ class SpecUtility:
             specFile.append(SpecEntry(roomCmds))
 
         # finally, write the spec file
-        writeFile(exportPath, specFile.to_c())
+        if writeSpec:
+            writeFile(exportPath, specFile.to_c())
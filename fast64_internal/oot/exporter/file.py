@@ -1,7 +1,81 @@
 import os
+import json
+import hashlib
 
-from dataclasses import dataclass
-from ...utility import writeFile
+from dataclasses import dataclass, field
+from typing import Optional
+from ...utility import readFile, writeFile
+from ...profiler import profile_stage
+
+
+@dataclass
+class ExportManifest:
+    """
+    This class keeps track of the content hashes of the files written by the scene exporter,
+    files are only written when their content changed so the decomp build doesn't recompile them
+    """
+
+    path: str
+    entries: dict[str, dict[str, int | str]] = field(default_factory=dict)
+    written: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+
+    fileName = ".fast64_manifest.json"
+
+    @staticmethod
+    def load(path: str):
+        """Returns the manifest stored in the export folder, or an empty one"""
+
+        manifestPath = os.path.join(path, ExportManifest.fileName)
+        entries = {}
+
+        if os.path.exists(manifestPath):
+            try:
+                entries = json.loads(readFile(manifestPath))
+            except json.JSONDecodeError:
+                print(f"WARNING: ignoring invalid export manifest {manifestPath}")
+
+        return ExportManifest(path, entries)
+
+    @staticmethod
+    def get_hash(data: str):
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+    def is_unchanged(self, fileName: str, filePath: str, newHash: str):
+        """Returns True if the file on disk already has the content matching ``newHash``"""
+
+        if not os.path.exists(filePath):
+            return False
+
+        stat = os.stat(filePath)
+        entry = self.entries.get(fileName)
+
+        # if the file wasn't touched since the last export we can trust the manifest and avoid reading it
+        if entry is not None and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["hash"] == newHash
+
+        return self.get_hash(readFile(filePath)) == newHash
+
+    def write_file(self, fileName: str, data: str):
+        """Writes the file if its content changed"""
+
+        filePath = os.path.join(self.path, fileName)
+        newHash = self.get_hash(data)
+
+        if self.is_unchanged(fileName, filePath, newHash):
+            self.unchanged.append(fileName)
+        else:
+            writeFile(filePath, data)
+            self.written.append(fileName)
+
+        stat = os.stat(filePath)
+        self.entries[fileName] = {"hash": newHash, "mtime": stat.st_mtime_ns, "size": stat.st_size}
+
+    def save(self):
+        """Writes the manifest to the export folder"""
+
+        writeFile(os.path.join(self.path, ExportManifest.fileName), json.dumps(self.entries, indent=4, sort_keys=True))
+        print(f"Scene export: {len(self.written)} file(s) written, {len(self.unchanged)} file(s) unchanged")
 
 
 @dataclass
@@ -16,18 +90,25 @@ class RoomFile:
     path: str
     header: str
 
-    def write(self):
+    def write(self, manifest: Optional[ExportManifest] = None):
         """Writes the room files"""
 
+        saveManifest = manifest is None
+        if manifest is None:
+            manifest = ExportManifest.load(self.path)
+
         if self.singleFileExport:
             roomMainPath = f"{self.name}.c"
             self.roomMain += self.roomModelInfo + self.roomModel
         else:
             roomMainPath = f"{self.name}_main.c"
-            writeFile(os.path.join(self.path, f"{self.name}_model_info.c"), self.roomModelInfo)
-            writeFile(os.path.join(self.path, f"{self.name}_model.c"), self.roomModel)
+            manifest.write_file(f"{self.name}_model_info.c", self.roomModelInfo)
+            manifest.write_file(f"{self.name}_model.c", self.roomModel)
+
+        manifest.write_file(roomMainPath, self.roomMain)
 
-        writeFile(os.path.join(self.path, roomMainPath), self.roomMain)
+        if saveManifest:
+            manifest.save()
 
 
 @dataclass
@@ -84,13 +165,15 @@ class SceneFile:
                 for i in range(len(self.sceneCutscenes)):
                     self.sceneCutscenes[i] = self.getSourceWithSceneInclude(csInclude, self.sceneCutscenes[i])
 
+    @profile_stage("OoT Scene Write")
     def write(self):
         """Writes the scene files"""
         self.setIncludeData()
+        manifest = ExportManifest.load(self.path)
 
         for room in self.roomList.values():
             self.header += room.header
-            room.write()
+            room.write(manifest)
 
         if self.singleFileExport:
             sceneMainPath = f"{self.name}.c"
@@ -104,14 +187,15 @@ class SceneFile:
                 self.sceneMain += self.sceneTextures
         else:
             sceneMainPath = f"{self.name}_main.c"
-            writeFile(os.path.join(self.path, f"{self.name}_col.c"), self.sceneCollision)
+            manifest.write_file(f"{self.name}_col.c", self.sceneCollision)
             if self.hasCutscenes():
                 for i, cs in enumerate(self.sceneCutscenes):
-                    writeFile(os.path.join(self.path, f"{self.name}_cs_{i}.c"), cs)
+                    manifest.write_file(f"{self.name}_cs_{i}.c", cs)
             if self.hasSceneTextures():
-                writeFile(os.path.join(self.path, f"{self.name}_tex.c"), self.sceneTextures)
+                manifest.write_file(f"{self.name}_tex.c", self.sceneTextures)
 
-        writeFile(os.path.join(self.path, sceneMainPath), self.sceneMain)
+        manifest.write_file(sceneMainPath, self.sceneMain)
 
         self.header += "\n#endif\n"
-        writeFile(os.path.join(self.path, f"{self.name}.h"), self.header)
+        manifest.write_file(f"{self.name}.h", self.header)
+        manifest.save()
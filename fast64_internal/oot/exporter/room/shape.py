@@ -1,4 +1,6 @@
 import bpy
+import bmesh
+import math
 import shutil
 import os
 
@@ -451,6 +453,9 @@ class RoomShapeCullableEntry(
 
 @dataclass
 class RoomShapeCullable(RoomShape):
+    cull_group_builder: Optional["CullGroupBuilder"] = field(init=False, default=None)
+    """Splits the meshes into cull groups automatically, if enabled"""
+
     def get_type(self):
         return "ROOM_SHAPE_TYPE_CULLABLE"
 
@@ -543,10 +548,13 @@ class RoomShapeUtility:
                 for bg_image in props.bgImageList:
                     room_shape.bg_entries.append(RoomShapeImageEntry.new(scene_name, bg_image))
 
+        if isinstance(room_shape, RoomShapeCullable) and props.autoCullGroups:
+            room_shape.cull_group_builder = CullGroupBuilder(props.autoCullMaxTris, props.autoCullMinTris)
+
         pos, _, scale, _ = Utility.getConvertedTransform(transform, sceneObj, roomObj, True)
         cull_group = CullGroup(pos, scale, roomObj.ootRoomHeader.defaultCullDistance)
         dl_entry = room_shape.add_dl_entry(cull_group)
-        boundingBox = BoundingBox()
+        boundingSphere = BoundingSphere()
         ootProcessMesh(
             room_shape,
             dl_entry,
@@ -555,10 +563,17 @@ class RoomShapeUtility:
             transform,
             not saveTexturesAsPNG,
             None,
-            boundingBox,
+            boundingSphere,
         )
         if isinstance(dl_entry, RoomShapeCullableEntry):
-            dl_entry.bounds_sphere_center, dl_entry.bounds_sphere_radius = boundingBox.getEnclosingSphere()
+            dl_entry.bounds_sphere_center, dl_entry.bounds_sphere_radius = boundingSphere.getEnclosingSphere()
+            if boundingSphere.minPoint is not None:
+                print(
+                    f"{dl_entry.name}: bounding sphere radius {round(boundingSphere.getBoxCenteredRadius())} "
+                    + f"(box centered) -> {dl_entry.bounds_sphere_radius}"
+                )
+            if room_shape.cull_group_builder is not None:
+                room_shape.cull_group_builder.print_report(room_shape.name)
 
         if bpy.context.scene.f3d_type == "F3DEX3":
             addOcclusionQuads(roomObj, room_shape.occlusion_planes, True, transform @ sceneObj.matrix_world.inverted())
@@ -568,43 +583,270 @@ class RoomShapeUtility:
         return room_shape
 
 
-class BoundingBox:
+class BoundingSphere:
+    """
+    Computes a tight bounding sphere of the room geometry with Ritter's algorithm and iterative refinement.
+    Vertices are streamed from the mesh objects on each pass, only the extremal points of a few directions are kept.
+    """
+
+    # the axes and diagonals, used to pick the initial diameter of the sphere
+    directions = [
+        Vector(direction).normalized()
+        for direction in (
+            (1, 0, 0),
+            (0, 1, 0),
+            (0, 0, 1),
+            (1, 1, 1),
+            (1, 1, -1),
+            (1, -1, 1),
+            (1, -1, -1),
+        )
+    ]
+    refineIterations = 4
+    refineShrinkFactor = 0.95
+
     def __init__(self):
-        self.minPoint = None
-        self.maxPoint = None
-        self.points = []
+        self.meshes: list[tuple[bpy.types.Object, Matrix]] = []
+        self.minPoint: Optional[Vector] = None
+        self.maxPoint: Optional[Vector] = None
+        self.extremes: list[Optional[tuple[float, Vector, float, Vector]]] = [None] * len(self.directions)
 
-    def addPoint(self, point: tuple[float, float, float]):
+    def addPoint(self, point: Vector):
         if self.minPoint is None:
-            self.minPoint = list(point[:])
+            self.minPoint = point.copy()
+            self.maxPoint = point.copy()
         else:
             for i in range(3):
                 if point[i] < self.minPoint[i]:
                     self.minPoint[i] = point[i]
-        if self.maxPoint is None:
-            self.maxPoint = list(point[:])
-        else:
-            for i in range(3):
-                if point[i] > self.maxPoint[i]:
+                elif point[i] > self.maxPoint[i]:
                     self.maxPoint[i] = point[i]
-        self.points.append(point)
+
+        for i, direction in enumerate(self.directions):
+            projection = point.dot(direction)
+            extreme = self.extremes[i]
+            if extreme is None:
+                self.extremes[i] = (projection, point, projection, point)
+            elif projection < extreme[0]:
+                self.extremes[i] = (projection, point, extreme[2], extreme[3])
+            elif projection > extreme[2]:
+                self.extremes[i] = (extreme[0], extreme[1], projection, point)
 
     def addMeshObj(self, obj: bpy.types.Object, transform: Matrix):
-        mesh = obj.data
-        for vertex in mesh.vertices:
+        self.meshes.append((obj, transform))
+        for vertex in obj.data.vertices:
             self.addPoint(transform @ vertex.co)
 
-    def getEnclosingSphere(self) -> tuple[float, float]:
-        centroid = (Vector(self.minPoint) + Vector(self.maxPoint)) / 2
-        radius = 0
-        for point in self.points:
-            distance = (Vector(point) - centroid).length
-            if distance > radius:
-                radius = distance
+    def iterPoints(self):
+        for obj, transform in self.meshes:
+            for vertex in obj.data.vertices:
+                yield transform @ vertex.co
+
+    def growSphere(self, center: Vector, radius: float):
+        """Ritter's growing pass, returns the sphere enlarged to include every point"""
+
+        center = center.copy()
+        radiusSquared = radius * radius
+        for point in self.iterPoints():
+            offset = point - center
+            distanceSquared = offset.length_squared
+            if distanceSquared > radiusSquared:
+                distance = distanceSquared**0.5
+                newRadius = (radius + distance) / 2
+                center += offset * ((newRadius - radius) / distance)
+                radius = newRadius
+                radiusSquared = radius * radius
+        return center, radius
+
+    def getBoxCenteredRadius(self) -> float:
+        """Returns the radius of the sphere centered on the bounding box (the previous method, used for reporting)"""
+
+        center = (self.minPoint + self.maxPoint) / 2
+        return max((point - center).length for point in self.iterPoints())
+
+    def getMinimalSphere(self) -> tuple[Vector, float]:
+        # start from the pair of extremal points that are the furthest apart
+        _, pointA, _, pointB = max(self.extremes, key=lambda extreme: extreme[2] - extreme[0])
+        center, radius = self.growSphere((pointA + pointB) / 2, (pointB - pointA).length / 2)
+
+        # refinement: shrink the sphere and grow it back, the center moves towards a tighter position
+        for _ in range(self.refineIterations):
+            newCenter, newRadius = self.growSphere(center, radius * self.refineShrinkFactor)
+            if newRadius < radius:
+                center, radius = newCenter, newRadius
+
+        return center, radius
+
+    def getEnclosingSphere(self) -> tuple[list[int], int]:
+        if self.minPoint is None:
+            return [0, 0, 0], 0
+
+        center, radius = self.getMinimalSphere()
+
+        # the rounded center moves the sphere, so the radius has to account for it to still enclose everything
+        roundedCenter = [round(value) for value in center]
+        roundedRadius = math.ceil(radius + (Vector(roundedCenter) - center).length)
+        return roundedCenter, roundedRadius
+
 
-        transformedCentroid = [round(value) for value in centroid]
-        transformedRadius = round(radius)
-        return transformedCentroid, transformedRadius
+@dataclass
+class CullFace:
+    index: int
+    triCount: int
+    center: Vector
+    minPoint: Vector
+    maxPoint: Vector
+
+
+class CullGroupBuilder:
+    """
+    Partitions room meshes into spatial cull groups, using a bounding volume hierarchy built with median splits.
+    A group is split when it has too many triangles, or when the triangles skipped by culling the two smaller halves
+    outweigh the cost of drawing an additional entry (its sphere test and the repeated material setup).
+    """
+
+    # cost of an additional entry, expressed in triangles
+    entryCost = 32
+
+    def __init__(self, maxTris: int, minTris: int):
+        self.maxTris = maxTris
+        self.minTris = min(minTris, maxTris)
+        self.groupCount = 0
+        self.triCount = 0
+
+    def getBounds(self, faces: list[CullFace]):
+        minPoint = faces[0].minPoint.copy()
+        maxPoint = faces[0].maxPoint.copy()
+        for face in faces[1:]:
+            for i in range(3):
+                minPoint[i] = min(minPoint[i], face.minPoint[i])
+                maxPoint[i] = max(maxPoint[i], face.maxPoint[i])
+        return minPoint, maxPoint
+
+    def getRadius(self, faces: list[CullFace]):
+        minPoint, maxPoint = self.getBounds(faces)
+        return (maxPoint - minPoint).length / 2
+
+    def splitFaces(self, faces: list[CullFace], groups: list[list[CullFace]]):
+        triCount = sum(face.triCount for face in faces)
+        if len(faces) < 2 or triCount <= self.minTris:
+            groups.append(faces)
+            return
+
+        # split along the longest axis of the face centers, at the median triangle
+        centers = [face.center for face in faces]
+        axis = max(range(3), key=lambda i: max(c[i] for c in centers) - min(c[i] for c in centers))
+        faces = sorted(faces, key=lambda face: face.center[axis])
+        count = 0
+        splitIndex = 1
+        for splitIndex, face in enumerate(faces, 1):
+            count += face.triCount
+            if count * 2 >= triCount:
+                break
+        splitIndex = min(splitIndex, len(faces) - 1)
+        halves = (faces[:splitIndex], faces[splitIndex:])
+
+        if triCount <= self.maxTris:
+            # the chance of a group being visible is estimated from the area of its bounding sphere
+            radius = self.getRadius(faces)
+            splitCost = 2 * self.entryCost
+            if radius > 0:
+                for half in halves:
+                    splitCost += sum(face.triCount for face in half) * (self.getRadius(half) / radius) ** 2
+            if radius == 0 or splitCost >= self.entryCost + triCount:
+                groups.append(faces)
+                return
+
+        for half in halves:
+            self.splitFaces(half, groups)
+
+    def partition(self, obj: Object, transform: Matrix) -> list[list[int]]:
+        """Returns the polygon indices of each cull group"""
+
+        vertices = [transform @ vertex.co for vertex in obj.data.vertices]
+        faces: list[CullFace] = []
+        for polygon in obj.data.polygons:
+            points = [vertices[i] for i in polygon.vertices]
+            faces.append(
+                CullFace(
+                    polygon.index,
+                    len(points) - 2,
+                    sum(points, Vector()) / len(points),
+                    Vector([min(point[i] for point in points) for i in range(3)]),
+                    Vector([max(point[i] for point in points) for i in range(3)]),
+                )
+            )
+
+        if len(faces) == 0:
+            return []
+        groups: list[list[CullFace]] = []
+        self.splitFaces(faces, groups)
+        return [[face.index for face in group] for group in groups]
+
+    def createGroupObj(self, obj: Object, polygonIndices: list[int], groupIndex: int) -> Object:
+        """Returns an unlinked copy of the object only containing the given polygons"""
+
+        mesh = obj.data.copy()
+        keep = set(polygonIndices)
+        bMesh = bmesh.new()
+        bMesh.from_mesh(mesh)
+        bmesh.ops.delete(bMesh, geom=[face for face in bMesh.faces if face.index not in keep], context="FACES")
+        bMesh.to_mesh(mesh)
+        bMesh.free()
+
+        groupObj = obj.copy()
+        groupObj.data = mesh
+        groupObj.original_name = f"{obj.original_name}_cull{groupIndex}"
+        return groupObj
+
+    def saveMesh(self, roomShape: RoomShape, obj: Object, transform: Matrix, convertTextureData: bool) -> bool:
+        """Converts the mesh as multiple cull groups, returns False if it wasn't worth splitting"""
+
+        groups = self.partition(obj, transform)
+        if len(groups) < 2:
+            return False
+
+        for groupIndex, polygonIndices in enumerate(groups):
+            groupObj = self.createGroupObj(obj, polygonIndices, groupIndex)
+            try:
+                boundingSphere = BoundingSphere()
+                boundingSphere.addMeshObj(groupObj, transform)
+                center, radius = boundingSphere.getEnclosingSphere()
+                dlEntry = roomShape.add_dl_entry(CullGroup(center, [radius], 1))
+
+                info = getInfoDict(groupObj)
+                triConverterInfo = TriangleConverterInfo(groupObj, None, roomShape.model.f3d, transform, info)
+                fMeshes = saveStaticModel(
+                    triConverterInfo,
+                    roomShape.model,
+                    groupObj,
+                    transform,
+                    roomShape.model.name,
+                    convertTextureData,
+                    False,
+                    "oot",
+                )
+                if fMeshes is not None:
+                    for drawLayer, fMesh in fMeshes.items():
+                        dlEntry.add_dl_call(fMesh.draw, drawLayer)
+
+                self.groupCount += 1
+                self.triCount += len(groupObj.data.loop_triangles)
+            finally:
+                mesh = groupObj.data
+                bpy.data.objects.remove(groupObj)
+                bpy.data.meshes.remove(mesh)
+
+        return True
+
+    def print_report(self, name: str):
+        if self.groupCount > 0:
+            print(
+                f"{name}: {self.groupCount} automatic cull groups, "
+                + f"{self.triCount / self.groupCount:.1f} triangles per group on average"
+            )
+        else:
+            print(f"{name}: no mesh was split into automatic cull groups")
 
 
 # This function should be called on a copy of an object
@@ -618,7 +860,7 @@ def ootProcessMesh(
     transformMatrix,
     convertTextureData,
     LODHierarchyObject,
-    boundingBox: BoundingBox,
+    boundingSphere: BoundingSphere,
 ):
     relativeTransform = transformMatrix @ sceneObj.matrix_world.inverted() @ obj.matrix_world
     translation, rotation, scale = relativeTransform.decompose()
@@ -643,22 +885,34 @@ def ootProcessMesh(
         )
 
     elif obj.type == "MESH" and not obj.ignore_render:
-        triConverterInfo = TriangleConverterInfo(obj, None, roomShape.model.f3d, relativeTransform, getInfoDict(obj))
-        fMeshes = saveStaticModel(
-            triConverterInfo,
-            roomShape.model,
-            obj,
-            relativeTransform,
-            roomShape.model.name,
-            convertTextureData,
-            False,
-            "oot",
+        cullGroupBuilder = roomShape.cull_group_builder if isinstance(roomShape, RoomShapeCullable) else None
+
+        # meshes under a cull group empty or a LOD group are left as they are
+        isSplit = (
+            cullGroupBuilder is not None
+            and LODHierarchyObject is None
+            and dlEntry is roomShape.dl_entries[0]
+            and cullGroupBuilder.saveMesh(roomShape, obj, relativeTransform, convertTextureData)
         )
-        if fMeshes is not None:
-            for drawLayer, fMesh in fMeshes.items():
-                dlEntry.add_dl_call(fMesh.draw, drawLayer)
+        if not isSplit:
+            triConverterInfo = TriangleConverterInfo(
+                obj, None, roomShape.model.f3d, relativeTransform, getInfoDict(obj)
+            )
+            fMeshes = saveStaticModel(
+                triConverterInfo,
+                roomShape.model,
+                obj,
+                relativeTransform,
+                roomShape.model.name,
+                convertTextureData,
+                False,
+                "oot",
+            )
+            if fMeshes is not None:
+                for drawLayer, fMesh in fMeshes.items():
+                    dlEntry.add_dl_call(fMesh.draw, drawLayer)
 
-        boundingBox.addMeshObj(obj, relativeTransform)
+            boundingSphere.addMeshObj(obj, relativeTransform)
 
     alphabeticalChildren = sorted(obj.children, key=lambda childObj: childObj.original_name.lower())
     for childObj in alphabeticalChildren:
@@ -671,7 +925,7 @@ def ootProcessMesh(
                 transformMatrix,
                 convertTextureData,
                 LODHierarchyObject,
-                boundingBox,
+                boundingSphere,
             )
         else:
             ootProcessMesh(
@@ -682,7 +936,7 @@ def ootProcessMesh(
                 transformMatrix,
                 convertTextureData,
                 LODHierarchyObject,
-                boundingBox,
+                boundingSphere,
             )
 
 
@@ -694,7 +948,7 @@ def ootProcessLOD(
     transformMatrix,
     convertTextureData,
     LODHierarchyObject,
-    boundingBox: BoundingBox,
+    boundingSphere: BoundingSphere,
 ):
     relativeTransform = transformMatrix @ sceneObj.matrix_world.inverted() @ obj.matrix_world
     translation, rotation, scale = relativeTransform.decompose()
@@ -722,7 +976,7 @@ def ootProcessLOD(
                 transformMatrix,
                 convertTextureData,
                 LODHierarchyObject,
-                boundingBox,
+                boundingSphere,
             )
         else:
             ootProcessMesh(
@@ -733,7 +987,7 @@ def ootProcessLOD(
                 transformMatrix,
                 convertTextureData,
                 LODHierarchyObject,
-                boundingBox,
+                boundingSphere,
             )
 
         # We handle case with no geometry, for the cases where we have "gaps" in the LOD hierarchy.
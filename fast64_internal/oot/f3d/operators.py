@@ -5,11 +5,13 @@ from bpy.path import abspath
 from bpy.utils import register_class, unregister_class
 from mathutils import Matrix
 from ...utility import CData, PluginError, raisePluginError, writeCData, toAlnum
-from ...f3d.f3d_parser import importMeshC, getImportData
+from ...profiler import profile_export
+from ...f3d.f3d_parser import importMeshC
 from ...f3d.f3d_gbi import DLFormat, F3D, TextureExportSettings, ScrollMethod, get_F3D_GBI
 from ...f3d.f3d_writer import TriangleConverterInfo, removeDL, saveStaticModel, getInfoDict
 from ..oot_utility import ootGetObjectPath, getOOTScale
 from ..oot_model_classes import OOTF3DContext, ootGetIncludedAssetData
+from ..oot_source_cache import ootSourceCache, use_oot_source_cache
 from ..oot_texture_array import ootReadTextureArrays
 from ..oot_model_classes import OOTModel, OOTGfxFormatter
 from ..oot_f3d_writer import ootReadActorScale, writeTextureArraysNew, writeTextureArraysExisting
@@ -100,6 +102,7 @@ class OOT_ImportDL(Operator):
 
     # Called on demand (i.e. button press, menu item)
     # Can also be called from operator search menu (Spacebar)
+    @use_oot_source_cache("Import DL")
     def execute(self, context):
         obj = None
         if context.mode != "OBJECT":
@@ -120,7 +123,7 @@ class OOT_ImportDL(Operator):
             flipbookArrayIndex2D = settings.flipbookArrayIndex2D if flipbookUses2DArray else None
 
             paths = [ootGetObjectPath(isCustomImport, importPath, folderName)]
-            data = getImportData(paths)
+            data = ootSourceCache.readFiles(paths)
             f3dContext = OOTF3DContext(get_F3D_GBI(), [name], basePath)
 
             scale = getOOTScale(settings.actorScale)
@@ -161,6 +164,7 @@ class OOT_ExportDL(Operator):
 
     # Called on demand (i.e. button press, menu item)
     # Can also be called from operator search menu (Spacebar)
+    @profile_export("Export DL")
     def execute(self, context):
         obj = None
         if context.mode != "OBJECT":
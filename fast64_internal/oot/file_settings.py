@@ -24,6 +24,7 @@ class OOT_FileSettingsPanel(OOT_Panel):
         if not context.scene.fast64.oot.hackerFeaturesEnabled:
             col.prop(context.scene.fast64.oot, "useDecompFeatures")
         col.prop(context.scene.fast64.oot, "exportMotionOnly")
+        col.prop(context.scene.fast64.oot, "persistentSourceCache")
 
 
 oot_classes = (OOT_FileSettingsPanel,)
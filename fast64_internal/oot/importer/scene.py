@@ -3,11 +3,12 @@ import re
 import bpy
 import mathutils
 
-from ...utility import readFile, hexOrDecInt
+from ...utility import hexOrDecInt
 from ...f3d.f3d_parser import parseMatrices
 from ...f3d.f3d_gbi import get_F3D_GBI
 from ...f3d.flipbook import TextureFlipbook
 from ..oot_model_classes import OOTF3DContext
+from ..oot_source_cache import ootSourceCache
 from ..exporter.decomp_edit.scene_table import SceneTableUtility
 from ..scene.properties import OOTImportSceneSettingsProperty
 from ..oot_constants import ootEnumDrawConfig
@@ -98,7 +99,7 @@ def parseScene(
 
     sceneFolderPath = ootGetPath(importPath, settings.isCustomDest, importSubdir, sceneName, False, True)
     filePath = os.path.join(sceneFolderPath, f"{sceneName}_scene.c")
-    sceneData = readFile(filePath)
+    sceneData = ootSourceCache.read(filePath)
 
     # roomData = ""
     # sceneFolderFiles = [f for f in listdir(sceneFolderPath) if isfile(join(sceneFolderPath, f))]
@@ -122,7 +123,7 @@ def parseScene(
 
     if not settings.isCustomDest:
         drawConfigName = SceneTableUtility.get_draw_config(sceneName)
-        drawConfigData = readFile(os.path.join(importPath, "src/code/z_scene_table.c"))
+        drawConfigData = ootSourceCache.read(os.path.join(importPath, "src/code/z_scene_table.c"))
         parseDrawConfig(drawConfigName, sceneData, drawConfigData, f3dContext)
 
     bpy.context.space_data.overlay.show_relationship_lines = False
@@ -4,9 +4,10 @@ import re
 import bpy
 import mathutils
 
-from ...utility import PluginError, readFile, parentObject, hexOrDecInt, gammaInverse
+from ...utility import PluginError, parentObject, hexOrDecInt, gammaInverse
 from ...f3d.f3d_parser import parseMatrices
 from ..oot_model_classes import OOTF3DContext
+from ..oot_source_cache import ootSourceCache
 from ..scene.properties import OOTSceneHeaderProperty, OOTLightProperty
 from ..oot_utility import getEvalParams, setCustomProperty
 from .constants import headerNames
@@ -190,7 +191,7 @@ def parseRoomList(
             roomName = roomName[1:]
 
         roomPath = os.path.join(sharedSceneData.scenePath, f"{roomName}.c")
-        roomData = readFile(roomPath)
+        roomData = ootSourceCache.read(roomPath)
         parseMatrices(roomData, f3dContext, 1 / bpy.context.scene.ootBlenderScale)
 
         roomCommandsName = f"{roomName}Commands"
@@ -1,9 +1,10 @@
 import bpy, os, re, mathutils
 from typing import Union
-from ..f3d.f3d_parser import F3DContext, F3DTextureReference, getImportData
+from ..f3d.f3d_parser import F3DContext, F3DTextureReference
 from ..f3d.f3d_material import TextureProperty, createF3DMat, texFormatOf, texBitSizeF3D
 from ..utility import PluginError, hexOrDecInt, create_or_get_world
 from ..f3d.flipbook import TextureFlipbook, FlipbookProperty, usesFlipbook, ootFlipbookReferenceIsValid
+from .oot_source_cache import ootSourceCache, getSourceIncludes
 
 from ..f3d.f3d_writer import VertexGroupInfo, TriangleConverterInfo
 from ..f3d.f3d_texture_writer import (
@@ -34,34 +35,33 @@ from ..f3d.f3d_gbi import (
 # read included asset data
 def ootGetIncludedAssetData(basePath: str, currentPaths: list[str], data: str) -> str:
     includeData = ""
-    searchedPaths = currentPaths[:]
+    searchedPaths = set(currentPaths)
+    assetIncludes, sameDirIncludes = getSourceIncludes(data)
 
     print("Included paths:")
 
     # search assets
-    for includeMatch in re.finditer(r"\#include\s*\"(assets/objects/(.*?))\.h\"", data):
-        path = os.path.join(basePath, includeMatch.group(1) + ".c")
+    for include in assetIncludes:
+        path = os.path.join(basePath, include + ".c")
         if path in searchedPaths:
             continue
-        searchedPaths.append(path)
-        subIncludeData = getImportData([path]) + "\n"
-        includeData += subIncludeData
+        searchedPaths.add(path)
+        sourceFile = ootSourceCache.get(path)
+        includeData += (sourceFile.text if sourceFile is not None else "") + "\n"
         print(path)
 
-        for subIncludeMatch in re.finditer(r"\#include\s*\"(((?![/\"]).)*)\.c\"", subIncludeData):
-            subPath = os.path.join(os.path.dirname(path), subIncludeMatch.group(1) + ".c")
+        for subInclude in sourceFile.sameDirIncludes if sourceFile is not None else []:
+            subPath = os.path.join(os.path.dirname(path), subInclude + ".c")
             if subPath in searchedPaths:
                 continue
-            searchedPaths.append(subPath)
+            searchedPaths.add(subPath)
             print(subPath)
-            includeData += getImportData([subPath]) + "\n"
+            includeData += ootSourceCache.readFiles([subPath]) + "\n"
 
     # search same directory c includes, both in current path and in included object files
     # these are usually fast64 exported files
-    for includeMatch in re.finditer(r"\#include\s*\"(((?![/\"]).)*)\.c\"", data):
-        sameDirPaths = [
-            os.path.join(os.path.dirname(currentPath), includeMatch.group(1) + ".c") for currentPath in currentPaths
-        ]
+    for include in sameDirIncludes:
+        sameDirPaths = [os.path.join(os.path.dirname(currentPath), include + ".c") for currentPath in currentPaths]
         sameDirPathsToSearch = []
         for sameDirPath in sameDirPaths:
             if sameDirPath not in searchedPaths:
@@ -70,7 +70,7 @@ def ootGetIncludedAssetData(basePath: str, currentPaths: list[str], data: str) -
         for sameDirPath in sameDirPathsToSearch:
             print(sameDirPath)
 
-        includeData += getImportData(sameDirPathsToSearch) + "\n"
+        includeData += ootSourceCache.readFiles(sameDirPathsToSearch) + "\n"
     return includeData
 
 
@@ -83,13 +83,13 @@ def ootGetActorDataPaths(basePath: str, overlayName: str) -> list[str]:
 
 # read actor data
 def ootGetActorData(basePath: str, overlayName: str) -> str:
-    actorData = getImportData(ootGetActorDataPaths(basePath, overlayName))
+    actorData = ootSourceCache.readFiles(ootGetActorDataPaths(basePath, overlayName))
     return actorData
 
 
 def ootGetLinkData(basePath: str) -> str:
     linkFilePath = os.path.join(basePath, f"src/code/z_player_lib.c")
-    actorData = getImportData([linkFilePath])
+    actorData = ootSourceCache.readFiles([linkFilePath])
 
     return actorData
 
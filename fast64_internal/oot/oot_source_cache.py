@@ -0,0 +1,101 @@
+import bpy, os, re, functools
+from dataclasses import dataclass
+from ..utility import readFile
+
+# includes of object headers, ex. #include "assets/objects/object_link_boy/object_link_boy.h"
+assetIncludeRegex = re.compile(r"\#include\s*\"(assets/objects/(.*?))\.h\"")
+# includes of .c files in the same directory, usually fast64 exported files
+sameDirIncludeRegex = re.compile(r"\#include\s*\"(((?![/\"]).)*)\.c\"")
+
+
+@dataclass
+class OOTSourceFile:
+    text: str
+    # first group of the asset include matches (path without extension)
+    assetIncludes: list[str]
+    # first group of the same directory include matches (name without extension)
+    sameDirIncludes: list[str]
+
+
+def getSourceIncludes(text: str):
+    return (
+        [match.group(1) for match in assetIncludeRegex.finditer(text)],
+        [match.group(1) for match in sameDirIncludeRegex.finditer(text)],
+    )
+
+
+class OOTSourceCache:
+    """
+    Caches the text and include lists of the decomp files read by the OoT importers.
+    Entries are keyed on the file path and validated with the modification time and size of the file,
+    so the cache can also be kept between imports.
+    """
+
+    def __init__(self):
+        self.files: dict[str, tuple[tuple[int, int], OOTSourceFile]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.depth = 0
+
+    def clear(self):
+        self.files = {}
+
+    def get(self, path: str):
+        """Returns the OOTSourceFile of a path, or None if it doesn't exist"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        fileKey = (stat.st_mtime_ns, stat.st_size)
+        entry = self.files.get(path)
+        if entry is not None and entry[0] == fileKey:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        text = readFile(path)
+        sourceFile = OOTSourceFile(text, *getSourceIncludes(text))
+        self.files[path] = (fileKey, sourceFile)
+        return sourceFile
+
+    def read(self, path: str) -> str:
+        """Same as readFile, raises if the file doesn't exist"""
+        sourceFile = self.get(path)
+        return sourceFile.text if sourceFile is not None else readFile(path)
+
+    def readFiles(self, paths: list[str]) -> str:
+        """Same as getImportData, missing files are skipped"""
+        return "".join(sourceFile.text for sourceFile in map(self.get, paths) if sourceFile is not None)
+
+    def print_report(self, name: str):
+        print(f"{name}: decomp source cache {self.hits} hits, {self.misses} misses ({len(self.files)} files cached)")
+
+
+ootSourceCache = OOTSourceCache()
+
+
+def use_oot_source_cache(name: str):
+    """
+    Decorator for the ``execute`` method of OoT import operators,
+    reports the source cache hits/misses of the import and clears it afterwards unless it's persistent.
+    """
+
+    def decorator(execute):
+        @functools.wraps(execute)
+        def wrapper(self, context: bpy.types.Context):
+            if ootSourceCache.depth == 0:
+                ootSourceCache.hits = ootSourceCache.misses = 0
+            ootSourceCache.depth += 1
+            try:
+                return execute(self, context)
+            finally:
+                ootSourceCache.depth -= 1
+                if ootSourceCache.depth == 0:
+                    ootSourceCache.print_report(name)
+                    if not context.scene.fast64.oot.persistentSourceCache:
+                        ootSourceCache.clear()
+
+        return wrapper
+
+    return decorator
@@ -122,6 +122,23 @@ class OOTRoomHeaderProperty(PropertyGroup):
 
     roomShape: EnumProperty(items=ootEnumRoomShapeType, default="ROOM_SHAPE_TYPE_NORMAL")
     defaultCullDistance: IntProperty(name="Default Cull Distance", min=1, default=100)
+    autoCullGroups: BoolProperty(
+        name="Auto Split Cull Groups",
+        description="Split the room meshes that aren't under a cull group empty into spatial cull groups on export",
+        default=False,
+    )
+    autoCullMaxTris: IntProperty(
+        name="Max Triangles Per Group",
+        description="Groups with more triangles are always split",
+        min=1,
+        default=512,
+    )
+    autoCullMinTris: IntProperty(
+        name="Min Triangles Per Group",
+        description="Groups with fewer triangles are never split",
+        min=1,
+        default=64,
+    )
     bgImageList: CollectionProperty(type=OOTBGProperty)
     bgImageTab: BoolProperty(name="BG Images")
 
@@ -174,6 +191,10 @@ class OOTRoomHeaderProperty(PropertyGroup):
                 if self.roomShape == "ROOM_SHAPE_TYPE_CULLABLE":
                     general.label(text="Cull regions are generated automatically.", icon="INFO")
                     prop_split(general, self, "defaultCullDistance", "Default Cull (Blender Units)")
+                    general.prop(self, "autoCullGroups")
+                    if self.autoCullGroups:
+                        prop_split(general, self, "autoCullMaxTris", "Max Triangles Per Group")
+                        prop_split(general, self, "autoCullMinTris", "Min Triangles Per Group")
             # Behaviour
             behaviourBox = layout.column()
             behaviourBox.box().label(text="Behaviour")
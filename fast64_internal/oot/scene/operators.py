@@ -8,11 +8,14 @@ from bpy.utils import register_class, unregister_class
 from bpy.ops import object
 from mathutils import Matrix, Vector
 from ...f3d.f3d_gbi import TextureExportSettings, DLFormat
-from ...utility import PluginError, raisePluginError, ootGetSceneOrRoomHeader
+from ...utility import PluginError, raisePluginError, ootGetSceneOrRoomHeader, toAlnum
+from ...profiler import profile_export
+from ..oot_source_cache import use_oot_source_cache
 from ..oot_utility import ExportInfo, RemoveInfo, sceneNameFromID
-from ..oot_constants import ootEnumMusicSeq, ootEnumSceneID
+from ..oot_constants import ootEnumMusicSeq, ootEnumSceneID, ootSceneIDToName, ootSceneNameToID
 from ..importer import parseScene
 from ..exporter.decomp_edit.config import Config
+from ..exporter.decomp_edit import DecompEditSession
 from ..exporter import SceneExport, Files
 
 
@@ -105,6 +108,7 @@ class OOT_ImportScene(Operator):
     bl_label = "Import Scene"
     bl_options = {"REGISTER", "UNDO", "PRESET"}
 
+    @use_oot_source_cache("Import Scene")
     def execute(self, context):
         try:
             if context.mode != "OBJECT":
@@ -130,6 +134,7 @@ class OOT_ExportScene(Operator):
     bl_label = "Export Scene"
     bl_options = {"REGISTER", "UNDO", "PRESET"}
 
+    @profile_export("Export Scene")
     def execute(self, context):
         activeObj = None
         try:
@@ -213,6 +218,105 @@ class OOT_ExportScene(Operator):
             return {"CANCELLED"}
 
 
+def getBatchSceneNameAndOption(obj: bpy.types.Object):
+    """
+    Returns the name and scene enum value to export a scene object to,
+    objects named after a vanilla scene (ex. "spot03", "spot03_scene" or "SCENE_HYRULE_FIELD") replace it.
+    """
+
+    name = obj.name.removesuffix("_scene")
+    if name in ootSceneIDToName:
+        return ootSceneIDToName[name], name
+    if name in ootSceneNameToID:
+        return name, ootSceneNameToID[name]
+    return toAlnum(name), "Custom"
+
+
+class OOT_BatchExportScenes(Operator):
+    """Export the selected OOT scene objects (or all of them if none are selected), the decomp files are edited once"""
+
+    bl_idname = "object.oot_batch_export_levels"
+    bl_label = "Batch Export Scenes"
+    bl_options = {"REGISTER", "UNDO", "PRESET"}
+
+    @profile_export("Batch Export Scenes")
+    def execute(self, context):
+        activeObj = context.view_layer.objects.active
+        try:
+            if context.mode != "OBJECT":
+                object.mode_set(mode="OBJECT")
+
+            sceneObjs = [
+                obj
+                for obj in (context.selected_objects if len(context.selected_objects) > 0 else context.scene.objects)
+                if obj.type == "EMPTY" and obj.ootEmptyType == "Scene"
+            ]
+            if len(sceneObjs) == 0:
+                raise PluginError("No scene empties to export.")
+
+            settings = context.scene.ootSceneExportSettings
+            scaleValue = context.scene.ootBlenderScale
+            finalTransform = Matrix.Diagonal(Vector((scaleValue, scaleValue, scaleValue))).to_4x4()
+            hackerFeaturesEnabled = context.scene.fast64.oot.hackerFeaturesEnabled
+
+            exports: dict[str, tuple[bpy.types.Object, ExportInfo]] = {}
+            for obj in sceneObjs:
+                levelName, option = getBatchSceneNameAndOption(obj)
+                if levelName in exports:
+                    raise PluginError(
+                        f'"{obj.name}" and "{exports[levelName][0].name}" would both be exported as {levelName}.'
+                    )
+
+                if settings.customExport:
+                    isCustomExport = True
+                    exportPath = bpy.path.abspath(settings.exportPath)
+                    customSubPath = None
+                else:
+                    isCustomExport = False
+                    exportPath = bpy.path.abspath(context.scene.ootDecompPath)
+                    customSubPath = "assets/scenes/" + settings.subFolder + "/" if option == "Custom" else None
+
+                # booting to a scene doesn't make sense for several scenes
+                exports[levelName] = obj, ExportInfo(
+                    isCustomExport,
+                    exportPath,
+                    customSubPath,
+                    levelName,
+                    option,
+                    context.scene.saveTextures,
+                    settings.singleFile,
+                    context.scene.fast64.oot.useDecompFeatures if not hackerFeaturesEnabled else hackerFeaturesEnabled,
+                    None,
+                )
+
+            # the spec, scene table and draw config files are parsed once and written at the end,
+            # also if an export fails so that they match the scenes already written
+            session = DecompEditSession(bpy.path.abspath(context.scene.ootDecompPath))
+            try:
+                for obj, exportInfo in exports.values():
+                    SceneExport.export(obj, finalTransform, exportInfo, session)
+            finally:
+                session.write()
+            session.print_report("Batch Export Scenes", len(exports))
+
+            self.report({"INFO"}, f"Exported {len(exports)} scenes.")
+            return {"FINISHED"}
+
+        except Exception as e:
+            if context.mode != "OBJECT":
+                object.mode_set(mode="OBJECT")
+            raisePluginError(self, e)
+            return {"CANCELLED"}
+
+        finally:
+            # don't select the scenes
+            for elem in context.selectable_objects:
+                elem.select_set(False)
+            context.view_layer.objects.active = activeObj
+            if activeObj is not None:
+                activeObj.select_set(True)
+
+
 class OOT_RemoveScene(Operator):
     """Remove an OOT scene from an existing decomp directory."""
 
@@ -255,6 +359,7 @@ classes = (
     OOT_ClearBootupScene,
     OOT_ImportScene,
     OOT_ExportScene,
+    OOT_BatchExportScenes,
     OOT_RemoveScene,
 )
 
@@ -16,6 +16,7 @@ from .properties import (
 from .operators import (
     OOT_ImportScene,
     OOT_ExportScene,
+    OOT_BatchExportScenes,
     OOT_RemoveScene,
     OOT_ClearBootupScene,
     OOT_SearchSceneEnumOperator,
@@ -56,6 +57,7 @@ class OOT_ExportScenePanel(OOT_Panel):
             hackerOoTBox.operator(OOT_ClearBootupScene.bl_idname, text="Undo Boot To Scene (HackerOOT Repo)")
 
         exportBox.operator(OOT_ExportScene.bl_idname)
+        exportBox.operator(OOT_BatchExportScenes.bl_idname)
 
         # Scene Importer
         importBox = col.box().column()
@@ -2,10 +2,11 @@ import re
 from typing import List
 import mathutils, bpy, math
 from ....f3d.f3d_gbi import F3D, get_F3D_GBI
-from ....f3d.f3d_parser import getImportData, parseF3D
-from ....utility import hexOrDecInt, applyRotation, PluginError
+from ....f3d.f3d_parser import parseF3D
+from ....utility import hexOrDecInt, applyRotation, selectSingleObject, parentObjectsToArmature, PluginError
 from ...oot_f3d_writer import ootReadActorScale
 from ...oot_model_classes import OOTF3DContext, ootGetIncludedAssetData
+from ...oot_source_cache import ootSourceCache
 from ...oot_utility import ootGetObjectPath, getOOTScale, ootGetObjectHeaderPath, ootGetEnums, ootStripComments
 from ...oot_texture_array import ootReadTextureArrays
 from ..constants import ootSkeletonImportDict
@@ -20,11 +21,7 @@ class OOTDLEntry:
 
 
 def ootAddBone(armatureObj, boneName, parentBoneName, currentTransform, loadDL):
-    if bpy.context.mode != "OBJECT":
-        bpy.ops.object.mode_set(mode="OBJECT")
-    bpy.ops.object.select_all(action="DESELECT")
-    bpy.context.view_layer.objects.active = armatureObj
-    bpy.ops.object.mode_set(mode="EDIT")
+    """Expects the armature to be in edit mode, see ootBuildSkeleton"""
     bone = armatureObj.data.edit_bones.new(boneName)
     bone.use_connect = False
     bone.use_deform = loadDL
@@ -47,9 +44,6 @@ def ootAddBone(armatureObj, boneName, parentBoneName, currentTransform, loadDL):
         elif bone.head == bone.parent.head and bone.tail == bone.parent.tail:
             bone.tail += currentTransform.to_quaternion() @ mathutils.Vector((0, 0.2, 0))
 
-    if bpy.context.mode != "OBJECT":
-        bpy.ops.object.mode_set(mode="OBJECT")
-
 
 def ootAddLimbRecursively(
     limbIndex: int,
@@ -179,8 +173,6 @@ def ootBuildSkeleton(
     # armature.show_names = True
 
     bpy.context.scene.collection.objects.link(armatureObj)
-    bpy.context.view_layer.objects.active = armatureObj
-    # bpy.ops.object.mode_set(mode = 'EDIT')
 
     f3dContext.mat().draw_layer.oot = armatureObj.ootDrawLayer
 
@@ -190,10 +182,19 @@ def ootBuildSkeleton(
     if overlayName is not None:
         ootReadTextureArrays(basePath, overlayName, skeletonName, f3dContext, isLink, flipbookArrayIndex2D)
 
+    # All bones are created in a single edit mode session
+    if bpy.context.mode != "OBJECT":
+        bpy.ops.object.mode_set(mode="OBJECT")
+    selectSingleObject(armatureObj)
+    bpy.ops.object.mode_set(mode="EDIT")
     transformMatrix = mathutils.Matrix.Scale(1 / actorScale, 4)
-    isLOD = ootAddLimbRecursively(
-        0, skeletonData, obj, armatureObj, transformMatrix, None, f3dContext, useFarLOD, enums
-    )
+    try:
+        isLOD = ootAddLimbRecursively(
+            0, skeletonData, obj, armatureObj, transformMatrix, None, f3dContext, useFarLOD, enums
+        )
+    finally:
+        bpy.ops.object.mode_set(mode="OBJECT")
+
     for dlEntry in f3dContext.dlList:
         limbName = f3dContext.getLimbName(dlEntry.limbIndex)
         boneName = f3dContext.getBoneName(dlEntry.limbIndex)
@@ -213,22 +214,12 @@ def ootBuildSkeleton(
     f3dContext.createMesh(obj, removeDoubles, importNormals, False)
     armatureObj.location = bpy.context.scene.cursor.location
 
-    # Set bone rotation mode.
-    bpy.ops.object.select_all(action="DESELECT")
-    armatureObj.select_set(True)
-    bpy.context.view_layer.objects.active = armatureObj
-    bpy.ops.object.mode_set(mode="POSE")
+    # Set bone rotation mode, pose bones are available in object mode as well.
     for bone in armatureObj.pose.bones:
         bone.rotation_mode = "XYZ"
 
     # Apply mesh to armature.
-    if bpy.context.mode != "OBJECT":
-        bpy.ops.object.mode_set(mode="OBJECT")
-    bpy.ops.object.select_all(action="DESELECT")
-    obj.select_set(True)
-    armatureObj.select_set(True)
-    bpy.context.view_layer.objects.active = armatureObj
-    bpy.ops.object.parent_set(type="ARMATURE")
+    parentObjectsToArmature(armatureObj, [obj])
 
     applyRotation([armatureObj], math.radians(-90), "X")
     armatureObj.ootActorScale = actorScale / bpy.context.scene.ootBlenderScale
@@ -267,7 +258,7 @@ def ootImportSkeletonC(basePath: str, importSettings: OOTSkeletonImportSettings)
     importNormals = importSettings.importNormals
     drawLayer = importSettings.drawLayer
 
-    skeletonData = getImportData(filepaths)
+    skeletonData = ootSourceCache.readFiles(filepaths)
     if overlayName is not None or isLink:
         skeletonData = ootGetIncludedAssetData(basePath, filepaths, skeletonData) + skeletonData
 
@@ -5,6 +5,8 @@ from bpy.path import abspath
 from mathutils import Matrix
 from ...f3d.f3d_gbi import DLFormat
 from ...utility import PluginError, raisePluginError
+from ...profiler import profile_export
+from ..oot_source_cache import use_oot_source_cache
 from ..oot_utility import getStartBone, getNextBone, getOOTScale
 from .exporter import ootConvertArmatureToC
 from .importer import ootImportSkeletonC
@@ -65,6 +67,7 @@ class OOT_ImportSkeleton(Operator):
 
     # Called on demand (i.e. button press, menu item)
     # Can also be called from operator search menu (Spacebar)
+    @use_oot_source_cache("Import Skeleton")
     def execute(self, context):
         if context.mode != "OBJECT":
             object.mode_set(mode="OBJECT")
@@ -93,6 +96,7 @@ class OOT_ExportSkeleton(Operator):
 
     # Called on demand (i.e. button press, menu item)
     # Can also be called from operator search menu (Spacebar)
+    @profile_export("Export Skeleton")
     def execute(self, context):
         armatureObj = None
         if context.mode != "OBJECT":
@@ -0,0 +1,224 @@
+import bpy, os, json, time, tracemalloc, functools
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+@dataclass
+class ProfilerStage:
+    """Accumulated statistics of one instrumented export stage"""
+
+    name: str
+    calls: int = 0
+    wall_time: float = 0.0
+    self_time: float = 0.0
+    peak_memory: int = 0
+    counters: dict[str, int] = field(default_factory=dict)
+    items: dict[str, float] = field(default_factory=dict)
+    depth: int = 0  # used to avoid counting the time of recursive calls twice
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "wallTime": self.wall_time,
+            "selfTime": self.self_time,
+            "peakMemory": self.peak_memory,
+            "counters": self.counters,
+        }
+
+
+@dataclass
+class ProfilerFrame:
+    stage: ProfilerStage
+    item: Optional[str]
+    start: float
+    child_time: float = 0.0
+    peak_memory: int = 0
+
+
+class ExportProfiler:
+    """
+    Collects timings, call counts and counters of the instrumented export stages.
+    Stages are only recorded between ``start()`` and ``stop()``, when inactive the instrumentation is a no-op.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.track_memory = False
+        self.name = ""
+        self.stages: dict[str, ProfilerStage] = {}
+        self.stack: list[ProfilerFrame] = []
+        self.start_time = 0.0
+        self.total_time = 0.0
+
+    def start(self, name: str, track_memory: bool = False):
+        self.active = True
+        self.name = name
+        self.stages = {}
+        self.stack = []
+        self.track_memory = track_memory
+        if track_memory:
+            tracemalloc.start()
+        self.start_time = time.perf_counter()
+
+    def stop(self):
+        self.total_time = time.perf_counter() - self.start_time
+        if self.track_memory:
+            tracemalloc.stop()
+        self.active = False
+        self.stack = []
+
+    def get_stage(self, name: str):
+        if name not in self.stages:
+            self.stages[name] = ProfilerStage(name)
+        return self.stages[name]
+
+    def enter(self, name: str, item: Optional[str] = None):
+        stage = self.get_stage(name)
+        stage.calls += 1
+        stage.depth += 1
+        frame = ProfilerFrame(stage, item, time.perf_counter())
+        if self.track_memory:
+            # the peak is reset for every stage, the parent's peak so far is saved in its frame
+            if len(self.stack) > 0:
+                parent = self.stack[-1]
+                parent.peak_memory = max(parent.peak_memory, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self.stack.append(frame)
+
+    def exit(self):
+        frame = self.stack.pop()
+        stage = frame.stage
+        elapsed = time.perf_counter() - frame.start
+        stage.depth -= 1
+
+        if stage.depth == 0:
+            stage.wall_time += elapsed
+        stage.self_time += elapsed - frame.child_time
+        if frame.item is not None:
+            stage.items[frame.item] = stage.items.get(frame.item, 0.0) + elapsed - frame.child_time
+
+        if len(self.stack) > 0:
+            self.stack[-1].child_time += elapsed
+
+        if self.track_memory:
+            peak = max(frame.peak_memory, tracemalloc.get_traced_memory()[1])
+            stage.peak_memory = max(stage.peak_memory, peak)
+            if len(self.stack) > 0:
+                self.stack[-1].peak_memory = max(self.stack[-1].peak_memory, peak)
+            tracemalloc.reset_peak()
+
+    def count(self, name: str, **counters: int):
+        """Adds to the counters of a stage (triangles, vertices, textures...)"""
+
+        if not self.active:
+            return
+        stage = self.get_stage(name)
+        for key, value in counters.items():
+            stage.counters[key] = stage.counters.get(key, 0) + value
+
+    def get_hot_items(self, limit: int = 10):
+        """Returns the objects/materials that took the most time, as (time, stage, item) tuples"""
+
+        hot_items = [(t, stage.name, item) for stage in self.stages.values() for item, t in stage.items.items()]
+        return sorted(hot_items, reverse=True)[:limit]
+
+    def to_dict(self):
+        return {
+            "export": self.name,
+            "totalTime": self.total_time,
+            "stages": {
+                name: stage.to_dict()
+                for name, stage in sorted(self.stages.items(), key=lambda entry: entry[1].wall_time, reverse=True)
+            },
+            "hotItems": [{"stage": stage, "item": item, "time": t} for t, stage, item in self.get_hot_items(50)],
+        }
+
+    def write_report(self, path: str):
+        with open(path, "w", newline="\n", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=4)
+
+    def print_summary(self):
+        print(f"Fast64 export profile: {self.name} ({self.total_time:.3f}s)")
+        print(f"{'Stage':<40}{'Calls':>8}{'Total (s)':>12}{'Self (s)':>12}{'Peak Mem (KiB)':>16}")
+        for stage in sorted(self.stages.values(), key=lambda stage: stage.wall_time, reverse=True):
+            print(
+                f"{stage.name:<40}{stage.calls:>8}{stage.wall_time:>12.3f}{stage.self_time:>12.3f}"
+                f"{stage.peak_memory // 1024:>16}"
+            )
+            if len(stage.counters) > 0:
+                print(" " * 4 + ", ".join(f"{key}: {value}" for key, value in stage.counters.items()))
+
+        hot_items = self.get_hot_items()
+        if len(hot_items) > 0:
+            print("Hot objects/materials:")
+            for t, stage, item in hot_items:
+                print(f"    {t:>8.3f}s  {item} ({stage})")
+
+
+profiler = ExportProfiler()
+
+
+def profile_stage(
+    name: str,
+    item: Optional[Callable[..., str]] = None,
+    counters: Optional[Callable[..., dict[str, int]]] = None,
+):
+    """
+    Decorator recording the calls of a function as the export stage ``name``.
+    ``item`` returns the name of the object/material being processed from the function arguments,
+    ``counters`` returns the amount of triangles/vertices/textures/... processed.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.active:
+                return func(*args, **kwargs)
+
+            profiler.enter(name, item(*args, **kwargs) if item is not None else None)
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                profiler.exit()
+            if counters is not None:
+                profiler.count(name, **counters(*args, **kwargs))
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def profile_export(name: str):
+    """
+    Decorator for the ``execute`` method of export operators,
+    profiles the whole export when enabled in the fast64 settings and writes the report.
+    """
+
+    def decorator(execute):
+        @functools.wraps(execute)
+        def wrapper(self, context: bpy.types.Context):
+            settings = context.scene.fast64.settings
+            if not settings.profile_exports or profiler.active:
+                return execute(self, context)
+
+            profiler.start(name, settings.profile_track_memory)
+            try:
+                result = execute(self, context)
+            finally:
+                profiler.stop()
+
+            profiler.print_summary()
+            if settings.profile_report_path != "":
+                report_path = settings.profile_report_path
+                if bpy.data.filepath == "" and report_path.startswith("//"):
+                    # relative paths can't be resolved in unsaved files
+                    report_path = os.path.join(bpy.app.tempdir, report_path.removeprefix("//"))
+                report_path = bpy.path.abspath(report_path)
+                profiler.write_report(report_path)
+                print(f"Profile report written to {report_path}")
+            return result
+
+        return wrapper
+
+    return decorator
@@ -1,6 +1,7 @@
 import bpy, os, copy, shutil, mathutils, math
 from bpy.utils import register_class, unregister_class
 from ..panels import SM64_Panel
+from ..profiler import profile_stage, profile_export
 from .sm64_level_parser import parseLevelAtPointer
 from .sm64_rom_tweaks import ExtendBank0x04
 from .sm64_geolayout_bone import animatableBoneTypes
@@ -419,6 +420,7 @@ def exportAnimationCommon(armatureObj, loopAnim, name):
     return sm64_anim
 
 
+@profile_stage("Animation Conversion", item=lambda anim, armatureObj, **kwargs: armatureObj.name)
 def convertAnimationData(anim, armatureObj, *, frame_start, frame_count):
     bonesToProcess = findStartBones(armatureObj)
     currentBone = armatureObj.data.bones[bonesToProcess[0]]
@@ -714,6 +716,7 @@ class SM64_ExportAnimMario(bpy.types.Operator):
 
     # Called on demand (i.e. button press, menu item)
     # Can also be called from operator search menu (Spacebar)
+    @profile_export("Export Animation")
     def execute(self, context):
         romfileOutput = None
         tempROM = None
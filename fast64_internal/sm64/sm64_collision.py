@@ -13,6 +13,7 @@ from .sm64_objects import SM64_Area, start_process_sm64_objects
 from .sm64_level_parser import parseLevelAtPointer
 from .sm64_rom_tweaks import ExtendBank0x04
 from ..panels import SM64_Panel
+from ..profiler import profile_stage, profile_export
 
 from ..utility import (
     PluginError,
@@ -379,6 +380,7 @@ def exportCollisionInsertableBinary(obj, transformMatrix, filepath, includeSpeci
     return data
 
 
+@profile_stage("Collision Conversion", item=lambda obj, *args: obj.name)
 def exportCollisionCommon(obj, transformMatrix, includeSpecials, includeChildren, name, areaIndex):
     bpy.ops.object.select_all(action="DESELECT")
     obj.select_set(True)
@@ -480,6 +482,7 @@ class SM64_ExportCollision(bpy.types.Operator):
 
     export_obj: bpy.props.StringProperty()
 
+    @profile_export("Export Collision")
     def execute(self, context):
         romfileOutput = None
         tempROM = None
@@ -4,6 +4,7 @@ from math import ceil, log, radians
 from mathutils import Matrix, Vector
 from bpy.utils import register_class, unregister_class
 from ..panels import SM64_Panel
+from ..profiler import profile_export
 from ..f3d.f3d_writer import exportF3DCommon
 from ..f3d.f3d_texture_writer import TexInfo
 from ..f3d.f3d_material import (
@@ -107,6 +108,7 @@ class SM64Model(FModel):
     def __init__(self, name, DLFormat, matWriteMethod):
         FModel.__init__(self, name, DLFormat, matWriteMethod)
         self.no_light_direction = bpy.context.scene.fast64.sm64.matstack_fix
+        self.convertVertexScroll = True
 
     def getDrawLayerV3(self, obj):
         return int(obj.draw_layer_static)
@@ -566,6 +568,7 @@ class SM64_ExportDL(bpy.types.Operator):
 
     # Called on demand (i.e. button press, menu item)
     # Can also be called from operator search menu (Spacebar)
+    @profile_export("Export Display List")
     def execute(self, context):
         romfileOutput = None
         tempROM = None
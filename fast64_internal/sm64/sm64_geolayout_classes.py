@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import bpy
 from struct import pack
-from copy import copy
 from .sm64_function_map import func_map
 
 from ..utility import (
@@ -94,6 +93,8 @@ class GeolayoutGraph:
         self.geolayoutCalls = {}
         self.sortedList = []
         self.sortedListGenerated = False
+        # dict of Geolayout : size, computed once the graph is sorted
+        self.geolayoutSizes = {}
 
     def checkListSorted(self):
         if not self.sortedListGenerated:
@@ -106,13 +107,14 @@ class GeolayoutGraph:
             addresses.extend(geolayout.get_ptr_addresses())
         return addresses
 
+    def getGeolayoutSize(self, geolayout):
+        if geolayout not in self.geolayoutSizes:
+            self.geolayoutSizes[geolayout] = geolayout.size()
+        return self.geolayoutSizes[geolayout]
+
     def size(self):
         self.checkListSorted()
-        size = 0
-        for geolayout in self.sortedList:
-            size += geolayout.size()
-
-        return size
+        return sum(self.getGeolayoutSize(geolayout) for geolayout in self.sortedList)
 
     def addGeolayout(self, obj, name):
         geolayout = Geolayout(name, False)
@@ -131,32 +133,47 @@ class GeolayoutGraph:
             self.geolayoutCalls[caller] = []
         self.geolayoutCalls[caller].append(callee)
 
-    def sortGeolayouts(self, geolayoutList, geolayout, callOrder):
-        if geolayout in self.geolayoutCalls:
-            for calledGeolayout in self.geolayoutCalls[geolayout]:
-                geoIndex = geolayoutList.index(geolayout)
-                if calledGeolayout in geolayoutList:
-                    callIndex = geolayoutList.index(calledGeolayout)
-                    if callIndex < geoIndex:
-                        continue
-                    else:
-                        raise PluginError("Circular geolayout dependency." + str(callOrder))
-                else:
-                    geolayoutList.insert(geolayoutList.index(geolayout), calledGeolayout)
-                    callOrder = copy(callOrder)
-                    callOrder.append(calledGeolayout)
-                    self.sortGeolayouts(geolayoutList, calledGeolayout, callOrder)
-        return geolayoutList
+    def sortGeolayouts(self, startGeolayout):
+        """
+        Returns the geolayouts called from startGeolayout, each one placed after all the geolayouts it calls
+        (depth first post-order, in call order).
+        """
+        sortedList = []
+        visiting = set()
+        visited = set()
+        # stack of (geolayout, iterator over the geolayouts it calls)
+        stack = [(startGeolayout, iter(self.geolayoutCalls.get(startGeolayout, [])))]
+        visiting.add(startGeolayout)
+        while len(stack) > 0:
+            geolayout, calls = stack[-1]
+            for calledGeolayout in calls:
+                if calledGeolayout in visiting:
+                    callOrder = [entry[0] for entry in stack]
+                    cycle = callOrder[callOrder.index(calledGeolayout) :] + [calledGeolayout]
+                    raise PluginError(
+                        "Circular geolayout dependency: " + " -> ".join(cycleGeo.name for cycleGeo in cycle)
+                    )
+                if calledGeolayout not in visited:
+                    visiting.add(calledGeolayout)
+                    stack.append((calledGeolayout, iter(self.geolayoutCalls.get(calledGeolayout, []))))
+                    break
+            else:
+                stack.pop()
+                visiting.remove(geolayout)
+                visited.add(geolayout)
+                sortedList.append(geolayout)
+        return sortedList
 
     def generateSortedList(self):
-        self.sortedList = self.sortGeolayouts([self.startGeolayout], self.startGeolayout, [self.startGeolayout])
+        self.sortedList = self.sortGeolayouts(self.startGeolayout)
         self.sortedListGenerated = True
+        self.geolayoutSizes = {}
 
     def set_addr(self, address):
         self.checkListSorted()
         for geolayout in self.sortedList:
             geolayout.startAddress = address
-            address += geolayout.size()
+            address += self.getGeolayoutSize(geolayout)
             print(geolayout.name + " - " + str(geolayout.startAddress))
         return address
 
@@ -188,6 +205,7 @@ class GeolayoutGraph:
 
     def convertToDynamic(self):
         self.checkListSorted()
+        self.geolayoutSizes = {}
         for geolayout in self.sortedList:
             for node in geolayout.nodes:
                 node.convertToDynamic()
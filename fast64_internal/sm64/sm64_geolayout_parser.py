@@ -20,6 +20,8 @@ from ..utility import (
     readFloatFromShort,
     doRotation,
     prop_split,
+    selectSingleObject,
+    parentObjectsToArmature,
     sm64BoneUp,
     geoNodeRotateOrder,
 )
@@ -56,6 +58,62 @@ from .sm64_geolayout_classes import (
 
 blender_modes = {"OBJECT", "BONE"}
 
+
+class SM64DeferredBone:
+    """Records the properties set on a bone created in edit mode, they are applied by SM64GeoBoneEdits.apply"""
+
+    def __init__(self, boneGroup):
+        object.__setattr__(self, "boneGroup", boneGroup)
+        object.__setattr__(self, "props", {})
+
+    def __setattr__(self, name, value):
+        self.props[name] = value
+
+
+class SM64GeoBoneEdits:
+    """
+    Bones can only be created in edit mode, while their geolayout properties and groups are set in object mode.
+    The importer creates every bone of an armature in a single edit mode session and applies the properties
+    once at the end, instead of switching modes for every bone.
+    """
+
+    def __init__(self):
+        self.editArmatureObj = None
+        self.bones: list[tuple[bpy.types.Object, str, SM64DeferredBone]] = []
+
+    def edit(self, armatureObj: bpy.types.Object):
+        """Enters edit mode on an armature, only switches modes if another armature is being edited"""
+        if self.editArmatureObj == armatureObj and bpy.context.mode == "EDIT_ARMATURE":
+            return
+        if bpy.context.mode != "OBJECT":
+            bpy.ops.object.mode_set(mode="OBJECT")
+        selectSingleObject(armatureObj)
+        bpy.ops.object.mode_set(mode="EDIT")
+        self.editArmatureObj = armatureObj
+
+    def add(self, armatureObj: bpy.types.Object, boneName: str, boneGroup):
+        bone = SM64DeferredBone(boneGroup)
+        self.bones.append((armatureObj, boneName, bone))
+        return bone
+
+    def get(self, armatureObj: bpy.types.Object, boneName: str) -> SM64DeferredBone:
+        return next(bone for obj, name, bone in reversed(self.bones) if obj == armatureObj and name == boneName)
+
+    def apply(self):
+        if bpy.context.mode != "OBJECT":
+            bpy.ops.object.mode_set(mode="OBJECT")
+        self.editArmatureObj = None
+
+        for armatureObj, boneName, deferredBone in self.bones:
+            addBoneToGroup(armatureObj, boneName, deferredBone.boneGroup)
+            bone = armatureObj.data.bones[boneName]
+            for name, value in deferredBone.props.items():
+                setattr(bone, name, value)
+        self.bones = []
+
+
+geoBoneEdits = SM64GeoBoneEdits()
+
 # This geolayout parser is designed to rip armature / model.
 # It will only handle transform/mesh related commands.
 # For switch cases, only the first option will be chosen.
@@ -92,49 +150,47 @@ def parseGeoLayout(
         armature.show_names = True
 
         bpy.context.scene.collection.objects.link(armatureObj)
-        bpy.context.view_layer.objects.active = armatureObj
-        bpy.ops.object.mode_set(mode="EDIT")
         createBoneGroups(armatureObj)
+        geoBoneEdits.edit(armatureObj)
     else:
         armatureObj = None
 
     # Parse geolayout
     # Pretend that command starts with an 0x04
-    currentAddress, armatureMeshGroups = parseNode(
-        romfile,
-        startAddress,
-        currentAddress - 4,
-        [0x04, 0x00],
-        [currentAddress],
-        convertTransformMatrix.to_4x4(),
-        bMesh,
-        obj,
-        armatureObj,
-        None,
-        ignoreSwitch,
-        False,
-        0,
-        0,
-        [None] * 16 * 16,
-        segmentData=segmentData,
-    )
+    try:
+        currentAddress, armatureMeshGroups = parseNode(
+            romfile,
+            startAddress,
+            currentAddress - 4,
+            [0x04, 0x00],
+            [currentAddress],
+            convertTransformMatrix.to_4x4(),
+            bMesh,
+            obj,
+            armatureObj,
+            None,
+            ignoreSwitch,
+            False,
+            0,
+            0,
+            [None] * 16 * 16,
+            segmentData=segmentData,
+        )
+    finally:
+        geoBoneEdits.apply()
 
     armatureMeshGroups.insert(0, (armatureObj, bMesh, obj))
 
     for i in range(len(armatureMeshGroups)):
         listObj = armatureMeshGroups[i][2]
         listBMesh = armatureMeshGroups[i][1]
+        if shadeSmooth:
+            for face in listBMesh.faces:
+                face.smooth = True
         listBMesh.to_mesh(listObj.data)
         listBMesh.free()
         listObj.data.update()
 
-        if shadeSmooth:
-            if bpy.context.mode != "OBJECT":
-                bpy.ops.object.mode_set(mode="OBJECT")
-            bpy.ops.object.select_all(action="DESELECT")
-            listObj.select_set(True)
-            bpy.ops.object.shade_smooth()
-
     # Dont remove doubles here, as importing geolayout all at once results
     # in some overlapping verts from different display lists.
     # bmesh.ops.remove_doubles(bMesh, verts = bMesh.verts, dist = 0.000001)
@@ -148,14 +204,9 @@ def parseGeoLayout(
             obj = armatureMeshGroups[i][2]
             switchArmatureObj = armatureMeshGroups[i][0]
             # Apply mesh to armature.
-            if bpy.context.mode != "OBJECT":
-                bpy.ops.object.mode_set(mode="OBJECT")
-            bpy.ops.object.select_all(action="DESELECT")
-            obj.select_set(True)
-            switchArmatureObj.select_set(True)
-            bpy.context.view_layer.objects.active = switchArmatureObj
-            bpy.ops.object.parent_set(type="ARMATURE")
-            switchArmatureObj.matrix_world = switchArmatureObj.matrix_world @ mathutils.Matrix.Translation(
+            parentObjectsToArmature(switchArmatureObj, [obj])
+            # The armatures have no parent, so the basis matrix is the world matrix
+            switchArmatureObj.matrix_basis = switchArmatureObj.matrix_basis @ mathutils.Matrix.Translation(
                 mathutils.Vector((3 * i, 0, 0))
             )
 
@@ -701,11 +752,8 @@ def createConnectBone(armatureObj, childName, parentName):
 
 
 def createBone(armatureObj, parentBoneName, boneName, currentTransform, boneGroup, loadDL):
-    if bpy.context.mode != "OBJECT":
-        bpy.ops.object.mode_set(mode="OBJECT")
-    bpy.ops.object.select_all(action="DESELECT")
-    bpy.context.view_layer.objects.active = armatureObj
-    bpy.ops.object.mode_set(mode="EDIT")
+    """Creates an edit bone, its properties are set through geoBoneEdits.get and applied after the import"""
+    geoBoneEdits.edit(armatureObj)
     bone = armatureObj.data.edit_bones.new(boneName)
     bone.use_connect = False
     if parentBoneName is not None:
@@ -730,8 +778,7 @@ def createBone(armatureObj, parentBoneName, boneName, currentTransform, boneGrou
             bone.tail += currentTransform.to_quaternion() @ mathutils.Vector((0, 1, 0)) * 0.02
 
     boneName = bone.name
-    addBoneToGroup(armatureObj, bone.name, boneGroup)
-    bone = armatureObj.data.bones[boneName]
+    bone = geoBoneEdits.add(armatureObj, boneName, boneGroup)
     bone.geo_cmd = boneGroup if boneGroup is not None else "DisplayListWithOffset"
 
     return boneName
@@ -740,8 +787,6 @@ def createBone(armatureObj, parentBoneName, boneName, currentTransform, boneGrou
 def createSwitchOption(
     armatureObj, switchBoneName, boneName, currentTransform, nextParentTransform, switchLevel, switchCount
 ):
-    bpy.ops.object.mode_set(mode="OBJECT")
-    bpy.ops.object.select_all(action="DESELECT")
     # bpy.context.view_layer.objects.active = armatureObj
     # bpy.ops.object.mode_set(mode="EDIT")
     # bone = armatureObj.data.edit_bones.new(boneName)
@@ -760,13 +805,10 @@ def createSwitchOption(
     armature.show_names = True
 
     bpy.context.scene.collection.objects.link(switchArmature)
-    bpy.ops.object.mode_set(mode="POSE")
-    bpy.ops.object.mode_set(mode="OBJECT")
     createBoneGroups(switchArmature)
-    bpy.context.view_layer.objects.active = switchArmature
     # switchArmature.matrix_world = mathutils.Matrix.Translation(
     # 	finalTransform.to_translation())
-    bpy.ops.object.mode_set(mode="EDIT")
+    geoBoneEdits.edit(switchArmature)
 
     # create switch option bone
     bone = switchArmature.data.edit_bones.new(boneName)
@@ -775,10 +817,9 @@ def createSwitchOption(
     bone.tail = bone.head + currentTransform.to_quaternion() @ mathutils.Vector((0, 1, 0)) * 0.2
 
     boneName = bone.name
-    bpy.ops.object.mode_set(mode="OBJECT")
-    bone = switchArmature.data.bones[boneName]
+    bone = geoBoneEdits.add(switchArmature, boneName, "SwitchOption")
     # poseBone = switchArmature.pose.bones[boneName]
-    switchBone = armatureObj.data.bones[switchBoneName]
+    # switchBone = armatureObj.data.bones[switchBoneName]
 
     # rotConstraint = poseBone.constraints.new(type = 'COPY_ROTATION')
     # rotConstraint.target = armatureObj
@@ -802,8 +843,6 @@ def createSwitchOption(
     bMesh = bmesh.new()
     bMesh.from_mesh(mesh)
 
-    addBoneToGroup(switchArmature, boneName, "SwitchOption")
-
     return boneName, (switchArmature, bMesh, obj), finalTransform, finalNextParentTransform
 
 
@@ -823,7 +862,7 @@ def parseSwitch(
         boneName = format(nodeIndex, "03") + "-switch"
         if armatureObj is not None:
             boneName = createBone(armatureObj, parentBoneName, boneName, currentTransform, "Switch", False)
-            bone = armatureObj.data.bones[boneName]
+            bone = geoBoneEdits.get(armatureObj, boneName)
             bone.geo_func = switchFunc
             bone.func_param = funcParam
     else:
@@ -869,7 +908,7 @@ def parseDL(
             vertexBuffer,
         )
         if armatureObj is not None:
-            bone = armatureObj.data.bones[boneName]
+            bone = geoBoneEdits.get(armatureObj, boneName)
             bone.draw_layer = str(drawLayer)
 
     currentAddress += commandSize
@@ -913,12 +952,9 @@ def parseDLWithOffset(
         if armatureObj is not None:
             # Create bone
             boneName = createBone(armatureObj, parentBoneName, boneName, finalTransform, None, hasMeshData)
-            if bpy.context.mode != "OBJECT":
-                bpy.ops.object.mode_set(mode="OBJECT")
-            bone = armatureObj.data.bones[boneName]
+            bone = geoBoneEdits.get(armatureObj, boneName)
             bone.draw_layer = str(drawLayer)
-            armatureObj.data.bones[boneName].use_deform = hasMeshData
-            bpy.ops.object.mode_set(mode="EDIT")
+            bone.use_deform = hasMeshData
 
         # load mesh data
         if hasMeshData:
@@ -1014,7 +1050,7 @@ def handleNodeCommon(
                 vertexBuffer,
             )
     elif armatureObj is not None:
-        armatureObj.data.bones[boneName].use_deform = False
+        geoBoneEdits.get(armatureObj, boneName).use_deform = False
     return boneName
 
 
@@ -1061,7 +1097,7 @@ def parseScale(
             vertexBuffer,
         )
         if armatureObj is not None:
-            bone = armatureObj.data.bones[boneName]
+            bone = geoBoneEdits.get(armatureObj, boneName)
             bone.draw_layer = str(drawLayer)
             bone.geo_scale = scale
     else:
@@ -1142,7 +1178,7 @@ def parseTranslateRotate(
             vertexBuffer,
         )
         if armatureObj is not None:
-            bone = armatureObj.data.bones[boneName]
+            bone = geoBoneEdits.get(armatureObj, boneName)
             bone.draw_layer = str(drawLayer)
 
             # Rotate Y complicates exporting code, so we treat it as Rotate.
@@ -1204,7 +1240,7 @@ def parseTranslate(
             vertexBuffer,
         )
         if armatureObj is not None:
-            bone = armatureObj.data.bones[boneName]
+            bone = geoBoneEdits.get(armatureObj, boneName)
             bone.draw_layer = str(drawLayer)
     else:
         boneName = None
@@ -1261,7 +1297,7 @@ def parseRotate(
             vertexBuffer,
         )
         if armatureObj is not None:
-            bone = armatureObj.data.bones[boneName]
+            bone = geoBoneEdits.get(armatureObj, boneName)
             bone.draw_layer = str(drawLayer)
     else:
         boneName = None
@@ -1317,7 +1353,7 @@ def parseBillboard(
             vertexBuffer,
         )
         if armatureObj is not None:
-            bone = armatureObj.data.bones[boneName]
+            bone = geoBoneEdits.get(armatureObj, boneName)
             bone.draw_layer = str(drawLayer)
     else:
         boneName = None
@@ -1350,7 +1386,7 @@ def parseShadow(
         boneName = format(nodeIndex, "03") + "-shadow"
         if armatureObj is not None:
             boneName = createBone(armatureObj, parentBoneName, boneName, currentTransform, "Shadow", False)
-            bone = armatureObj.data.bones[boneName]
+            bone = geoBoneEdits.get(armatureObj, boneName)
             bone.shadow_type = str(shadowType)
             bone.shadow_solidity = shadowSolidity / 0xFF
             bone.shadow_scale = shadowScale
@@ -1394,7 +1430,7 @@ def parseStartWithRenderArea(
         boneName = format(nodeIndex, "03") + "-start_render_area"
         if armatureObj is not None:
             boneName = createBone(armatureObj, parentBoneName, boneName, currentTransform, "StartRenderArea", False)
-            bone = armatureObj.data.bones[boneName]
+            bone = geoBoneEdits.get(armatureObj, boneName)
             bone.geo_cmd = "StartRenderArea"
             bone.culling_radius = cullingRadius
     else:
@@ -1419,7 +1455,7 @@ def parseFunction(
     boneName = format(nodeIndex, "03") + "-asm"
     if armatureObj is not None and not ignoreNode:
         boneName = createBone(armatureObj, parentBoneName, boneName, currentTransform, "Function", False)
-        bone = armatureObj.data.bones[boneName]
+        bone = geoBoneEdits.get(armatureObj, boneName)
         bone.geo_func = asmFunc
         bone.func_param = asmParam
 
@@ -1444,7 +1480,7 @@ def parseHeldObject(
         boneName = format(nodeIndex, "03") + "-held_object"
         if armatureObj is not None:
             boneName = createBone(armatureObj, parentBoneName, boneName, finalTransform, "HeldObject", False)
-            bone = armatureObj.data.bones[boneName]
+            bone = geoBoneEdits.get(armatureObj, boneName)
             bone.geo_func = asmFunc
 
     currentAddress += commandSize
@@ -5,6 +5,7 @@ from bpy.utils import register_class, unregister_class
 from io import BytesIO
 
 from ..operators import ObjectDataExporter
+from ..profiler import profile_stage, profile_export
 from ..panels import SM64_Panel
 from .sm64_objects import InlineGeolayoutObjConfig, inlineGeoLayoutObjects
 from .sm64_geolayout_bone import getSwitchOptionBone, animatableBoneTypes
@@ -388,6 +389,7 @@ def appendRevertToGeolayout(geolayoutGraph, fModel):
 
 
 # Convert to Geolayout
+@profile_stage("SM64 Geolayout Conversion", item=lambda armatureObj, *args: armatureObj.name)
 def convertArmatureToGeolayout(armatureObj, obj, convertTransformMatrix, camera, name, DLFormat, convertTextureData):
     inline = bpy.context.scene.exportInlineF3D
     fModel = SM64Model(
@@ -453,6 +455,7 @@ def convertArmatureToGeolayout(armatureObj, obj, convertTransformMatrix, camera,
 
 
 # Camera is unused here
+@profile_stage("SM64 Geolayout Conversion", item=lambda obj, *args: obj.name)
 def convertObjectToGeolayout(
     obj, convertTransformMatrix, camera, name, fModel: FModel, areaObj, DLFormat, convertTextureData
 ):
@@ -599,6 +602,7 @@ def exportGeolayoutObjectC(
     )
 
 
+@profile_stage("SM64 Geolayout Write")
 def saveGeolayoutC(
     geoName,
     dirName,
@@ -2816,6 +2820,7 @@ class SM64_ExportGeolayoutObject(ObjectDataExporter):
 
     # Called on demand (i.e. button press, menu item)
     # Can also be called from operator search menu (Spacebar)
+    @profile_export("Export Object Geolayout")
     def execute(self, context):
         romfileOutput = None
         tempROM = None
@@ -2989,6 +2994,7 @@ class SM64_ExportGeolayoutArmature(bpy.types.Operator):
 
     # Called on demand (i.e. button press, menu item)
     # Can also be called from operator search menu (Spacebar)
+    @profile_export("Export Armature Geolayout")
     def execute(self, context):
         romfileOutput = None
         tempROM = None
@@ -5,6 +5,7 @@ from dataclasses import dataclass
 from bpy.utils import register_class, unregister_class
 from ..panels import SM64_Panel
 from ..operators import ObjectDataExporter
+from ..profiler import profile_export
 from .sm64_constants import cameraTriggerNames, levelIDNames, enumLevelNames
 from .sm64_objects import exportAreaCommon, backgroundSegments
 from .sm64_collision import exportCollisionCommon
@@ -1181,6 +1182,7 @@ class SM64_ExportLevel(ObjectDataExporter):
     bl_label = "Export Level"
     bl_options = {"REGISTER", "UNDO", "PRESET"}
 
+    @profile_export("Export Level")
     def execute(self, context):
         if context.mode != "OBJECT":
             raise PluginError("Operator can only be used in object mode.")
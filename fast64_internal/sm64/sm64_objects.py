@@ -5,6 +5,7 @@ from pathlib import Path
 from .sm64_function_map import func_map
 from ..panels import SM64_Panel
 from ..operators import ObjectDataExporter
+from ..profiler import profile_export
 
 from ..utility import (
     PluginError,
@@ -1842,6 +1843,7 @@ class SM64_ExportCombinedObject(ObjectDataExporter):
             if not props.export_all_selected:
                 raise Exception(e)
 
+    @profile_export("SM64 Combined Object")
     def execute(self, context):
         props = context.scene.fast64.sm64.combined_export
         try:
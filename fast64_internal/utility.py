@@ -2,6 +2,7 @@ import bpy, random, string, os, math, traceback, re, os, mathutils, ast, operato
 from math import pi, ceil, degrees, radians, copysign
 from mathutils import *
 from .utility_anim import *
+from .profiler import profile_stage
 from typing import Callable, Iterable, Any, Optional, Tuple, TypeVar, Union
 from bpy.types import UILayout, Scene, World
 
@@ -151,6 +152,11 @@ def readFile(filepath):
     return data
 
 
+@profile_stage(
+    "File Write",
+    item=lambda filepath, data: os.path.basename(filepath),
+    counters=lambda filepath, data: {"bytes": len(data)},
+)
 def writeFile(filepath, data):
     datafile = open(filepath, "w", newline="\n", encoding="utf-8")
     datafile.write(data)
@@ -179,6 +185,22 @@ def parentObject(parent, child):
     bpy.ops.object.parent_set(type="OBJECT", keep_transform=True)
 
 
+def parentObjectsToArmature(armatureObj: bpy.types.Object, objs: list[bpy.types.Object]):
+    """Same as parent_set(type="ARMATURE") for each object, without selection changes or operator calls"""
+
+    if armatureObj.parent is None:
+        # the world matrix of a newly created or moved object is only updated by the depsgraph
+        parentInverse = armatureObj.matrix_basis.inverted()
+    else:
+        bpy.context.view_layer.update()
+        parentInverse = armatureObj.matrix_world.inverted()
+    for obj in objs:
+        obj.parent = armatureObj
+        obj.matrix_parent_inverse = parentInverse
+        modifier = obj.modifiers.new("Armature", "ARMATURE")
+        modifier.object = armatureObj
+
+
 def getFMeshName(vertexGroup, namePrefix, drawLayer, isSkinned):
     fMeshName = toAlnum(namePrefix + ("_" if namePrefix != "" else "") + vertexGroup)
     if isSkinned:
@@ -0,0 +1,347 @@
+import argparse
+import json
+import math
+import random
+import re
+import sys
+import tempfile
+import time
+
+import addon_utils
+import bpy
+
+from importlib import import_module
+from pathlib import Path
+
+"""
+A script that can be run in blender to benchmark fast64's exporters and importers
+on procedurally generated scenes, and compare the results against stored baselines.
+
+Every scene is generated from a fixed seed, so results are reproducible between runs.
+For each triangle count, a grid mesh is generated with the given amount of materials
+and textures (cycling through the N64 texture formats), along with an armature with
+keyframed bones. Each export/import path is then timed, keeping the best of the repeats.
+Fast64's export profiler is enabled during the benchmarks, so the results of the
+exporters also contain the time spent in each export stage.
+
+If a baseline file exists, any benchmark slower than the baseline by more than the
+threshold is reported as a regression, and the script fails.
+
+Usage:
+blender --background --python-exit-code 1 --python run_benchmarks.py -- [--sizes 1000 10000 100000] [--materials 8] [--textures 8] [--bones 20] [--frames 60] [--seed 0] [--repeat 3] [--threshold 0.25] [--baseline <baseline json>] [--update-baseline] [--output <results json>] [--only <benchmark names>]
+
+Example:
+blender --background --python-exit-code 1 --python run_benchmarks.py -- --sizes 1000 10000 --update-baseline
+"""
+
+TEXTURE_FORMATS = ["RGBA16", "CI4", "CI8", "I4", "I8", "IA4", "IA8", "IA16", "RGBA32"]
+TEXTURE_SIZE = 32
+CI_COLOR_COUNTS = {"CI4": 16, "CI8": 256}
+
+
+def parseArgs():
+    args = sys.argv[(sys.argv.index("--") + 1) :] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="run_benchmarks.py")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="triangle counts")
+    parser.add_argument("--materials", type=int, default=8)
+    parser.add_argument("--textures", type=int, default=8)
+    parser.add_argument("--bones", type=int, default=20)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown ratio before failing")
+    parser.add_argument("--baseline", type=Path, default=Path(__file__).resolve().parent / "baseline.json")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--only", nargs="+", default=None, help="names of the benchmarks to run")
+    return parser.parse_args(args)
+
+
+def getFast64Module():
+    """Returns the package name of the fast64 addon, enabling it if needed"""
+
+    for module in addon_utils.modules():
+        if module.bl_info.get("name") == "Fast64":
+            if not addon_utils.check(module.__name__)[1]:
+                addon_utils.enable(module.__name__, default_set=True)
+            return module.__name__
+    raise RuntimeError("Fast64 addon is not installed")
+
+
+def resetScene():
+    bpy.ops.wm.read_homefile(use_empty=True)
+    bpy.context.scene.fast64.settings.profile_exports = True
+    bpy.context.scene.fast64.settings.profile_report_path = ""
+
+
+def createImage(name: str, texFormat: str, rng: random.Random):
+    image = bpy.data.images.new(name, TEXTURE_SIZE, TEXTURE_SIZE, alpha=True)
+    colorCount = CI_COLOR_COUNTS.get(texFormat)
+    palette = (
+        [(rng.random(), rng.random(), rng.random(), 1.0) for _ in range(colorCount)] if colorCount is not None else None
+    )
+
+    pixels = []
+    for _ in range(TEXTURE_SIZE * TEXTURE_SIZE):
+        if palette is not None:
+            pixels.extend(rng.choice(palette))
+        else:
+            pixels.extend((rng.random(), rng.random(), rng.random(), rng.random()))
+    image.pixels.foreach_set(pixels)
+    image.pack()
+    return image
+
+
+def createMesh(fast64: str, name: str, triCount: int, materialCount: int, textureCount: int, rng: random.Random):
+    createF3DMat = import_module(f"{fast64}.fast64_internal.f3d.f3d_material").createF3DMat
+
+    side = max(1, math.ceil(math.sqrt(triCount / 2)))
+    vertices = [(x / side, y / side, rng.uniform(-0.02, 0.02)) for y in range(side + 1) for x in range(side + 1)]
+    faces = [
+        (y * (side + 1) + x, y * (side + 1) + x + 1, (y + 1) * (side + 1) + x + 1, (y + 1) * (side + 1) + x)
+        for y in range(side)
+        for x in range(side)
+    ]
+
+    mesh = bpy.data.meshes.new(f"{name}_mesh")
+    mesh.from_pydata(vertices, [], faces)
+    mesh.update()
+
+    uvLayer = mesh.uv_layers.new(name="UVMap")
+    for loop in mesh.loops:
+        co = mesh.vertices[loop.vertex_index].co
+        uvLayer.data[loop.index].uv = (co.x * 2, co.y * 2)
+
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+
+    images = [
+        createImage(f"{name}_tex_{i}", TEXTURE_FORMATS[i % len(TEXTURE_FORMATS)], rng) for i in range(textureCount)
+    ]
+    for i in range(materialCount):
+        if len(images) > 0:
+            material = createF3DMat(obj, preset="Shaded Texture")
+            texProp = material.f3d_mat.tex0
+            texProp.tex = images[i % len(images)]
+            texProp.tex_format = TEXTURE_FORMATS[(i % len(images)) % len(TEXTURE_FORMATS)]
+            if texProp.tex_format.startswith("CI"):
+                texProp.ci_format = "RGBA16"
+        else:
+            material = createF3DMat(obj, preset="Shaded Solid")
+        material.name = f"{name}_mat_{i}"
+
+    # materials are assigned in bands of rows, like regions of a level would be
+    for polygon in mesh.polygons:
+        row = polygon.index // side
+        polygon.material_index = min(row * materialCount // side, materialCount - 1)
+
+    return obj
+
+
+def createArmature(name: str, boneCount: int, frameCount: int, rng: random.Random):
+    armature = bpy.data.armatures.new(f"{name}_data")
+    armatureObj = bpy.data.objects.new(name, armature)
+    bpy.context.collection.objects.link(armatureObj)
+
+    bpy.ops.object.select_all(action="DESELECT")
+    armatureObj.select_set(True)
+    bpy.context.view_layer.objects.active = armatureObj
+    bpy.ops.object.mode_set(mode="EDIT")
+    parent = None
+    for i in range(boneCount):
+        bone = armature.edit_bones.new(f"bone_{i:03}")
+        bone.head = (0, 0, i * 0.5)
+        bone.tail = (0, 0, i * 0.5 + 0.5)
+        if parent is not None:
+            bone.parent = parent
+            bone.use_connect = True
+        parent = bone
+    bpy.ops.object.mode_set(mode="OBJECT")
+
+    armatureObj.animation_data_create()
+    action = bpy.data.actions.new(f"{name}_anim")
+    armatureObj.animation_data.action = action
+    for poseBone in armatureObj.pose.bones:
+        poseBone.rotation_mode = "XYZ"
+        for frame in range(0, frameCount, 5):
+            poseBone.rotation_euler = (rng.uniform(-1, 1), rng.uniform(-1, 1), rng.uniform(-1, 1))
+            poseBone.keyframe_insert("rotation_euler", frame=frame)
+        if poseBone.parent is None:
+            for frame in range(0, frameCount, 5):
+                poseBone.location = (rng.uniform(-1, 1), rng.uniform(-1, 1), rng.uniform(-1, 1))
+                poseBone.keyframe_insert("location", frame=frame)
+
+    bpy.context.scene.frame_start = 0
+    bpy.context.scene.frame_end = frameCount - 1
+    return armatureObj
+
+
+def selectOnly(obj: bpy.types.Object):
+    bpy.ops.object.select_all(action="DESELECT")
+    obj.select_set(True)
+    bpy.context.view_layer.objects.active = obj
+
+
+def benchF3DExport(outDir: Path, meshObj: bpy.types.Object, inline: bool):
+    scene = bpy.context.scene
+    scene.gameEditorMode = "Homebrew"
+    # exportF3DtoC bleeds and inlines the materials when set
+    scene.exportInlineF3D = inline
+    scene.DLExportPath = str(outDir)
+    scene.DLName = "bench"
+    scene.DLExportisStatic = True
+    scene.DLSeparateTextureDef = False
+    selectOnly(meshObj)
+    return bpy.ops.object.f3d_export_dl()
+
+
+def benchF3DImport(outDir: Path):
+    scene = bpy.context.scene
+    scene.gameEditorMode = "OOT"
+    modelPath = outDir / "bench" / "model.inc.c"
+    match = re.search(r"Gfx\s+([A-Za-z0-9_]+_mesh[A-Za-z0-9_]*)\s*\[\s*\]\s*=", modelPath.read_text())
+    if match is None:
+        raise RuntimeError(f"No mesh display list found in {modelPath}")
+    scene.DLImportName = match.group(1)
+    scene.DLImportPath = str(modelPath)
+    scene.DLImportBasePath = str(outDir)
+    return bpy.ops.object.f3d_import_dl()
+
+
+def benchOoTDLExport(outDir: Path, meshObj: bpy.types.Object):
+    bpy.context.scene.gameEditorMode = "OOT"
+    settings = bpy.context.scene.fast64.oot.DLExportSettings
+    settings.isCustom = True
+    settings.customPath = str(outDir)
+    settings.folder = "bench"
+    selectOnly(meshObj)
+    return bpy.ops.object.oot_export_dl()
+
+
+def benchSM64AnimExport(outDir: Path, armatureObj: bpy.types.Object):
+    scene = bpy.context.scene
+    scene.gameEditorMode = "SM64"
+    scene.fast64.sm64.export_type = "C"
+    scene.animCustomExport = True
+    scene.animExportPath = str(outDir)
+    scene.animName = "bench"
+    selectOnly(armatureObj)
+    return bpy.ops.object.sm64_export_anim()
+
+
+def benchOoTAnimExport(outDir: Path, armatureObj: bpy.types.Object):
+    bpy.context.scene.gameEditorMode = "OOT"
+    settings = bpy.context.scene.fast64.oot.animExportSettings
+    settings.isCustom = True
+    settings.customPath = str(outDir)
+    settings.folderName = "bench"
+    settings.isLink = False
+    selectOnly(armatureObj)
+    return bpy.ops.object.oot_export_anim()
+
+
+def runBenchmark(fast64: str, name: str, func, repeat: int):
+    profiler = import_module(f"{fast64}.fast64_internal.profiler").profiler
+    bestTime = None
+    stages = {}
+
+    for _ in range(repeat):
+        lastProfileStart = profiler.start_time
+        startTime = time.perf_counter()
+        res = func()
+        elapsed = time.perf_counter() - startTime
+        if "FINISHED" not in res:
+            raise RuntimeError(f"Benchmark {name} failed")
+        if bestTime is None or elapsed < bestTime:
+            bestTime = elapsed
+            # importers are not profiled, the profiler would still hold the stages of the last export
+            profiled = profiler.start_time != lastProfileStart
+            stages = (
+                {stageName: stage["wallTime"] for stageName, stage in profiler.to_dict()["stages"].items()}
+                if profiled
+                else {}
+            )
+
+    print(f"{name:<40}{bestTime:>10.3f}s", flush=True)
+    return {"time": bestTime, "stages": stages}
+
+
+def main():
+    args = parseArgs()
+    fast64 = getFast64Module()
+    results: dict[str, dict] = {}
+
+    for triCount in args.sizes:
+        # the same seed is used for every size so smaller scenes are a subset of bigger ones
+        rng = random.Random(args.seed)
+        resetScene()
+        meshObj = createMesh(fast64, "bench_mesh", triCount, args.materials, args.textures, rng)
+        armatureObj = createArmature("bench_armature", args.bones, args.frames, rng)
+
+        with tempfile.TemporaryDirectory() as tempDir:
+            outDir = Path(tempDir)
+            benchmarks = {
+                # the importer reads the output of the last export, which is not inlined
+                "f3d_export_inline": lambda: benchF3DExport(outDir, meshObj, True),
+                "f3d_export": lambda: benchF3DExport(outDir, meshObj, False),
+                "f3d_import": lambda: benchF3DImport(outDir),
+                "oot_dl_export": lambda: benchOoTDLExport(outDir, meshObj),
+                "sm64_anim_export": lambda: benchSM64AnimExport(outDir, armatureObj),
+                "oot_anim_export": lambda: benchOoTAnimExport(outDir, armatureObj),
+            }
+            if args.only is not None and "f3d_import" in args.only and "f3d_export" not in args.only:
+                # the importer reads the output of the exporter
+                args.only.append("f3d_export")
+
+            for benchName, func in benchmarks.items():
+                if args.only is not None and benchName not in args.only:
+                    continue
+                key = f"{benchName}/{triCount}"
+                results[key] = runBenchmark(fast64, key, func, args.repeat)
+
+    settings = {
+        "materials": args.materials,
+        "textures": args.textures,
+        "bones": args.bones,
+        "frames": args.frames,
+        "seed": args.seed,
+    }
+    output = {"blender": bpy.app.version_string, "settings": settings, "results": results}
+    if args.output is not None:
+        args.output.write_text(json.dumps(output, indent=4))
+
+    regressions = []
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("settings") != settings:
+            print(f"Warning: baseline {args.baseline} was generated with different settings")
+
+        print(f"{'Benchmark':<40}{'Baseline':>10}{'Current':>10}{'Change':>10}")
+        for key, result in results.items():
+            baseResult = baseline["results"].get(key)
+            if baseResult is None:
+                continue
+            change = result["time"] / baseResult["time"] - 1 if baseResult["time"] > 0 else 0
+            print(f"{key:<40}{baseResult['time']:>10.3f}{result['time']:>10.3f}{change:>+10.1%}")
+            if change > args.threshold:
+                regressions.append(key)
+                slowerStages = sorted(
+                    (
+                        (stageTime - baseResult["stages"].get(stage, 0), stage)
+                        for stage, stageTime in result["stages"].items()
+                    ),
+                    reverse=True,
+                )[:3]
+                for delta, stage in slowerStages:
+                    print(f"    {stage}: {delta:+.3f}s")
+
+    if args.update_baseline or not args.baseline.exists():
+        args.baseline.write_text(json.dumps(output, indent=4))
+        print(f"Baseline written to {args.baseline}")
+
+    if len(regressions) > 0:
+        raise RuntimeError(f"Performance regressions above {args.threshold:.0%}: {regressions}")
+
+
+main()
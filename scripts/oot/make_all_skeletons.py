@@ -1,93 +1,207 @@
+import argparse
+import hashlib
+import json
+import os
 import re
 import subprocess
 import sys
 import shutil
+import time
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Optional
 
 """
 A test script to try import skeletons (and optionally animations) in a decomp
 folder, generating .blend files for file, and report on successes & failures.
 
-WARNING: the specified output folder is unconditionally deleted before generating 
-new output!
+Skeleton files are imported in parallel, one blender process per file, using a pool
+of workers sized to the CPU count by default.
+
+A result cache is kept in the output folder, keyed by each source file's hash and the
+addon version: files that were already imported successfully and haven't changed since
+are skipped. Pass --clean to delete the output folder (and the cache) before generating
+new output.
 
 Usage:
-python3 make_all_skeletons.py <path to decomp> <output folder>  ["1" to import animations too]
+python3 make_all_skeletons.py <path to decomp> <output folder>  ["1" to import animations too] [--jobs N] [--clean]
 
 Example:
-python3 make_all_skeletons.py ~/git/mm blend-files 1 
+python3 make_all_skeletons.py ~/git/mm blend-files 1 --jobs 8
 """
 
+SCRIPT_DIR = Path(__file__).resolve().parent
+ADDON_INIT_PATH = SCRIPT_DIR.parent.parent / "__init__.py"
+CACHE_FILE_NAME = ".make_all_skeletons_cache.json"
+REPORT_FILE_NAME = "make_all_skeletons_report.json"
+
+
+@dataclass
+class JobResult:
+    inPath: Path
+    success: bool
+    cached: bool
+    wallTime: float
+    key: str
+
+
+def getAddonVersion():
+    """Reads the version from the addon's ``bl_info`` without importing bpy"""
+
+    match = re.search(r"\"version\"\s*:\s*\(([0-9,\s]+)\)", ADDON_INIT_PATH.read_text())
+    return ".".join(part.strip() for part in match.group(1).split(",") if part.strip()) if match else "unknown"
+
+
+def getCacheKey(inPath: Path, addonVersion: str, importAnimations: bool):
+    sha = hashlib.sha256(inPath.read_bytes())
+    sha.update(f"{addonVersion}:{int(importAnimations)}".encode())
+    return sha.hexdigest()
+
+
+def loadCache(cachePath: Path) -> dict[str, str]:
+    if cachePath.exists():
+        try:
+            return json.loads(cachePath.read_text())
+        except json.JSONDecodeError:
+            print(f"Ignoring invalid cache file {cachePath}")
+    return {}
+
+
+def runJob(
+    decompPath: Path, inPath: Path, outPath: Path, importAnimations: bool, key: str, cachedKey: Optional[str]
+) -> JobResult:
+    if cachedKey == key and outPath.exists():
+        return JobResult(inPath, True, True, 0.0, key)
+
+    objectName = inPath.parts[-2]
+
+    # Make sure all the subdirs exist
+    outPath.parent.mkdir(parents=True, exist_ok=True)
+
+    # Run make_skeletons.py in blender to build the .blend file
+    args = [
+        "blender",
+        "--background",
+        "--python-exit-code",  # note: python-exit-code MUST come before python, or you'll always get 0!
+        "1",
+        "--python",
+        str(SCRIPT_DIR / "make_skeletons.py"),
+        "--",
+        str(decompPath),
+        str(inPath),
+        str(outPath),
+        objectName,
+    ]
+
+    if importAnimations:
+        args.append("1")
+
+    startTime = time.perf_counter()
+    res = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    wallTime = time.perf_counter() - startTime
+
+    if res.returncode != 0:
+        # only print the log of failed imports, otherwise the output of concurrent jobs gets interleaved
+        print(f"! Failed: {inPath}\n{res.stdout}", flush=True)
+
+    return JobResult(inPath, res.returncode == 0, False, wallTime, key)
+
 
 def main():
-    filePaths: List[Path] = []
-    failFiles: List[Path] = []
-    successFiles: List[Path] = []
+    parser = argparse.ArgumentParser()
+    parser.add_argument("decompPath", type=Path)
+    parser.add_argument("outputPath", type=Path)
+    parser.add_argument("importAnimations", nargs="?", default="0")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--clean", action="store_true", help="delete the output folder before importing")
+    parsedArgs = parser.parse_args()
 
     print(f"args {sys.argv}")
-    decompPath = Path(sys.argv[1])
-    outputPath = Path(sys.argv[2])
-    importAnimations = len(sys.argv) > 3 and sys.argv[3] == "1"
+    decompPath: Path = parsedArgs.decompPath
+    outputPath: Path = parsedArgs.outputPath
+    importAnimations = parsedArgs.importAnimations == "1"
+    addonVersion = getAddonVersion()
 
-    # Delete the output folder if it already exists
-    if outputPath.exists():
+    if parsedArgs.clean and outputPath.exists():
         shutil.rmtree(outputPath)
+    outputPath.mkdir(parents=True, exist_ok=True)
+
+    cachePath = outputPath / CACHE_FILE_NAME
+    cache = loadCache(cachePath)
 
     # populate filePaths with paths to all files in the decomp
     # that appear to contain a skeleton
+    filePaths: list[Path] = []
     for inPath in (Path(decompPath) / "assets" / "objects").rglob("*.c"):
         with open(inPath, "r") as file:
             contents = file.read()
             if re.search(r"(Flex)?SkeletonHeader\s*(?P<name>[A-Za-z0-9\_]+)\s*=", contents) is not None:
                 filePaths.append(inPath)
 
-    for i, inPath in enumerate(filePaths):
-        # Generate the output path as a subdir in the output folder with the same structure
-        #  as the file's location in the decomp
-        outPath: Path = outputPath.joinpath(*inPath.parts[len(decompPath.parts) :]).with_suffix(".blend")
-        objectName = inPath.parts[-2]
-
-        # Make sure all the subdirs exist
-        outPath.parent.mkdir(parents=True, exist_ok=True)
-
-        # Run make_skeletons.py in blender to build the .blend file
-        args = [
-            "blender",
-            "--background",
-            "--python-exit-code",  # note: python-exit-code MUST come before python, or you'll always get 0!
-            "1",
-            "--python",
-            "make_skeletons.py",
-            "--",
-            decompPath,
-            inPath,
-            outPath,
-            objectName,
-        ]
-
-        if importAnimations:
-            args.append("1")
-
-        res = subprocess.run(args)
-
-        if res.returncode == 0:
-            successFiles.append(inPath)
-        else:
-            failFiles.append(inPath)
-            print("! Failed")
-
-        # Report progress
-        print(f"Progress: {i + 1}/{len(filePaths)} done")
-        percentSuccessful = round(len(successFiles) / len(filePaths) * 100, 1)
-        percentFailed = round(len(failFiles) / len(filePaths) * 100, 1)
-        print(f"\tSuccessful:  {len(successFiles)} {percentSuccessful:.1f}%")
-        print(f"\tFailed:  {len(failFiles)} {percentFailed:.1f}%", flush=True)
-
-    # After all imports have been tried, list all the files with any failures
+    results: list[JobResult] = []
+    startTime = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, parsedArgs.jobs)) as executor:
+        futures = []
+        for inPath in filePaths:
+            # Generate the output path as a subdir in the output folder with the same structure
+            #  as the file's location in the decomp
+            relPath = inPath.relative_to(decompPath)
+            outPath: Path = outputPath.joinpath(relPath).with_suffix(".blend")
+            key = getCacheKey(inPath, addonVersion, importAnimations)
+            futures.append(
+                executor.submit(runJob, decompPath, inPath, outPath, importAnimations, key, cache.get(str(relPath)))
+            )
+
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+
+            relPath = str(result.inPath.relative_to(decompPath))
+            if result.success:
+                cache[relPath] = result.key
+            else:
+                cache.pop(relPath, None)
+
+            # write the cache after every job so an interrupted run can be resumed
+            cachePath.write_text(json.dumps(cache, indent=4, sort_keys=True))
+
+            # Report progress
+            successCount = sum(1 for r in results if r.success)
+            failCount = len(results) - successCount
+            print(f"Progress: {len(results)}/{len(filePaths)} done ({result.wallTime:.1f}s {result.inPath.name})")
+            print(f"\tSuccessful:  {successCount} {successCount / len(filePaths) * 100:.1f}%")
+            print(f"\tFailed:  {failCount} {failCount / len(filePaths) * 100:.1f}%", flush=True)
+
+    totalTime = time.perf_counter() - startTime
+    failFiles = sorted(r.inPath for r in results if not r.success)
+    cacheHits = sum(1 for r in results if r.cached)
+
+    report = {
+        "addonVersion": addonVersion,
+        "jobs": parsedArgs.jobs,
+        "totalWallTime": totalTime,
+        "fileCount": len(results),
+        "cacheHits": cacheHits,
+        "failures": [str(f) for f in failFiles],
+        "files": [
+            {"path": str(r.inPath), "success": r.success, "cached": r.cached, "wallTime": r.wallTime}
+            for r in sorted(results, key=lambda r: r.wallTime, reverse=True)
+        ],
+    }
+    (outputPath / REPORT_FILE_NAME).write_text(json.dumps(report, indent=4))
+
+    # After all imports have been tried, list the slowest files and all the files with any failures
+    print(f"Done in {totalTime:.1f}s, {cacheHits}/{len(results)} cache hits")
+    print("Slowest files:")
+    for entry in report["files"][:10]:
+        if not entry["cached"]:
+            print(f"\t{entry['wallTime']:.1f}s {entry['path']}")
     print("Files with failures:")
     print("\n".join(str(f) for f in failFiles))
+    print(f"Full report written to {outputPath / REPORT_FILE_NAME}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The tests import fast64_internal directly, they need Blender's python (or the bpy module) to run
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,94 @@
+import pytest
+
+pytest.importorskip("bpy")
+
+from fast64_internal.f3d.f3d_gbi import F3D, DPLoadTextureBlock_4b, DPLoadTextureTile_4b
+from fast64_internal.f3d.f3d_cost_analyzer import (
+    DLCostAnalyzer,
+    RDP_CYCLES_PER_TEXTURE_LOAD,
+    RDP_LOAD_BLOCK_BYTES_PER_CYCLE,
+    RDP_CYCLES_PER_LOAD_TILE_ROW,
+    RDP_CYCLES_PER_PIPE_SYNC,
+    RDP_CYCLES_PER_LOAD_SYNC,
+)
+
+WRAP = "G_TX_WRAP | G_TX_NOMIRROR"
+
+LOAD_BLOCK_4B = (
+    f"gsDPLoadTextureBlock_4b(test_tex, G_IM_FMT_CI, 32, 64, 0, {WRAP}, {WRAP}, 5, 6, G_TX_NOLOD, G_TX_NOLOD)"
+)
+LOAD_BLOCK_8B = (
+    f"gsDPLoadTextureBlock(test_tex, G_IM_FMT_CI, G_IM_SIZ_8b, 32, 64, 0, {WRAP}, {WRAP}, 5, 6, G_TX_NOLOD, G_TX_NOLOD)"
+)
+LOAD_TILE_4B = f"gsDPLoadTextureTile_4b(test_tex, G_IM_FMT_I, 64, 64, 0, 0, 31, 15, 0, {WRAP}, {WRAP}, 5, 4, G_TX_NOLOD, G_TX_NOLOD)"
+
+
+def analyze_c(*commands: str):
+    dlData = (
+        "Gfx test_dl[] = {\n" + "".join(f"\t{command},\n" for command in commands) + "\tgsSPEndDisplayList(),\n};\n"
+    )
+    analyzer = DLCostAnalyzer(F3D("F3DEX2/LX2"))
+    analyzer.analyze_parsed_dl(dlData, "test_dl")
+    return analyzer.rows["test_dl", "test_dl"]
+
+
+def analyze_macros(*cmds):
+    analyzer = DLCostAnalyzer(F3D("F3DEX2/LX2"))
+    cost = analyzer.get_row("test", "test")
+    for cmd in cmds:
+        analyzer.add_gbi_macro(cost, cmd)
+    return cost
+
+
+def test_parsed_load_texture_block_4b():
+    cost = analyze_c(LOAD_BLOCK_4B)
+    assert cost.textureLoads == 1
+    assert cost.textureBytes == 32 * 64 // 2
+    assert cost.tmemBytes == 32 * 64 // 2
+
+
+def test_parsed_load_texture_tile_4b():
+    cost = analyze_c(LOAD_TILE_4B)
+    assert cost.textureLoads == 1
+    assert cost.textureBytes == 32 * 16 // 2
+
+
+def test_parsed_4b_loads_match_gbi_macros():
+    wrap = ["G_TX_WRAP", "G_TX_NOMIRROR"]
+    block = DPLoadTextureBlock_4b("test_tex", "G_IM_FMT_CI", "G_IM_SIZ_4b", 32, 64, 0, wrap, wrap, 5, 6, 0, 0)
+    tile = DPLoadTextureTile_4b(
+        "test_tex", "G_IM_FMT_I", "G_IM_SIZ_4b", 64, 64, 0, 0, 31, 15, 0, wrap, wrap, 5, 4, 0, 0
+    )
+    parsed = analyze_c(LOAD_BLOCK_4B, LOAD_TILE_4B)
+    macros = analyze_macros(block, tile)
+    for attr in ("textureLoads", "textureBytes", "tmemBytes", "rdpCycles"):
+        assert getattr(parsed, attr) == getattr(macros, attr), attr
+
+
+def test_4b_load_bytes_are_half_of_8b():
+    assert analyze_c(LOAD_BLOCK_4B).textureBytes * 2 == analyze_c(LOAD_BLOCK_8B).textureBytes
+
+
+def test_4b_load_block_cycles():
+    cost = analyze_c(LOAD_BLOCK_4B)
+    loadBytes = 32 * 64 // 2
+    assert cost.commands == 7 + 1  # and gsSPEndDisplayList
+    assert cost.pipeSyncs == 1 and cost.loadSyncs == 1
+    assert cost.rdpCycles == (
+        RDP_CYCLES_PER_PIPE_SYNC
+        + RDP_CYCLES_PER_LOAD_SYNC
+        + RDP_CYCLES_PER_TEXTURE_LOAD
+        + loadBytes // RDP_LOAD_BLOCK_BYTES_PER_CYCLE
+    )
+
+
+def test_4b_load_tile_cycles():
+    cost = analyze_c(LOAD_TILE_4B)
+    loadBytes = 32 * 16 // 2
+    assert cost.rdpCycles == (
+        RDP_CYCLES_PER_PIPE_SYNC
+        + RDP_CYCLES_PER_LOAD_SYNC
+        + RDP_CYCLES_PER_TEXTURE_LOAD
+        + loadBytes // RDP_LOAD_BLOCK_BYTES_PER_CYCLE
+        + RDP_CYCLES_PER_LOAD_TILE_ROW * 16
+    )
@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+pytest.importorskip("bpy")
+
+import numpy as np
+
+from fast64_internal.f3d.f3d_parser import (
+    decodeTextureData,
+    RGBA16toRGBA32,
+    IA16toRGBA32,
+    IA8toRGBA32,
+    IA4toRGBA32,
+    I8toRGBA32,
+    I4toRGBA32,
+    CI8toRGBA32,
+    CI4toRGBA32,
+)
+
+scalarDecoders = {
+    ("G_IM_FMT_RGBA", "G_IM_SIZ_16b"): RGBA16toRGBA32,
+    ("G_IM_FMT_IA", "G_IM_SIZ_16b"): IA16toRGBA32,
+    ("G_IM_FMT_IA", "G_IM_SIZ_8b"): IA8toRGBA32,
+    ("G_IM_FMT_IA", "G_IM_SIZ_4b"): IA4toRGBA32,
+    ("G_IM_FMT_I", "G_IM_SIZ_8b"): I8toRGBA32,
+    ("G_IM_FMT_I", "G_IM_SIZ_4b"): I4toRGBA32,
+    ("G_IM_FMT_CI", "G_IM_SIZ_8b"): CI8toRGBA32,
+    ("G_IM_FMT_CI", "G_IM_SIZ_4b"): CI4toRGBA32,
+}
+
+
+def texel_values(data: bytes, imageSize: str):
+    if imageSize == "G_IM_SIZ_4b":
+        return [nibble for byte in data for nibble in (byte >> 4, byte & 15)]
+    if imageSize == "G_IM_SIZ_16b":
+        return [int.from_bytes(data[i : i + 2], "big") for i in range(0, len(data) - 1, 2)]
+    return list(data)
+
+
+@pytest.mark.parametrize("imageFormat, imageSize", list(scalarDecoders))
+def test_decode_matches_scalar_decoders(imageFormat, imageSize):
+    data = random.Random(imageFormat + imageSize).randbytes(64) + bytes([0, 255, 0x0F, 0xF0])
+    expected = [scalarDecoders[imageFormat, imageSize](value) for value in texel_values(data, imageSize)]
+    decoded = decodeTextureData(data, imageFormat, imageSize)
+    assert decoded.dtype == np.float32
+    np.testing.assert_allclose(decoded, np.array(expected, dtype=np.float32), rtol=0, atol=1e-6)
+
+
+def test_decode_rgba32():
+    data = bytes(range(0, 256, 8))
+    decoded = decodeTextureData(data, "G_IM_FMT_RGBA", "G_IM_SIZ_32b")
+    expected = [[value / 255 for value in data[i : i + 4]] for i in range(0, len(data), 4)]
+    np.testing.assert_allclose(decoded, np.array(expected, dtype=np.float32), rtol=0, atol=1e-6)
+
+
+def test_decode_odd_16b_length():
+    # a trailing byte that does not make a full texel is ignored
+    decoded = decodeTextureData(bytes([0xFF, 0xFF, 0x12]), "G_IM_FMT_RGBA", "G_IM_SIZ_16b")
+    assert decoded.shape == (1, 4)
+
+
+def test_decode_unhandled():
+    assert decodeTextureData(bytes(4), "G_IM_FMT_RGBA", "G_IM_SIZ_8b") is None
+    assert decodeTextureData(bytes(4), "G_IM_FMT_RGBA", "G_IM_SIZ_64b") is None
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("bpy")
+
+from fast64_internal.f3d.f3d_texture_writer import convertVertexScrollToTileScroll
+
+
+def make_scroll(speedS: float = 0, speedT: float = 0, animType: str = "Linear"):
+    fields = [SimpleNamespace(animType=animType if speed else "None", speed=speed) for speed in (speedS, speedT)]
+    scrollData = SimpleNamespace(
+        fields=[fields],
+        tile_scroll_tex0=SimpleNamespace(s=0, t=0, interval=5),
+        convertedVertexScrollAxes=0,
+    )
+    return SimpleNamespace(scrollData=scrollData, isTexLarge=[False, False])
+
+
+def make_texture(shift: int = 0, clamp: bool = False, mask: int = 5):
+    def field():
+        return SimpleNamespace(clamp=clamp, mask=mask, mirror=False, shift=shift)
+
+    return SimpleNamespace(indexInMat=0, doTexTile=True, texProp=SimpleNamespace(S=field(), T=field()))
+
+
+def make_f3d_mat(texScale=(1, 1)):
+    return SimpleNamespace(rdp_settings=SimpleNamespace(g_mdsft_textlod="G_TL_TILE"), tex_scale=texScale)
+
+
+@pytest.mark.parametrize(
+    "speeds, shift, texScale, tileSpeeds",
+    [
+        ((1, 0), 0, (1, 1), (-4, 0)),
+        ((0, -2), 0, (1, 1), (0, 8)),
+        ((1, 1), 1, (1, 1), (-2, -2)),
+        ((1, 1), -2, (1, 1), (-16, -16)),
+        ((2, 2), 0, (0.5, 0.25), (-4, -2)),
+    ],
+)
+def test_vertex_scroll_speed_conversion(speeds, shift, texScale, tileSpeeds):
+    fMaterial = make_scroll(*speeds)
+    assert convertVertexScrollToTileScroll(make_f3d_mat(texScale), fMaterial, [make_texture(shift)])
+    tileScroll = fMaterial.scrollData.tile_scroll_tex0
+    assert (tileScroll.s, tileScroll.t) == tileSpeeds
+    assert tileScroll.interval == 1
+    assert all(field.animType == "None" for field in fMaterial.scrollData.fields[0])
+    assert fMaterial.scrollData.convertedVertexScrollAxes == sum(speed != 0 for speed in speeds)
+
+
+@pytest.mark.parametrize(
+    "fMaterial, texture",
+    [
+        # not a whole quarter texel per frame
+        (make_scroll(0.1), make_texture()),
+        # too fast for the tile size
+        (make_scroll(2000), make_texture()),
+        (make_scroll(1, animType="Sine"), make_texture()),
+        (make_scroll(1), make_texture(clamp=True)),
+        (make_scroll(1), make_texture(mask=0)),
+    ],
+)
+def test_vertex_scroll_not_converted(fMaterial, texture):
+    assert not convertVertexScrollToTileScroll(make_f3d_mat(), fMaterial, [texture])
+    tileScroll = fMaterial.scrollData.tile_scroll_tex0
+    assert (tileScroll.s, tileScroll.t, tileScroll.interval) == (0, 0, 5)
+    assert fMaterial.scrollData.fields[0][0].animType != "None"
@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip("bpy")
+
+from fast64_internal.utility import PluginError
+from fast64_internal.sm64.sm64_geolayout_classes import GeolayoutGraph
+
+
+def make_graph(calls: dict[str, list[str]]):
+    graph = GeolayoutGraph("start")
+    geolayouts = {"start": graph.startGeolayout}
+    for caller, callees in calls.items():
+        for callee in [caller] + callees:
+            if callee not in geolayouts:
+                geolayouts[callee] = graph.addGeolayout(callee, callee)
+        for callee in callees:
+            graph.addGeolayoutCall(geolayouts[caller], geolayouts[callee])
+    return graph
+
+
+def sorted_names(graph: GeolayoutGraph):
+    graph.generateSortedList()
+    return [geolayout.name for geolayout in graph.sortedList]
+
+
+def test_sort_single_geolayout():
+    assert sorted_names(make_graph({})) == ["start"]
+
+
+def test_sort_callees_before_callers():
+    graph = make_graph({"start": ["a", "b"], "a": ["c"], "b": ["d"]})
+    assert sorted_names(graph) == ["c", "a", "d", "b", "start"]
+
+
+def test_sort_shared_callee_once():
+    graph = make_graph({"start": ["a", "b", "a"], "a": ["shared"], "b": ["shared"]})
+    assert sorted_names(graph) == ["shared", "a", "b", "start"]
+
+
+def test_sort_deep_chain():
+    # deeper than the default recursion limit
+    chain = [f"geo_{i}" for i in range(2000)]
+    graph = make_graph({caller: [callee] for caller, callee in zip(["start"] + chain, chain)})
+    assert sorted_names(graph) == chain[::-1] + ["start"]
+
+
+def test_sort_cycle():
+    graph = make_graph({"start": ["a"], "a": ["b"], "b": ["c"], "c": ["a"]})
+    with pytest.raises(PluginError, match="a -> b -> c -> a"):
+        graph.generateSortedList()
+
+
+def test_sort_self_call():
+    graph = make_graph({"start": ["start"]})
+    with pytest.raises(PluginError, match="start -> start"):
+        graph.generateSortedList()